@@ -0,0 +1,78 @@
+"""
+Compares rendering the issue message blocks with the compiled builder against
+the Jinja path it replaced, a template parse, a render and a JSON parse per call.
+
+Usage:
+    python -m bench.block_render --renders 100000
+"""
+import argparse
+import json
+import sys
+import time
+
+from jinja2 import Template
+
+from src.application.repr.slack.blocks import CREATE_ISSUE_TEMPLATE_BLOCK
+from src.application.repr.slack.templates import compile_blocks
+
+_ARGS = {
+    "status": "Open",
+    "issue_number": 1024,
+    "text": "the deploy to production is failing since this morning, any idea?",
+    "priority": "Urgent",
+}
+
+
+def render_jinja(**kwargs) -> list:
+    # as done before, per call.
+    rendered = Template(CREATE_ISSUE_TEMPLATE_BLOCK).render(**kwargs)
+    return json.loads(rendered, strict=False)["blocks"]
+
+
+_precompiled_template = Template(CREATE_ISSUE_TEMPLATE_BLOCK)
+
+
+def render_jinja_precompiled(**kwargs) -> list:
+    # the template parsed once, still a render and a JSON parse per call.
+    rendered = _precompiled_template.render(**kwargs)
+    return json.loads(rendered, strict=False)["blocks"]
+
+
+_build = compile_blocks(CREATE_ISSUE_TEMPLATE_BLOCK)
+
+
+def render_compiled(**kwargs) -> list:
+    return _build(**kwargs)["blocks"]
+
+
+def run(render, renders: int) -> float:
+    """returns seconds per render"""
+    started = time.perf_counter()
+    for _ in range(renders):
+        render(**_ARGS)
+    return (time.perf_counter() - started) / renders
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--renders", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    if render_compiled(**_ARGS) != render_jinja(**_ARGS):
+        print("compiled blocks differ from the Jinja rendered blocks")
+        return 1
+
+    results = {}
+    for name, render in (
+        ("jinja", render_jinja),
+        ("jinja precompiled", render_jinja_precompiled),
+        ("compiled", render_compiled),
+    ):
+        results[name] = run(render, args.renders)
+        print(f"{name:18} {results[name] * 1e6:8.2f} us/render")
+    print(f"speedup over jinja: {results['jinja'] / results['compiled']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Measures memory held per domain object, slotted as they are and, for
+comparison, with a per-instance `__dict__` as they used to be.
+
+Objects are kept alive in a list and measured with `tracemalloc`, so that the
+numbers include everything allocated per object, like the `__dict__`.
+
+Usage:
+    python -m bench.domain_memory --objects 100000
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+from typing import Callable, Dict
+
+from src.domain.models import (
+    ChannelMessage,
+    Issue,
+    MessageReactionAdded,
+    SlackChannel,
+    SlackEvent,
+    Tenant,
+    User,
+)
+
+_PAYLOAD = {
+    "event_id": "ev0123456789",
+    "event_time": 1700000000,
+    "event": {
+        "type": "message",
+        "channel_type": "channel",
+        "channel": "C0123456789",
+        "user": "U0123456789",
+        "text": "hey, is anyone looking at the failing deploy?",
+        "ts": "1700000000.000100",
+    },
+}
+
+
+def _with_dict(cls: type) -> type:
+    # a subclass without `__slots__` gets a `__dict__` again.
+    return type(f"{cls.__name__}WithDict", (cls,), {})
+
+
+def _factories(dicted: bool) -> Dict[str, Callable[[int], object]]:
+    def wrap(cls):
+        return _with_dict(cls) if dicted else cls
+
+    tenant, user, channel = wrap(Tenant), wrap(User), wrap(SlackChannel)
+    issue, event = wrap(Issue), wrap(SlackEvent)
+    message, reaction = wrap(ChannelMessage), wrap(MessageReactionAdded)
+    return {
+        "Tenant": lambda i: tenant(f"t{i}", "acme", f"T{i}"),
+        "User": lambda i: user("t", f"u{i}", f"U{i}", "Jane Doe", "member"),
+        "SlackChannel": lambda i: channel("t", f"c{i}", f"C{i}", "general"),
+        "Issue": lambda i: issue("t", f"i{i}", i, "c", f"{i}.0001", "deploy failed"),
+        "SlackEvent": lambda i: event("t", f"e{i}", f"ev{i}", 1700000000, _PAYLOAD),
+        "ChannelMessage": lambda i: message(
+            "t", f"ev{i}", "message", "C0123", "U0123", f"{i}.0001", "hey"
+        ),
+        "MessageReactionAdded": lambda i: reaction(
+            "t", f"ev{i}", "reaction_added", "ticket", "U0123", "C0123", "1.0", "U1"
+        ),
+    }
+
+
+def measure(factory: Callable[[int], object], objects: int) -> float:
+    """returns bytes per object"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [factory(i) for i in range(objects)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # the list itself is not part of the objects.
+    size = after - before - sys.getsizeof(kept)
+    del kept
+    return size / objects
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    slotted, dicted = _factories(False), _factories(True)
+    print(f"{'':22}{'slotted':>12}{'__dict__':>12}{'saved':>8}{'objects/MB':>12}")
+    for name, factory in slotted.items():
+        slotted_size = measure(factory, args.objects)
+        dicted_size = measure(dicted[name], args.objects)
+        saved = (1 - slotted_size / dicted_size) * 100
+        print(
+            f"{name:22}{slotted_size:10.0f} B{dicted_size:10.0f} B"
+            f"{saved:7.0f}%{2**20 / slotted_size:12.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Load tests the Slack events endpoint on the production server with an
+increasing number of worker processes, to check that throughput scales close
+to linearly with the workers.
+
+The server is started with `bin/server-prod.sh` settings for each worker count
+and load is generated from separate processes, so that the client is not the
+bottleneck, use at most half the cores for workers.
+
+Events posted are bot messages, dropped right after validation, so that what
+is measured is the HTTP stack and not Postgres or Redis. The server still
+connects to Postgres on startup, `POSTGRES_URI` must point to a database.
+
+Usage:
+    POSTGRES_URI=postgresql+asyncpg://... python -m bench.events_scaling \
+        --workers 1 2 4 --duration 10 --clients 4
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+_TOKEN = "bench-verification-token"
+_APP_ID = "ABENCH"
+
+_PAYLOAD = {
+    "token": _TOKEN,
+    "team_id": "TBENCH",
+    "api_app_id": _APP_ID,
+    "type": "event_callback",
+    "event_id": "EvBENCH",
+    "event_time": 1700000000,
+    "event_context": "bench",
+    "event": {
+        "type": "message",
+        "subtype": "bot_message",
+        "bot_id": "BBENCH",
+        "channel_type": "channel",
+        "channel": "CBENCH",
+        "text": "bench",
+        "ts": "1700000000.000100",
+    },
+}
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        ZYG_WEB_WORKERS=str(workers),
+        ZYG_WEB_BIND=f"127.0.0.1:{port}",
+        ZYG_WEB_MAX_REQUESTS="0",
+        SLACK_VERIFICATION_TOKEN=_TOKEN,
+        SLACK_APP_ID=_APP_ID,
+        ZYG_LOG_QUEUE_SIZE="1000",
+    )
+    return subprocess.Popen(
+        ["bin/server-prod.sh"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server not ready at {url}")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    os.killpg(process.pid, signal.SIGTERM)
+    process.wait(timeout=60)
+
+
+async def _client(url: str, duration: float, concurrency: int) -> int:
+    done = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits) as client:
+
+        async def worker():
+            nonlocal done
+            while time.monotonic() < deadline:
+                response = await client.post(url, json=_PAYLOAD)
+                if response.status_code == 200:
+                    done += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return done
+
+
+def _client_process(url: str, duration: float, concurrency: int, results) -> None:
+    results.put(asyncio.run(_client(url, duration, concurrency)))
+
+
+def load(url: str, duration: float, clients: int, concurrency: int) -> float:
+    """returns requests per second"""
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=_client_process, args=(url, duration, concurrency, results)
+        )
+        for _ in range(clients)
+    ]
+    for p in processes:
+        p.start()
+    total = sum(results.get() for _ in processes)
+    for p in processes:
+        p.join()
+    return total / duration
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument(
+        "--min-efficiency",
+        type=float,
+        default=0.8,
+        help="fails if throughput per worker drops below this share of the first run.",
+    )
+    args = parser.parse_args(argv)
+
+    base = f"http://127.0.0.1:{args.port}"
+    url = f"{base}/events/-/slack/callback/"
+    baseline = None
+    ok = True
+    for workers in args.workers:
+        server = start_server(workers, args.port)
+        try:
+            wait_ready(f"{base}/")
+            load(url, 1.0, args.clients, args.concurrency)  # warm up
+            rps = load(url, args.duration, args.clients, args.concurrency)
+        finally:
+            stop_server(server)
+        if baseline is None:
+            baseline = rps / workers
+        efficiency = rps / (baseline * workers)
+        ok = ok and efficiency >= args.min_efficiency
+        print(f"workers: {workers:3}  {rps:10.0f} req/s  efficiency: {efficiency:.2f}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
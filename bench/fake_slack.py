@@ -0,0 +1,378 @@
+"""
+Local stand-in for the Slack Web API, to load test the worker offline.
+
+Serves `chat.postMessage`, `chat.postEphemeral`, `conversations.history`,
+`conversations.list` and `users.list` with responses shaped like Slack's, and
+can add latency, errors and rate limiting:
+
+--latency-ms / --jitter-ms   delay per call, uniformly +- jitter
+--error-rate                 fraction of calls answered `ok: false`
+--ratelimit-rate             fraction of calls answered 429 with Retry-After
+--ratelimit-rpm              per method limit like Slack's tiers, 0 disables it
+--page-size                  max items per page of the list methods, cursor paged
+
+Point the app at it with `SLACK_API_BASE_URL=http://127.0.0.1:8765/api/`.
+Counts per method and status are served at `GET /_stats`.
+
+Usage:
+    python -m bench.fake_slack --port 8765 --latency-ms 80 --ratelimit-rpm 50
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+TEAM_ID = "TFAKE00001"
+
+_RATELIMITED = {"ok": False, "error": "ratelimited"}
+
+
+class Settings:
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        ratelimit_rate: float = 0.0,
+        ratelimit_rpm: int = 0,
+        page_size: int = 200,
+        users: int = 500,
+        channels: int = 100,
+        seed: int | None = None,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.ratelimit_rate = ratelimit_rate
+        self.ratelimit_rpm = ratelimit_rpm
+        self.page_size = page_size
+        self.users = users
+        self.channels = channels
+        self.rng = random.Random(seed)
+
+
+def _user(n: int) -> dict:
+    name = f"user{n:05d}"
+    return {
+        "id": f"UFAKE{n:05d}",
+        "team_id": TEAM_ID,
+        "name": name,
+        "deleted": False,
+        "color": "9f69e7",
+        "real_name": f"User {n}",
+        "tz": "Europe/London",
+        "tz_label": "Greenwich Mean Time",
+        "tz_offset": 0,
+        "profile": {
+            "real_name": f"User {n}",
+            "display_name": name,
+            "email": f"{name}@example.com",
+            "image_48": "https://example.com/avatar_48.png",
+            "team": TEAM_ID,
+        },
+        "is_admin": n == 0,
+        "is_owner": n == 0,
+        "is_primary_owner": n == 0,
+        "is_restricted": False,
+        "is_ultra_restricted": False,
+        "is_bot": False,
+        "is_app_user": False,
+        "updated": 1700000000,
+        "is_email_confirmed": True,
+        "who_can_share_contact_card": "EVERYONE",
+    }
+
+
+def _channel(n: int) -> dict:
+    return {
+        "id": f"CFAKE{n:05d}",
+        "name": f"support-{n:05d}",
+        "is_channel": True,
+        "is_group": False,
+        "is_im": False,
+        "is_mpim": False,
+        "is_private": False,
+        "created": 1700000000,
+        "is_archived": False,
+        "is_general": n == 0,
+        "unlinked": 0,
+        "name_normalized": f"support-{n:05d}",
+        "is_shared": False,
+        "is_org_shared": False,
+        "is_pending_ext_shared": False,
+        "pending_shared": [],
+        "context_team_id": TEAM_ID,
+        "updated": 1700000000,
+        "parent_conversation": None,
+        "creator": "UFAKE00000",
+        "is_ext_shared": False,
+        "shared_team_ids": [TEAM_ID],
+        "pending_connected_team_ids": [],
+        "is_member": True,
+        "topic": {"value": "", "creator": "", "last_set": 0},
+        "purpose": {"value": "", "creator": "", "last_set": 0},
+        "previous_names": [],
+        "num_members": 10,
+    }
+
+
+def _page(settings: Settings, params: dict, total: int, make: Callable) -> tuple:
+    """
+    Returns the items of the page and the cursor of the next, "" on the last.
+    """
+    limit = int(params.get("limit", 0) or settings.page_size)
+    size = max(1, min(limit, settings.page_size))
+    start = int(params.get("cursor", "") or 0)
+    items = [make(n) for n in range(start, min(start + size, total))]
+    end = start + len(items)
+    return items, str(end) if end < total else ""
+
+
+def _ts() -> str:
+    return f"{time.time():.6f}"
+
+
+def chat_post_message(settings: Settings, params: dict) -> dict:
+    ts = _ts()
+    return {
+        "ok": True,
+        "channel": params.get("channel", ""),
+        "ts": ts,
+        "message": {
+            "type": "message",
+            "subtype": "bot_message",
+            "text": params.get("text", ""),
+            "ts": ts,
+            "bot_id": "BFAKE00001",
+            "thread_ts": params.get("thread_ts", None),
+        },
+    }
+
+
+def chat_post_ephemeral(settings: Settings, params: dict) -> dict:
+    return {"ok": True, "message_ts": _ts()}
+
+
+def conversations_history(settings: Settings, params: dict) -> dict:
+    ts = params.get("oldest", None) or _ts()
+    message = {
+        "client_msg_id": "6f3c1f0e-2a4b-4e0a-9d3c-1b2c3d4e5f60",
+        "type": "message",
+        "text": "the export to CSV is failing for our workspace",
+        "user": "UFAKE00001",
+        "ts": ts,
+        "team": TEAM_ID,
+        "blocks": [],
+    }
+    return {
+        "ok": True,
+        "messages": [message],
+        "has_more": False,
+        "pin_count": 0,
+        "response_metadata": {"next_cursor": ""},
+    }
+
+
+def conversations_list(settings: Settings, params: dict) -> dict:
+    channels, cursor = _page(settings, params, settings.channels, _channel)
+    return {
+        "ok": True,
+        "channels": channels,
+        "response_metadata": {"next_cursor": cursor},
+    }
+
+
+def users_list(settings: Settings, params: dict) -> dict:
+    members, cursor = _page(settings, params, settings.users, _user)
+    return {
+        "ok": True,
+        "members": members,
+        "cache_ts": int(time.time()),
+        "response_metadata": {"next_cursor": cursor},
+    }
+
+
+METHODS: Dict[str, Callable[[Settings, dict], dict]] = {
+    "chat.postMessage": chat_post_message,
+    "chat.postEphemeral": chat_post_ephemeral,
+    "conversations.history": conversations_history,
+    "conversations.list": conversations_list,
+    "users.list": users_list,
+}
+
+
+class RateLimiter:
+    """
+    Sliding window of a minute per method, like Slack's rate limit tiers.
+    """
+
+    def __init__(self, rpm: int) -> None:
+        self.rpm = rpm
+        self.calls: Dict[str, deque] = defaultdict(deque)
+        self.lock = threading.Lock()
+
+    def retry_after(self, method: str) -> int:
+        """0 when allowed, otherwise seconds to wait"""
+        if self.rpm <= 0:
+            return 0
+        now = time.monotonic()
+        with self.lock:
+            calls = self.calls[method]
+            while calls and now - calls[0] >= 60:
+                calls.popleft()
+            if len(calls) >= self.rpm:
+                return max(1, int(60 - (now - calls[0])) + 1)
+            calls.append(now)
+        return 0
+
+
+class FakeSlack:
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self.limiter = RateLimiter(settings.ratelimit_rpm)
+        self.stats: Dict[Tuple[str, int], int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def _count(self, method: str, status: int) -> None:
+        with self._lock:
+            self.stats[(method, status)] += 1
+
+    def stats_repr(self) -> dict:
+        with self._lock:
+            return {f"{m} {s}": count for (m, s), count in sorted(self.stats.items())}
+
+    def handle(self, method: str, params: dict) -> Tuple[int, dict, dict]:
+        """Returns the status code, headers and body"""
+        settings = self.settings
+        rng = settings.rng
+        if settings.latency_ms or settings.jitter_ms:
+            jitter = rng.uniform(-settings.jitter_ms, settings.jitter_ms)
+            time.sleep(max(settings.latency_ms + jitter, 0.0) / 1000)
+
+        handler = METHODS.get(method, None)
+        if handler is None:
+            status, headers, body = 200, {}, {"ok": False, "error": "unknown_method"}
+        elif settings.ratelimit_rate and rng.random() < settings.ratelimit_rate:
+            status, headers, body = 429, {"Retry-After": "1"}, _RATELIMITED
+        elif retry_after := self.limiter.retry_after(method):
+            status, headers, body = 429, {"Retry-After": str(retry_after)}, _RATELIMITED
+        elif settings.error_rate and rng.random() < settings.error_rate:
+            status, headers, body = 200, {}, {"ok": False, "error": "internal_error"}
+        else:
+            status, headers, body = 200, {}, handler(settings, params)
+        self._count(method, status)
+        return status, headers, body
+
+
+def _handler_class(fake: FakeSlack):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _params(self) -> Tuple[str, dict]:
+            url = urlsplit(self.path)
+            params = dict(parse_qsl(url.query))
+            length = int(self.headers.get("Content-Length", "0") or 0)
+            if length:
+                raw = self.rfile.read(length)
+                content_type = self.headers.get("Content-Type", "")
+                if content_type.startswith("application/json"):
+                    params.update(json.loads(raw))
+                else:
+                    params.update(parse_qsl(raw.decode("utf-8")))
+            return url.path, params
+
+        def _respond(self, status: int, headers: dict, body: dict) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _serve(self) -> None:
+            path, params = self._params()
+            if path == "/_stats":
+                self._respond(200, {}, fake.stats_repr())
+                return
+            if not path.startswith("/api/"):
+                self._respond(404, {}, {"ok": False, "error": "not_found"})
+                return
+            self._respond(*fake.handle(path[len("/api/") :], params))
+
+        do_GET = _serve
+        do_POST = _serve
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_fake_slack(
+    settings: Settings, port: int = 0, addr: str = "127.0.0.1"
+) -> Tuple[ThreadingHTTPServer, FakeSlack]:
+    """
+    Serves from a daemon thread, the base URL is
+    `http://{addr}:{server.server_port}/api/`.
+    """
+    fake = FakeSlack(settings)
+    server = ThreadingHTTPServer((addr, port), _handler_class(fake))
+    server.daemon_threads = True
+    thread = threading.Thread(
+        target=server.serve_forever, name="fake-slack", daemon=True
+    )
+    thread.start()
+    return server, fake
+
+
+def add_settings_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--ratelimit-rate", type=float, default=0.0)
+    parser.add_argument("--ratelimit-rpm", type=int, default=0)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--channels", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def settings_from_args(args) -> Settings:
+    return Settings(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        ratelimit_rate=args.ratelimit_rate,
+        ratelimit_rpm=args.ratelimit_rpm,
+        page_size=args.page_size,
+        users=args.users,
+        channels=args.channels,
+        seed=args.seed,
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--addr", default="127.0.0.1")
+    add_settings_arguments(parser)
+    args = parser.parse_args(argv)
+    server, _ = start_fake_slack(settings_from_args(args), args.port, args.addr)
+    print(f"fake slack at: http://{args.addr}:{server.server_port}/api/")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
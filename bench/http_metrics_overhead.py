@@ -0,0 +1,104 @@
+"""
+Measures the overhead of `HTTPMetricsMiddleware` per request.
+
+Requests are driven straight through the ASGI interface, so that the numbers
+are not drowned by the network stack. The overhead is reported as the share of
+CPU time the middleware adds when serving `--rps` requests per second.
+
+Usage:
+    python -m bench.http_metrics_overhead --requests 50000 --rps 5000
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from fastapi import FastAPI
+
+from src.adapters.web.middleware import HTTPMetricsMiddleware
+
+
+def build_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/")
+    async def root():
+        return {"message": "Hey there! I am zyg."}
+
+    @app.post("/issues/:search/")
+    async def search():
+        return []
+
+    if with_metrics:
+        app.add_middleware(HTTPMetricsMiddleware, routes=app.routes)
+    return app
+
+
+def _scope(method: str, path: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+async def run(app: FastAPI, requests: int) -> float:
+    """returns seconds per request"""
+    scopes = [_scope("GET", "/"), _scope("POST", "/issues/:search/")]
+    # warm up, builds the middleware stack among other things.
+    for i in range(1000):
+        await app(dict(scopes[i % 2]), _receive, _send)
+    started = time.perf_counter()
+    for i in range(requests):
+        await app(dict(scopes[i % 2]), _receive, _send)
+    return (time.perf_counter() - started) / requests
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--rps", type=int, default=5000)
+    parser.add_argument("--budget", type=float, default=2.0, help="in percent.")
+    args = parser.parse_args(argv)
+
+    raw, instrumented = build_app(False), build_app(True)
+    raw_times, instrumented_times = [], []
+    for _ in range(args.rounds):
+        # interleave rounds so that both see the same noise.
+        raw_times.append(asyncio.run(run(raw, args.requests)))
+        instrumented_times.append(asyncio.run(run(instrumented, args.requests)))
+
+    raw_t = statistics.median(raw_times)
+    instrumented_t = statistics.median(instrumented_times)
+    added = instrumented_t - raw_t
+    # CPU time added per second when serving `rps`, as a share of one core.
+    overhead = added * args.rps * 100
+
+    print(f"raw:          {raw_t * 1e6:8.2f} us/request")
+    print(f"instrumented: {instrumented_t * 1e6:8.2f} us/request")
+    print(f"added:        {added * 1e6:8.2f} us/request")
+    print(f"overhead at {args.rps} rps: {overhead:.2f}% (budget {args.budget}%)")
+    return 0 if overhead < args.budget else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Measures the import time of the web and worker entry points with
+`python -X importtime`, in a fresh interpreter each run, and fails if an entry
+point takes longer than its budget.
+
+Usage:
+    python -m bench.import_time --runs 5 --budget-ms web=2500 worker=1200
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ENTRY_POINTS = {
+    "web": "src.adapters.web.server",
+    "worker": "src.adapters.tasker.init",
+}
+
+# about 1.5x of fastapi 0.101 and pydantic 2.1, building the models of
+# `fastapi.openapi.models` alone takes about half a second of the web's.
+DEFAULT_BUDGETS_MS = {"web": 3000.0, "worker": 1500.0}
+
+
+def import_times(module: str) -> Tuple[float, List[Tuple[float, str]]]:
+    """
+    Returns the cumulative import time of the module in ms,
+    and the self time in ms of every module imported along.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"cannot import `{module}`:\n{result.stderr[-2000:]}")
+    total, selfs = None, []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        name = name.strip()
+        selfs.append((int(self_us) / 1000, name))
+        if name == module:
+            total = int(cumulative_us) / 1000
+    if total is None:
+        raise RuntimeError(f"no import time reported for `{module}`")
+    return total, selfs
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument(
+        "--budget-ms",
+        nargs="*",
+        default=[],
+        help="per entry point, e.g. web=2500 worker=1200.",
+    )
+    args = parser.parse_args(argv)
+
+    budgets: Dict[str, float] = dict(DEFAULT_BUDGETS_MS)
+    for item in args.budget_ms:
+        name, value = item.split("=")
+        budgets[name] = float(value)
+
+    ok = True
+    for name, module in ENTRY_POINTS.items():
+        totals, slowest = [], []
+        for _ in range(args.runs):
+            total, selfs = import_times(module)
+            totals.append(total)
+            slowest = selfs
+        total = statistics.median(totals)
+        within = total <= budgets[name]
+        ok = ok and within
+        print(
+            f"{name}: {module} {total:.0f} ms "
+            f"(budget {budgets[name]:.0f} ms) {'ok' if within else 'OVER BUDGET'}"
+        )
+        for self_ms, imported in sorted(slowest, reverse=True)[: args.top]:
+            print(f"    {self_ms:8.1f} ms  {imported}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Microbenchmarks of domain model construction and serialization, run with
+pytest-benchmark on fixed inputs.
+
+run       runs them and prints the table
+save      runs them and stores the results as the baseline
+compare   runs them against the stored baseline, fails when the median of
+          any is slower by more than `--threshold` percent
+
+Baselines are stored in `bench/micro/baselines/` and are only comparable on
+the machine they were saved on, save one on the reference machine before
+comparing, e.g. after merging to main.
+
+Usage:
+    python -m bench.micro save
+    python -m bench.micro compare --threshold 10
+"""
+import argparse
+import os
+import sys
+
+import pytest
+
+_DIR = os.path.dirname(__file__)
+_STORAGE = os.path.join(_DIR, "baselines")
+_BASELINE = "baseline"
+
+
+def pytest_args(mode: str, threshold: float, extra: list) -> list:
+    args = [
+        _DIR,
+        "-q",
+        "-p",
+        "no:cacheprovider",
+        # kept out of the collection of the tests.
+        "-o",
+        "python_files=bench_*.py",
+        "-o",
+        "python_functions=bench_*",
+        f"--benchmark-storage=file://{_STORAGE}",
+        "--benchmark-sort=name",
+        "--benchmark-columns=min,median,mean,stddev,ops,rounds",
+    ]
+    if mode == "save":
+        args.append(f"--benchmark-save={_BASELINE}")
+    elif mode == "compare":
+        # against the latest saved baseline, compare runs are not stored.
+        args += ["--benchmark-compare", f"--benchmark-compare-fail=median:{threshold}%"]
+    return args + extra
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.micro")
+    parser.add_argument("mode", choices=("run", "save", "compare"), nargs="?")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="percent slower than the baseline that fails compare.",
+    )
+    args, extra = parser.parse_known_args(argv)
+    mode = args.mode or "run"
+    return int(pytest.main(pytest_args(mode, args.threshold, extra)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+Domain models built from Slack payloads and API results, and serialized as
+task arguments.
+"""
+from src.domain.models import (
+    InSyncSlackChannel,
+    InSyncSlackUser,
+    Issue,
+    SlackChannel,
+    SlackEvent,
+)
+
+
+def bench_slack_event_from_message_payload(benchmark, tenant_id, message_payload):
+    benchmark(
+        SlackEvent.from_payload,
+        tenant_id=tenant_id,
+        event_id=None,
+        payload=message_payload,
+    )
+
+
+def bench_slack_event_from_reaction_payload(benchmark, tenant_id, reaction_payload):
+    benchmark(
+        SlackEvent.from_payload,
+        tenant_id=tenant_id,
+        event_id=None,
+        payload=reaction_payload,
+    )
+
+
+def bench_slack_event_to_dict(benchmark, slack_event):
+    benchmark(slack_event.to_dict)
+
+
+def bench_insync_slack_user_from_dict(benchmark, tenant_id, slack_user_data):
+    benchmark(InSyncSlackUser.from_dict, tenant_id, data=slack_user_data)
+
+
+def bench_insync_slack_channel_from_dict(benchmark, tenant_id, slack_channel_data):
+    benchmark(InSyncSlackChannel.from_dict, tenant_id, data=slack_channel_data)
+
+
+def bench_issue_from_dict(benchmark, tenant_id, issue_data):
+    benchmark(Issue.from_dict, tenant_id, data=issue_data)
+
+
+def bench_slack_channel_from_dict(benchmark, tenant_id, linked_channel_data):
+    benchmark(SlackChannel.from_dict, tenant_id, data=linked_channel_data)
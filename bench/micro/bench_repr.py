@@ -0,0 +1,41 @@
+"""
+Response models of `src.application.repr.api`, built and dumped as the web
+app does for each response.
+"""
+from src.application.repr.api import (
+    event_context_repr,
+    insync_slack_channel_repr,
+    insync_slack_user_repr,
+    issue_repr,
+    slack_callback_event_repr,
+    slack_channel_repr,
+    user_repr,
+)
+
+
+def bench_slack_callback_event_repr(benchmark, slack_event):
+    benchmark(lambda: slack_callback_event_repr(slack_event).model_dump())
+
+
+def bench_issue_repr(benchmark, issue):
+    benchmark(lambda: issue_repr(issue).model_dump())
+
+
+def bench_slack_channel_repr(benchmark, linked_channel):
+    benchmark(lambda: slack_channel_repr(linked_channel).model_dump())
+
+
+def bench_event_context_repr(benchmark, linked_channel, issue):
+    benchmark(lambda: event_context_repr(linked_channel, issue).model_dump())
+
+
+def bench_insync_slack_channel_repr(benchmark, insync_slack_channel):
+    benchmark(lambda: insync_slack_channel_repr(insync_slack_channel).model_dump())
+
+
+def bench_insync_slack_user_repr(benchmark, insync_slack_user):
+    benchmark(lambda: insync_slack_user_repr(insync_slack_user).model_dump())
+
+
+def bench_user_repr(benchmark, user):
+    benchmark(lambda: user_repr(user).model_dump())
@@ -0,0 +1,205 @@
+"""
+Fixed inputs of the microbenchmarks, built once per session so that runs on
+the same machine compare like for like. Kept here rather than imported from
+the load tests, which set up their environment on import.
+"""
+import json
+import os
+from datetime import datetime, timezone
+
+import attrs
+import pytest
+
+from src.domain.models import (
+    InSyncSlackChannel,
+    InSyncSlackUser,
+    Issue,
+    SlackChannel,
+    SlackEvent,
+    User,
+)
+
+_CORPUS = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "fixtures", "slack_callbacks.json"
+)
+
+_AT = datetime(2023, 11, 14, 22, 13, 20, tzinfo=timezone.utc)
+
+_TEAM_ID = "TFAKE00001"
+
+_VALUES = {
+    "token": "bench-verification-token",
+    "api_app_id": "ABENCH0001",
+    "event_id": "Ev0000000001BENCH",
+    "event_time": 1700000000,
+    "ts": "1700000000.000100",
+}
+
+
+def _render(value, values: dict):
+    if isinstance(value, dict):
+        return {k: _render(v, values) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_render(v, values) for v in value]
+    if isinstance(value, str) and value.startswith("{") and value.endswith("}"):
+        return values.get(value[1:-1], value)
+    return value
+
+
+def _payload(name: str) -> dict:
+    with open(_CORPUS) as f:
+        corpus = {entry["name"]: entry for entry in json.load(f)}
+    return _render(corpus[name]["body"], _VALUES)
+
+
+@pytest.fixture(scope="session")
+def tenant_id() -> str:
+    return "tnbench"
+
+
+@pytest.fixture(scope="session")
+def message_payload() -> dict:
+    return _payload("message.channels")
+
+
+@pytest.fixture(scope="session")
+def reaction_payload() -> dict:
+    return _payload("reaction_added")
+
+
+@pytest.fixture(scope="session")
+def slack_user_data() -> dict:
+    # a member as returned by `users.list`.
+    return {
+        "id": "UFAKE00001",
+        "team_id": _TEAM_ID,
+        "name": "user00001",
+        "deleted": False,
+        "color": "9f69e7",
+        "real_name": "User 1",
+        "tz": "Europe/London",
+        "tz_label": "Greenwich Mean Time",
+        "tz_offset": 0,
+        "profile": {
+            "real_name": "User 1",
+            "display_name": "user00001",
+            "email": "user00001@example.com",
+            "image_48": "https://example.com/avatar_48.png",
+            "team": _TEAM_ID,
+        },
+        "is_admin": False,
+        "is_owner": False,
+        "is_primary_owner": False,
+        "is_restricted": False,
+        "is_ultra_restricted": False,
+        "is_bot": False,
+        "is_app_user": False,
+        "updated": 1700000000,
+        "is_email_confirmed": True,
+        "who_can_share_contact_card": "EVERYONE",
+    }
+
+
+@pytest.fixture(scope="session")
+def slack_channel_data() -> dict:
+    # a channel as returned by `conversations.list`.
+    return {
+        "id": "CFAKE00001",
+        "name": "support-00001",
+        "is_channel": True,
+        "is_group": False,
+        "is_im": False,
+        "is_mpim": False,
+        "is_private": False,
+        "created": 1700000000,
+        "is_archived": False,
+        "is_general": False,
+        "unlinked": 0,
+        "name_normalized": "support-00001",
+        "is_shared": False,
+        "is_org_shared": False,
+        "is_pending_ext_shared": False,
+        "pending_shared": [],
+        "context_team_id": _TEAM_ID,
+        "updated": 1700000000,
+        "parent_conversation": None,
+        "creator": "UFAKE00000",
+        "is_ext_shared": False,
+        "shared_team_ids": [_TEAM_ID],
+        "pending_connected_team_ids": [],
+        "is_member": True,
+        "topic": {"value": "", "creator": "", "last_set": 0},
+        "purpose": {"value": "", "creator": "", "last_set": 0},
+        "previous_names": [],
+        "num_members": 10,
+    }
+
+
+@pytest.fixture(scope="session")
+def issue_data() -> dict:
+    return {
+        "issue_id": "isbench0001",
+        "issue_number": 1042,
+        "slack_channel_id": "scbench0001",
+        "slack_message_ts": "1700000000.000100",
+        "body": "the export to CSV is failing for our workspace since this morning",
+        "status": "open",
+        "priority": 2,
+        "tags": ["Export", "csv issues"],
+    }
+
+
+@pytest.fixture(scope="session")
+def linked_channel_data() -> dict:
+    return {
+        "channel_id": "scbench0001",
+        "slack_channel_ref": "cfake00001",
+        "slack_channel_name": "support-00001",
+        "triage_channel": {
+            "slack_channel_ref": "cfake00002",
+            "slack_channel_name": "support-00002",
+        },
+    }
+
+
+@pytest.fixture(scope="session")
+def slack_event(tenant_id, message_payload) -> SlackEvent:
+    return SlackEvent.from_payload(
+        tenant_id=tenant_id, event_id="evbench0001", payload=message_payload
+    )
+
+
+@pytest.fixture(scope="session")
+def issue(tenant_id, issue_data) -> Issue:
+    return Issue.from_dict(tenant_id, data=issue_data)
+
+
+@pytest.fixture(scope="session")
+def linked_channel(tenant_id, linked_channel_data) -> SlackChannel:
+    return SlackChannel.from_dict(tenant_id, data=linked_channel_data)
+
+
+@pytest.fixture(scope="session")
+def insync_slack_channel(tenant_id, slack_channel_data) -> InSyncSlackChannel:
+    # as read back from the database, with its timestamps.
+    channel = InSyncSlackChannel.from_dict(tenant_id, data=slack_channel_data)
+    return attrs.evolve(channel, updated_at=_AT, created_at=_AT)
+
+
+@pytest.fixture(scope="session")
+def insync_slack_user(tenant_id, slack_user_data) -> InSyncSlackUser:
+    user = InSyncSlackUser.from_dict(tenant_id, data=slack_user_data)
+    return attrs.evolve(user, updated_at=_AT, created_at=_AT)
+
+
+@pytest.fixture(scope="session")
+def user(tenant_id) -> User:
+    return User.from_dict(
+        {
+            "tenant_id": tenant_id,
+            "user_id": "usbench0001",
+            "slack_user_ref": "ufake00001",
+            "name": "User 1",
+            "role": "member",
+        }
+    )
@@ -0,0 +1,171 @@
+"""
+Measures how many Slack API calls the worker gets through against
+`bench/fake_slack.py`, with its latency, errors and rate limits.
+
+Each thread stands in for a prefork worker process, handling one event at a
+time with the same `SlackWebAPIConnector` calls as the event handlers:
+
+message      a nudge, `chat.postEphemeral`
+reaction     `conversations.history` for the message, a reply with
+             `chat.postMessage`
+sync         a user sync, `users.list`
+
+Reports calls per second and p50/p95/p99 per call, and the errors surfaced
+to the handlers, e.g. rate limited calls.
+
+Usage:
+    python -m bench.slack_api_throughput --workers 8 --events 2000 \
+        --latency-ms 80 --ratelimit-rpm 600
+"""
+import argparse
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Tuple
+
+from bench.fake_slack import (
+    add_settings_arguments,
+    settings_from_args,
+    start_fake_slack,
+)
+
+# kind of event and how often it happens.
+_MIX = (("message", 70), ("reaction", 25), ("sync", 5))
+
+
+def _calls(base_url: str) -> Dict[str, List[Tuple[str, Callable]]]:
+    from src.adapters.rpc.ext import SlackWebAPIConnector
+    from src.application.commands.slack import (
+        GetSingleChannelMessage,
+        GetUsersCommand,
+        NudgePostMessageCommand,
+        ReplyPostMessageCommand,
+    )
+    from src.domain.models import TenantContext
+
+    # one client shared by the threads, like the SDK allows.
+    slack_api = SlackWebAPIConnector(
+        tenant_context=TenantContext(
+            tenant_id="tnbench", name="bench", slack_team_ref="TFAKE00001"
+        ),
+        token="xoxb-bench",
+        base_url=base_url,
+    )
+    nudge = NudgePostMessageCommand(
+        channel="CFAKE00001", slack_user_ref="UFAKE00001", text="create an issue?"
+    )
+    history = GetSingleChannelMessage(channel="CFAKE00001", oldest="1700000000.0001")
+    reply = ReplyPostMessageCommand(
+        channel="CFAKE00001", text="issue created.", thread_ts="1700000000.0001"
+    )
+    return {
+        "message": [
+            ("chat.postEphemeral", lambda: slack_api.nudge_for_issue(nudge)),
+        ],
+        "reaction": [
+            (
+                "conversations.history",
+                lambda: slack_api.find_single_channel_message(history),
+            ),
+            ("chat.postMessage", lambda: slack_api.reply_to_message(reply)),
+        ],
+        "sync": [
+            ("users.list", lambda: slack_api.get_users(GetUsersCommand(limit=200))),
+        ],
+    }
+
+
+def run(
+    calls: Dict[str, list], events: int, workers: int, seed: int
+) -> Tuple[float, Dict[str, List[float]], Dict[str, int]]:
+    rng = random.Random(seed)
+    kinds = [kind for kind, _ in _MIX]
+    weights = [weight for _, weight in _MIX]
+    pending = iter(rng.choices(kinds, weights, k=events))
+    lock = threading.Lock()
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+
+    def worker():
+        while True:
+            with lock:
+                kind = next(pending, None)
+            if kind is None:
+                return
+            for method, call in calls[kind]:
+                started = time.perf_counter()
+                try:
+                    call()
+                except Exception as e:
+                    with lock:
+                        errors[f"{method} {type(e).__name__}"] += 1
+                    # the handler gives up on the event.
+                    break
+                finally:
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        latencies[method].append(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - started, latencies, errors
+
+
+def _percentiles(values: List[float]) -> Tuple[float, float, float]:
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return value, value, value
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return cuts[49], cuts[94], cuts[98]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument(
+        "--min-rps", type=float, default=0.0, help="fails below these calls/s."
+    )
+    add_settings_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.seed is None:
+        args.seed = 1
+
+    server, fake = start_fake_slack(settings_from_args(args))
+    base_url = f"http://127.0.0.1:{server.server_port}/api/"
+    try:
+        elapsed, latencies, errors = run(
+            _calls(base_url), args.events, args.workers, args.seed
+        )
+    finally:
+        server.shutdown()
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"{'call':<24}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for method, values in sorted(latencies.items()):
+        p50, p95, p99 = _percentiles(values)
+        print(
+            f"{method:<24}{len(values):>8}{p50 * 1000:>10.3f}"
+            f"{p95 * 1000:>10.3f}{p99 * 1000:>10.3f}"
+        )
+    rps = total / elapsed
+    print(f"throughput: {rps:.0f} calls/s, {args.events / elapsed:.0f} events/s")
+    for error, count in sorted(errors.items()):
+        print(f"errors: {count} x {error}")
+    print(f"fake slack: {fake.stats_repr()}")
+
+    if rps < args.min_rps:
+        print(f"FAIL: {rps:.0f} calls/s is below {args.min_rps}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+"""
+Replays a corpus of Slack event callbacks against the events endpoint of the
+web app and reports throughput and p50/p95/p99 latency per kind of callback.
+
+Requests are driven straight through the app's ASGI interface, with all of
+its middleware, so that what is measured is our code and not the network.
+The corpus is in `bench/fixtures/slack_callbacks.json`, each entry has a
+weight for how often it is sent, retries resend an event captured earlier.
+
+With `--backend memory`, the default, Postgres and the Celery broker are
+replaced by in-memory stand-ins, so that it runs anywhere. With
+`--backend local` the app uses `POSTGRES_URI` and `REDIS_URL`, e.g. local
+instances, and the bench tenant is created if missing. Tasks are published to
+the broker, run it without a worker or purge the queue after.
+
+Fails when a response is not a 200 or when p99 is over `--p99-budget-ms`.
+
+Usage:
+    python -m bench.slack_ingest --requests 5000 --concurrency 16
+    POSTGRES_URI=postgresql+asyncpg://... python -m bench.slack_ingest \
+        --backend local --p99-budget-ms 50
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, Iterator, List, Tuple
+
+_TOKEN = "bench-verification-token"
+_APP_ID = "ABENCH0001"
+_TEAM_REF = "TBENCH0001"
+# as stored, tenants are created with the lowercased slack team ref.
+_TENANT_TEAM_REF = _TEAM_REF.lower()
+_PATH = "/events/-/slack/callback/"
+_CORPUS = os.path.join(os.path.dirname(__file__), "fixtures", "slack_callbacks.json")
+
+# read by `src.config` on import.
+os.environ.setdefault("SLACK_VERIFICATION_TOKEN", _TOKEN)
+os.environ.setdefault("SLACK_APP_ID", _APP_ID)
+
+
+class InMemoryTenantDB:
+    def __init__(self, tenants: list) -> None:
+        self.by_slack_team_ref = {t.slack_team_ref: t for t in tenants}
+
+    async def find_by_slack_team_ref(self, slack_team_ref: str):
+        return self.by_slack_team_ref.get(slack_team_ref, None)
+
+
+class InMemorySlackEventDB:
+    def __init__(self) -> None:
+        self.by_slack_event_ref: Dict[str, object] = {}
+
+    async def save(self, slack_event):
+        if slack_event.event_id is None:
+            slack_event.event_id = uuid.uuid4().hex
+        self.by_slack_event_ref[slack_event.slack_event_ref] = slack_event
+        return slack_event
+
+    async def find_by_slack_event_ref(self, slack_event_ref: str):
+        return self.by_slack_event_ref.get(slack_event_ref.strip().lower(), None)
+
+
+class InMemoryWorker:
+    """
+    Stands in for the broker, task arguments are still encoded as the
+    Celery JSON serializer would.
+    """
+
+    def __init__(self) -> None:
+        self.published = 0
+
+    def apply_async(self, task_name, args=(), **kwargs):
+        json.dumps(args)
+        self.published += 1
+        return uuid.uuid4().hex
+
+
+def use_in_memory_backend() -> InMemoryWorker:
+    from src.adapters.web.routers import events
+    from src.domain.models import Tenant
+    from src.services import event as event_service
+
+    tenant_db = InMemoryTenantDB([Tenant("tnbench", "bench", _TENANT_TEAM_REF)])
+    slack_event_db = InMemorySlackEventDB()
+
+    class InMemorySlackEventCallBackService(event_service.SlackEventCallBackService):
+        def __init__(self) -> None:
+            self.tenant_db = tenant_db
+            self.slack_event_db = slack_event_db
+
+    worker = InMemoryWorker()
+    event_service.worker = worker
+    events.SlackEventCallBackService = InMemorySlackEventCallBackService
+    return worker
+
+
+async def use_local_backend() -> None:
+    from src.adapters.db.adapters import TenantDBAdapter
+    from src.domain.models import Tenant
+
+    tenant_db = TenantDBAdapter()
+    if await tenant_db.find_by_slack_team_ref(_TENANT_TEAM_REF) is None:
+        await tenant_db.save(Tenant(None, "bench", _TENANT_TEAM_REF))
+
+
+def load_corpus(path: str = _CORPUS) -> List[dict]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _render(value, values: dict):
+    if isinstance(value, dict):
+        return {k: _render(v, values) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_render(v, values) for v in value]
+    if isinstance(value, str) and value.startswith("{") and value.endswith("}"):
+        return values.get(value[1:-1], value)
+    return value
+
+
+def build_requests(
+    corpus: List[dict], count: int, seed: int
+) -> List[Tuple[str, bytes, List[Tuple[bytes, bytes]]]]:
+    """
+    Returns `(name, body, headers)` per request, bodies are encoded upfront.
+    """
+    rng = random.Random(seed)
+    by_name = {entry["name"]: entry for entry in corpus}
+    weights = [entry["weight"] for entry in corpus]
+    sent: Dict[str, List[bytes]] = defaultdict(list)
+    started = int(time.time())
+    requests = []
+    for seq in range(count):
+        entry = rng.choices(corpus, weights)[0]
+        headers = [(b"content-type", b"application/json")]
+        headers += [
+            (k.encode("latin-1"), v.encode("latin-1"))
+            for k, v in entry.get("headers", {}).items()
+        ]
+        retry_of = entry.get("retry_of", None)
+        if retry_of is not None and sent[retry_of]:
+            body = rng.choice(sent[retry_of])
+        elif retry_of is not None:
+            # nothing to retry yet, send the original instead.
+            entry = by_name[retry_of]
+            body = None
+        else:
+            body = None
+        if body is None:
+            values = {
+                "token": _TOKEN,
+                "api_app_id": _APP_ID,
+                "event_id": f"Ev{seq:010d}BENCH",
+                "event_time": started + seq // 100,
+                "ts": f"{started + seq // 100}.{seq % 1000000:06d}",
+            }
+            body = json.dumps(_render(entry["body"], values)).encode("utf-8")
+            if entry.get("fresh", False):
+                sent[entry["name"]].append(body)
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        requests.append((entry["name"], body, headers))
+    return requests
+
+
+def _scope(headers: List[Tuple[bytes, bytes]]) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": _PATH,
+        "raw_path": _PATH.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), *headers],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+
+async def call(app, body: bytes, headers: List[Tuple[bytes, bytes]]) -> int:
+    status = 0
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            # the app only asks again to wait for a disconnect.
+            await asyncio.Event().wait()
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(_scope(headers), receive, send)
+    return status
+
+
+async def run(
+    app, requests: List[tuple], concurrency: int
+) -> Tuple[float, Dict[str, List[float]], Dict[Tuple[str, int], int]]:
+    """
+    Returns the elapsed seconds, latencies per name and counts per
+    name and status.
+    """
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[Tuple[str, int], int] = defaultdict(int)
+    pending: Iterator[tuple] = iter(requests)
+
+    async def client():
+        for name, body, headers in pending:
+            started = time.perf_counter()
+            status = await call(app, body, headers)
+            latencies[name].append(time.perf_counter() - started)
+            statuses[(name, status)] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies, statuses
+
+
+def _percentiles(values: List[float]) -> Tuple[float, float, float]:
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return value, value, value
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return cuts[49], cuts[94], cuts[98]
+
+
+def report(elapsed: float, latencies: Dict[str, List[float]]) -> float:
+    """prints the table, returns p99 of all requests in seconds"""
+    everything = list(itertools.chain.from_iterable(latencies.values()))
+    rows = sorted(latencies.items(), key=lambda item: -len(item[1]))
+    rows.append(("all", everything))
+    print(f"{'callback':<32}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, values in rows:
+        p50, p95, p99 = _percentiles(values)
+        print(
+            f"{name:<32}{len(values):>8}{p50 * 1000:>10.3f}"
+            f"{p95 * 1000:>10.3f}{p99 * 1000:>10.3f}"
+        )
+    print(f"throughput: {len(everything) / elapsed:.0f} requests/s")
+    return _percentiles(everything)[2]
+
+
+def _quiet_logs() -> None:
+    # logs are still formatted and written, but not to the terminal.
+    from src.logger import setup_logging
+
+    devnull = open(os.devnull, "w")
+    for target in setup_logging().targets:
+        if isinstance(target, logging.StreamHandler):
+            target.setStream(devnull)
+
+
+async def amain(args) -> int:
+    from src.adapters.web.server import app
+
+    worker = None
+    if args.backend == "memory":
+        worker = use_in_memory_backend()
+    else:
+        await use_local_backend()
+
+    requests = build_requests(load_corpus(args.corpus), args.requests, args.seed)
+    warmup = build_requests(load_corpus(args.corpus), args.warmup, args.seed + 1)
+    try:
+        # builds the middleware stack and warms up caches and pools.
+        await run(app, warmup, args.concurrency)
+        elapsed, latencies, statuses = await run(app, requests, args.concurrency)
+    finally:
+        if args.backend == "local":
+            from src.adapters.db import get_engine
+
+            await get_engine().dispose()
+
+    p99 = report(elapsed, latencies)
+    if worker is not None:
+        print(f"tasks published: {worker.published}")
+
+    failed = False
+    unexpected = {k: v for k, v in statuses.items() if k[1] != 200}
+    for (name, status), count in sorted(unexpected.items()):
+        print(f"FAIL: {count} x `{name}` responded with {status}", file=sys.stderr)
+        failed = True
+    if args.p99_budget_ms is not None and p99 * 1000 > args.p99_budget_ms:
+        print(
+            f"FAIL: p99 {p99 * 1000:.3f}ms is over {args.p99_budget_ms}ms",
+            file=sys.stderr,
+        )
+        failed = True
+    return 1 if failed else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--backend", choices=("memory", "local"), default="memory")
+    parser.add_argument("--corpus", default=_CORPUS)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--p99-budget-ms", type=float, default=None)
+    args = parser.parse_args(argv)
+    _quiet_logs()
+    return asyncio.run(amain(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
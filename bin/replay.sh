@@ -0,0 +1,4 @@
+# replays unacknowledged slack events, pass through args e.g:
+# bin/replay.sh --since 2023-09-01T00:00:00 --until 2023-09-02T00:00:00 \
+#   --checkpoint /tmp/replay.json
+python -m src.adapters.cli.replay "$@"
@@ -0,0 +1,5 @@
+# runs the web app with multiple worker processes, see
+# src/adapters/web/gunicorn_conf.py for the settings, e.g:
+# ZYG_WEB_WORKERS=4 ZYG_DB_CONNECTION_BUDGET=40 bin/server-prod.sh
+# metrics are per worker, with ZYG_WEB_METRICS_PORT=9100 scrape 9100-9107.
+exec gunicorn -c src/adapters/web/gunicorn_conf.py src.adapters.web.server:app "$@"
@@ -0,0 +1,3 @@
+-- full callback payload zlib compressed, when stored with
+-- `ZYG_SLACK_EVENT_STORAGE=slim`.
+alter table slack_event add column if not exists payload_zlib bytea null;
@@ -0,0 +1,4 @@
+-- used for replaying unacknowledged slack events within a time range.
+-- concurrently, not to block ingest, so not within a transaction.
+create index concurrently if not exists slack_event_event_dispatched_ts_event_id_idx
+  on slack_event (event_dispatched_ts, event_id) where is_ack = false;
@@ -53,7 +53,8 @@ create table slack_event(
   event_dispatched_ts bigint not null,
   api_app_id varchar(255) null,
   token varchar(255) null,
-  payload jsonb,
+  payload jsonb, -- slim when stored with `ZYG_SLACK_EVENT_STORAGE=slim`.
+  payload_zlib bytea null, -- full payload zlib compressed, when stored slim.
   is_ack boolean not null default false,
   created_at timestamp default current_timestamp,
   updated_at timestamp default current_timestamp,
@@ -62,6 +63,10 @@ create table slack_event(
   constraint slack_event_slack_event_ref_key unique (slack_event_ref) -- unique across Slack workspaces. As per docs.
 );
 
+-- used for replaying unacknowledged slack events within a time range.
+create index slack_event_event_dispatched_ts_event_id_idx
+  on slack_event (event_dispatched_ts, event_id) where is_ack = false;
+
 -- mapped as per raw conversation item from Slack API reponse.
 -- with reference to a tenant.
 create table insync_slack_channel(
@@ -0,0 +1,84 @@
+"""
+Worker side cache of linked slack channels per tenant.
+
+Most slack events come from channels that are not linked, those are cached as
+missing so that they can be ignored without calling the API. Linked slack
+channels are cached so that reactions only need to look up the issue. Linking a
+slack channel publishes an invalidation for it.
+"""
+from typing import Any
+
+from src.config import (
+    ZYG_CHANNEL_CACHE_MAXSIZE,
+    ZYG_CHANNEL_CACHE_MISSING_TTL_SECONDS,
+    ZYG_CHANNEL_CACHE_TTL_SECONDS,
+)
+from src.domain.models import SlackChannel
+
+from .local import MISSING, TTLCache
+from .remote import invalidation_listener, publish
+
+SLACK_CHANNEL_INVALIDATION = "zyg:invalidate:slack_channel"
+
+
+class LinkedSlackChannelCache:
+    def __init__(self, cache: TTLCache) -> None:
+        self.cache = cache
+
+    @staticmethod
+    def _key(tenant_id: str, slack_channel_ref: str) -> tuple:
+        # slack channel refs are stored in lower case.
+        return tenant_id, slack_channel_ref.lower()
+
+    def get(self, tenant_id: str, slack_channel_ref: str) -> Any:
+        """
+        Returns the linked `SlackChannel`, `MISSING` if the slack channel is
+        known to not be linked or None if not cached.
+        """
+        return self.cache.get(self._key(tenant_id, slack_channel_ref))
+
+    def get_linked(self, tenant_id: str, slack_channel_ref: str) -> SlackChannel | None:
+        """
+        Returns the linked `SlackChannel` or None if not known to be linked.
+        """
+        slack_channel = self.get(tenant_id, slack_channel_ref)
+        if slack_channel is MISSING:
+            return None
+        return slack_channel
+
+    def is_not_linked(self, tenant_id: str, slack_channel_ref: str) -> bool:
+        return self.get(tenant_id, slack_channel_ref) is MISSING
+
+    def set_linked(self, slack_channel: SlackChannel) -> None:
+        key = self._key(slack_channel.tenant_id, slack_channel.slack_channel_ref)
+        self.cache.set(key, slack_channel)
+
+    def set_not_linked(self, tenant_id: str, slack_channel_ref: str) -> None:
+        self.cache.set_missing(self._key(tenant_id, slack_channel_ref))
+
+    def on_invalidate(self, message: dict | None) -> None:
+        if message is None:
+            self.cache.clear()
+            return
+        self.cache.delete(self._key(message["tenant_id"], message["slack_channel_ref"]))
+
+
+linked_slack_channel_cache = LinkedSlackChannelCache(
+    TTLCache(
+        "linked_slack_channel",
+        maxsize=ZYG_CHANNEL_CACHE_MAXSIZE,
+        ttl=ZYG_CHANNEL_CACHE_TTL_SECONDS,
+        missing_ttl=ZYG_CHANNEL_CACHE_MISSING_TTL_SECONDS,
+    )
+)
+
+invalidation_listener.subscribe(
+    SLACK_CHANNEL_INVALIDATION, linked_slack_channel_cache.on_invalidate
+)
+
+
+def publish_slack_channel_invalidation(tenant_id: str, slack_channel_ref: str) -> bool:
+    return publish(
+        SLACK_CHANNEL_INVALIDATION,
+        {"tenant_id": tenant_id, "slack_channel_ref": slack_channel_ref},
+    )
@@ -0,0 +1,106 @@
+"""
+In-process caches for the event worker.
+
+Entries expire after a TTL and the least recently used entries are evicted
+once the cache is full. A missing value, e.g. a slack channel that is not
+linked, can be cached too, see `set_missing`.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
+
+from src.metrics import Counter
+
+CACHE_LOOKUPS = Counter(
+    "zyg_cache_lookups",
+    "In-process cache lookups per cache and result.",
+    labelnames=("cache", "result"),
+)
+
+CACHE_EVICTIONS = Counter(
+    "zyg_cache_evictions",
+    "In-process cache entries evicted because the cache was full.",
+    labelnames=("cache",),
+)
+
+
+class _Missing:
+    """cached marker for a value that is known to not exist."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+
+class TTLCache:
+    """
+    Bounded LRU cache with per entry TTL, safe to use across threads, like
+    the worker and the invalidation listener thread.
+
+    `get` returns `default` when there is no live entry and `MISSING` when
+    the value is cached as not existing.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int,
+        ttl: float,
+        missing_ttl: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.missing_ttl = ttl if missing_ttl is None else missing_ttl
+        self.clock = clock
+        self._entries: OrderedDict[Hashable, Tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hit = CACHE_LOOKUPS.labels(name, "hit")
+        self._missing_hit = CACHE_LOOKUPS.labels(name, "missing_hit")
+        self._miss = CACHE_LOOKUPS.labels(name, "miss")
+        self._evicted = CACHE_EVICTIONS.labels(name)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self.clock():
+                    self._entries.move_to_end(key)
+                    if value is MISSING:
+                        self._missing_hit.inc()
+                    else:
+                        self._hit.inc()
+                    return value
+                del self._entries[key]
+        self._miss.inc()
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._entries[key] = (self.clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evicted.inc()
+
+    def set_missing(self, key: Hashable) -> None:
+        self.set(key, MISSING, ttl=self.missing_ttl)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,90 @@
+"""
+Recent slack channel messages, fed by the `message.channels` events we
+receive, so that reactions on them do not need `conversations.history`.
+
+Kept in Redis so that any worker process can resolve a message seen by
+another, only for linked slack channels and not for long. Keyed by slack team
+so that the web app can drop a message when it is edited or deleted, before
+looking up the tenant.
+"""
+import json
+import logging
+
+from redis.exceptions import RedisError
+
+from src.config import ZYG_MESSAGE_CACHE_TTL_SECONDS
+from src.domain.models import ChannelMessage, SlackChannelMessageAPIValue, Tenant
+from src.metrics import Counter
+
+from .local import CACHE_LOOKUPS
+from .remote import get_redis
+
+logger = logging.getLogger(__name__)
+
+SLACK_API_CALLS_SAVED = Counter(
+    "zyg_slack_api_calls_saved",
+    "Slack API calls not made because the result was cached.",
+    labelnames=("method",),
+)
+
+
+class SlackMessageCache:
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._hit = CACHE_LOOKUPS.labels("slack_message", "hit")
+        self._miss = CACHE_LOOKUPS.labels("slack_message", "miss")
+        self._saved = SLACK_API_CALLS_SAVED.labels("conversations.history")
+
+    @staticmethod
+    def _key(slack_team_ref: str, slack_channel_ref: str, ts: str) -> str:
+        return f"zyg:msg:{slack_team_ref.lower()}:{slack_channel_ref.lower()}:{ts}"
+
+    def add(self, tenant: Tenant, message: ChannelMessage) -> None:
+        if self.ttl <= 0:
+            return
+        data = {
+            "type": message.inner_event_type,
+            "text": message.text,
+            "user": message.slack_user_ref,
+            "ts": message.ts,
+            "blocks": message.blocks,
+        }
+        key = self._key(tenant.slack_team_ref, message.slack_channel_ref, message.ts)
+        try:
+            get_redis().set(key, json.dumps(data), px=int(self.ttl * 1000))
+        except RedisError as e:
+            logger.warning(f"cannot cache slack message: {e}")
+
+    def drop(self, slack_team_ref: str, slack_channel_ref: str, ts: str) -> None:
+        if self.ttl <= 0:
+            return
+        try:
+            get_redis().delete(self._key(slack_team_ref, slack_channel_ref, ts))
+        except RedisError as e:
+            logger.warning(f"cannot drop cached slack message: {e}")
+
+    def get(
+        self, tenant: Tenant, slack_channel_ref: str, ts: str
+    ) -> SlackChannelMessageAPIValue | None:
+        """
+        Returns the message as if fetched from the Slack API, or None if not
+        cached, the caller is then expected to fetch it from the Slack API.
+        """
+        value = None
+        if self.ttl > 0:
+            key = self._key(tenant.slack_team_ref, slack_channel_ref, ts)
+            try:
+                value = get_redis().get(key)
+            except RedisError as e:
+                logger.warning(f"cannot read cached slack message: {e}")
+        if value is None:
+            self._miss.inc()
+            return None
+        self._hit.inc()
+        self._saved.inc()
+        return SlackChannelMessageAPIValue.from_dict(
+            tenant_id=tenant.tenant_id, data=json.loads(value)
+        )
+
+
+slack_message_cache = SlackMessageCache(ZYG_MESSAGE_CACHE_TTL_SECONDS)
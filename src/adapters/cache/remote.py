@@ -0,0 +1,110 @@
+"""
+Redis shared by the web app and the worker, the same instance as the Celery
+broker, for state that must be seen by every process.
+"""
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, List
+
+from redis import Redis
+from redis.exceptions import RedisError
+
+from src.config import REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+_redis: Redis | None = None
+
+
+def get_redis() -> Redis:
+    """
+    Returns the process wide client, created on first use.
+
+    The client keeps a connection pool, connections are not shared with
+    forked children as the pool reconnects when the pid changes.
+    """
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(REDIS_URL)
+    return _redis
+
+
+def publish(channel: str, message: dict) -> bool:
+    """
+    Publishes to subscribers, if any, Redis pub/sub is fire and forget.
+
+    Returns False if it could not be published, callers should not fail
+    because of it, caches expire anyway.
+    """
+    try:
+        get_redis().publish(channel, json.dumps(message))
+    except RedisError as e:
+        logger.warning(f"cannot publish to `{channel}`: {e}")
+        return False
+    return True
+
+
+# called with the message, or with None when messages might have been missed,
+# e.g. after reconnecting, subscribers should then drop what they have cached.
+InvalidationCallback = Callable[[dict | None], None]
+
+
+class InvalidationListener:
+    """
+    Listens on Redis pub/sub channels from a daemon thread and calls the
+    callbacks subscribed for the channel.
+    """
+
+    def __init__(self, reconnect_after: float = 1.0) -> None:
+        self.reconnect_after = reconnect_after
+        self._callbacks: Dict[str, List[InvalidationCallback]] = {}
+        self._thread: threading.Thread | None = None
+
+    def subscribe(self, channel: str, callback: InvalidationCallback) -> None:
+        self._callbacks.setdefault(channel, []).append(callback)
+
+    def _notify(self, channel: str, message: dict | None) -> None:
+        for callback in self._callbacks.get(channel, []):
+            try:
+                callback(message)
+            except Exception as e:
+                logger.error(f"error in invalidation callback for `{channel}`: {e}")
+
+    def _listen(self) -> None:
+        while True:
+            pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(*self._callbacks.keys())
+                # might have missed messages while we were not subscribed.
+                for channel in self._callbacks:
+                    self._notify(channel, None)
+                for item in pubsub.listen():
+                    channel = item["channel"].decode("utf-8")
+                    try:
+                        message = json.loads(item["data"])
+                    except ValueError:
+                        logger.warning(f"ignored invalid message on `{channel}`")
+                        continue
+                    self._notify(channel, message)
+            except RedisError as e:
+                logger.warning(f"invalidation listener disconnected: {e}")
+            finally:
+                pubsub.close()
+            time.sleep(self.reconnect_after)
+
+    def start(self) -> None:
+        """
+        Starts listening, call it in each worker process, the thread
+        does not survive a fork.
+        """
+        if not self._callbacks:
+            return
+        self._thread = threading.Thread(
+            target=self._listen, name="zyg-invalidation", daemon=True
+        )
+        self._thread.start()
+
+
+invalidation_listener = InvalidationListener()
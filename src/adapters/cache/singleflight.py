@@ -0,0 +1,119 @@
+"""
+Single-flight across worker processes through Redis.
+
+For concurrent calls with the same key only the caller holding the lock runs
+the function, the others wait for its result, stored next to the lock for a
+while so that calls shortly after get it too.
+
+Redis is called from a thread, the client is blocking.
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+
+from redis.exceptions import RedisError
+
+from src.metrics import Counter
+
+from .remote import get_redis
+
+logger = logging.getLogger(__name__)
+
+SINGLE_FLIGHT_CALLS = Counter(
+    "zyg_single_flight_calls",
+    "Single-flight calls per name and whether the function was run by the caller "
+    "(leader), shared from another caller (shared) or run without a lock (fallback).",
+    labelnames=("name", "role"),
+)
+
+# deletes the lock only if still held by us, it might have expired meanwhile.
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    def __init__(
+        self,
+        name: str,
+        lock_ttl: float = 30.0,
+        result_ttl: float = 300.0,
+        wait_timeout: float = 30.0,
+        poll_interval: float = 0.05,
+    ) -> None:
+        self.name = name
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._leader = SINGLE_FLIGHT_CALLS.labels(name, "leader")
+        self._shared = SINGLE_FLIGHT_CALLS.labels(name, "shared")
+        self._fallback = SINGLE_FLIGHT_CALLS.labels(name, "fallback")
+
+    def _keys(self, key: str) -> tuple:
+        return f"zyg:flight:{self.name}:{key}:lock", f"zyg:flight:{self.name}:{key}"
+
+    async def run(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Returns the result of `func`, either run now or by a concurrent caller,
+        the result must be JSON serializable.
+
+        A None result is not shared, it means nothing was done, e.g. the channel
+        is not linked yet, the next caller runs `func` again.
+
+        If the result cannot be shared, e.g. Redis is not reachable or the
+        caller holding the lock takes longer than `wait_timeout`, `func` is run
+        anyway, callers are expected to be idempotent.
+        """
+        lock_key, result_key = self._keys(key)
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.wait_timeout
+        interval = self.poll_interval
+        redis = get_redis()
+        try:
+            while True:
+                value = await asyncio.to_thread(redis.get, result_key)
+                if value is not None:
+                    self._shared.inc()
+                    return json.loads(value)
+                locked = await asyncio.to_thread(
+                    redis.set, lock_key, token, nx=True, px=int(self.lock_ttl * 1000)
+                )
+                if locked:
+                    break
+                if time.monotonic() >= deadline:
+                    logger.warning(f"timed out waiting on single-flight `{key}`")
+                    self._fallback.inc()
+                    return await func()
+                await asyncio.sleep(interval)
+                interval = min(interval * 2, 0.5)
+        except RedisError as e:
+            logger.warning(f"cannot use single-flight `{self.name}`: {e}")
+            self._fallback.inc()
+            return await func()
+
+        self._leader.inc()
+        try:
+            result = await func()
+            if result is not None:
+                try:
+                    await asyncio.to_thread(
+                        redis.set,
+                        result_key,
+                        json.dumps(result),
+                        px=int(self.result_ttl * 1000),
+                    )
+                except RedisError as e:
+                    logger.warning(f"cannot share single-flight result `{key}`: {e}")
+            return result
+        finally:
+            try:
+                await asyncio.to_thread(redis.eval, _RELEASE_SCRIPT, 1, lock_key, token)
+            except RedisError as e:
+                logger.warning(f"cannot release single-flight `{key}`: {e}")
@@ -0,0 +1,50 @@
+"""
+Suppression windows shared by all worker processes through Redis.
+
+A window is taken with `SET NX PX`, only the first caller within the window
+gets it, one key per window holding no value, so it is cheap to keep many.
+"""
+import logging
+
+from redis.exceptions import RedisError
+
+from .remote import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class SuppressionWindow:
+    def __init__(self, prefix: str, seconds: float) -> None:
+        self.prefix = prefix
+        self.seconds = seconds
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self.prefix,) + parts)
+
+    def acquire(self, *parts: str) -> bool:
+        """
+        Returns True if not suppressed, the window starts now.
+
+        Fails open, if Redis is not reachable it is not suppressed.
+        """
+        if self.seconds <= 0:
+            return True
+        try:
+            acquired = get_redis().set(
+                self._key(*parts), b"", nx=True, px=int(self.seconds * 1000)
+            )
+        except RedisError as e:
+            logger.warning(f"cannot check suppression window `{self.prefix}`: {e}")
+            return True
+        return bool(acquired)
+
+    def release(self, *parts: str) -> None:
+        """
+        Ends the window early, e.g. when the suppressed action failed.
+        """
+        if self.seconds <= 0:
+            return
+        try:
+            get_redis().delete(self._key(*parts))
+        except RedisError as e:
+            logger.warning(f"cannot release suppression window `{self.prefix}`: {e}")
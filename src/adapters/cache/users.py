@@ -0,0 +1,99 @@
+"""
+Worker side cache of users per tenant, keyed by slack user ref.
+
+Syncing users publishes the refs of the upserted users, those are invalidated
+and the tenant is warmed again from `zyguser` on its next event. Warming is
+done by the worker itself and not by the listener thread, DB connections
+belong to the worker's event loop.
+"""
+import threading
+from typing import Any, Iterable, List, Set
+
+from src.config import (
+    ZYG_USER_CACHE_MAXSIZE,
+    ZYG_USER_CACHE_MISSING_TTL_SECONDS,
+    ZYG_USER_CACHE_TTL_SECONDS,
+)
+from src.domain.models import User
+
+from .local import MISSING, TTLCache
+from .remote import invalidation_listener, publish
+
+USER_INVALIDATION = "zyg:invalidate:user"
+
+
+class UserCache:
+    def __init__(self, cache: TTLCache) -> None:
+        self.cache = cache
+        self._pending_warm: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(tenant_id: str, slack_user_ref: str) -> tuple:
+        # slack user refs are stored in lower case.
+        return tenant_id, slack_user_ref.lower()
+
+    def get(self, tenant_id: str, slack_user_ref: str) -> Any:
+        """
+        Returns the `User`, `MISSING` if the user is known to not exist
+        or None if not cached.
+        """
+        return self.cache.get(self._key(tenant_id, slack_user_ref))
+
+    def set(self, user: User) -> None:
+        self.cache.set(self._key(user.tenant_id, user.slack_user_ref), user)
+
+    def set_missing(self, tenant_id: str, slack_user_ref: str) -> None:
+        self.cache.set_missing(self._key(tenant_id, slack_user_ref))
+
+    def warm(self, users: Iterable[User]) -> int:
+        count = 0
+        for user in users:
+            self.set(user)
+            count += 1
+        return count
+
+    def mark_pending_warm(self, tenant_id: str) -> None:
+        with self._lock:
+            self._pending_warm.add(tenant_id)
+
+    def take_pending_warm(self, tenant_id: str) -> bool:
+        """
+        Returns True once after the tenant was marked to be warmed.
+        """
+        with self._lock:
+            if tenant_id in self._pending_warm:
+                self._pending_warm.discard(tenant_id)
+                return True
+            return False
+
+    def on_invalidate(self, message: dict | None) -> None:
+        if message is None:
+            self.cache.clear()
+            return
+        tenant_id = message["tenant_id"]
+        for slack_user_ref in message.get("slack_user_refs", []):
+            self.cache.delete(self._key(tenant_id, slack_user_ref))
+        if message.get("warm", False):
+            self.mark_pending_warm(tenant_id)
+
+
+user_cache = UserCache(
+    TTLCache(
+        "user",
+        maxsize=ZYG_USER_CACHE_MAXSIZE,
+        ttl=ZYG_USER_CACHE_TTL_SECONDS,
+        missing_ttl=ZYG_USER_CACHE_MISSING_TTL_SECONDS,
+    )
+)
+
+invalidation_listener.subscribe(USER_INVALIDATION, user_cache.on_invalidate)
+
+
+def publish_user_invalidation(
+    tenant_id: str, slack_user_refs: List[str], warm: bool = False
+) -> bool:
+    return publish(
+        USER_INVALIDATION,
+        {"tenant_id": tenant_id, "slack_user_refs": slack_user_refs, "warm": warm},
+    )
@@ -0,0 +1,75 @@
+"""
+Replays unacknowledged slack events captured within a time range.
+
+Usage:
+    python -m src.adapters.cli.replay --since 2023-09-01T00:00:00 \
+        --until 2023-09-02T00:00:00 --checkpoint /tmp/replay.json
+"""
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+from src.application.commands import SlackEventReplayCommand
+from src.services.event import SlackEventReplayProgress, SlackEventReplayService
+
+logger = logging.getLogger(__name__)
+
+
+def _to_ts(value: str) -> int:
+    """
+    accepts either unix epoch seconds or an ISO 8601 datetime, naive datetimes
+    are assumed to be in UTC, as is Slack's `event_time`.
+    """
+    if value.isdigit():
+        return int(value)
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="replay unacknowledged slack events within a time range."
+    )
+    parser.add_argument("--since", required=True, type=_to_ts)
+    parser.add_argument("--until", required=True, type=_to_ts)
+    parser.add_argument("--batch-size", default=500, type=int)
+    parser.add_argument(
+        "--rate", default=50.0, type=float, help="max events dispatched per second."
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="path to the checkpoint file, replay resumes from it if it exists.",
+    )
+    return parser.parse_args(argv)
+
+
+async def main(argv=None) -> SlackEventReplayProgress:
+    args = parse_args(argv)
+    command = SlackEventReplayCommand(
+        since_ts=args.since,
+        until_ts=args.until,
+        batch_size=args.batch_size,
+        rate=args.rate,
+        checkpoint_path=args.checkpoint,
+    )
+    started_at = time.monotonic()
+
+    def report(progress: SlackEventReplayProgress) -> None:
+        elapsed = time.monotonic() - started_at
+        print(
+            f"replayed: {progress.replayed} failed: {progress.failed} "
+            f"skipped: {progress.skipped} last: {progress.last_event_id} "
+            f"elapsed: {elapsed:.1f}s",
+            flush=True,
+        )
+
+    return await SlackEventReplayService().replay(command, on_progress=report)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
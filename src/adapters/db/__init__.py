@@ -1,16 +1,86 @@
-from sqlalchemy.engine.base import Engine
-from sqlalchemy.ext.asyncio import create_async_engine
+"""
+The DB engine is created on first use by `get_engine` and not at import,
+with the pool settings for the role of the process, see `configure_engine`.
+"""
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 
-from src.config import POSTGRES_URI
-
-engine: Engine = create_async_engine(
+from src.config import (
     POSTGRES_URI,
-    future=True,
-    echo=True,
-    max_overflow=1,  # TODO(@sanchitrk) remove after testing.
+    ZYG_DB_CONNECTION_BUDGET,
+    ZYG_DB_ECHO,
+    ZYG_DB_MAX_OVERFLOW,
+    ZYG_DB_POOL_PRE_PING,
+    ZYG_DB_POOL_RECYCLE,
+    ZYG_DB_POOL_SIZE,
+    ZYG_DB_SLOW_QUERY_LOG_SAMPLE_RATE,
+    ZYG_DB_SLOW_QUERY_MS,
+    ZYG_DB_STATEMENT_CACHE_SIZE,
+    ZYG_WEB_WORKERS,
+    ZYG_WORKER_DB_MAX_OVERFLOW,
+    ZYG_WORKER_DB_POOL_SIZE,
+)
+
+from .pool import TimedAsyncAdaptedQueuePool, instrument_pool
+from .querylog import QueryLog
+
+ROLE_WEB = "web"
+ROLE_WORKER = "worker"
+
+query_log = QueryLog(
+    slow_query_ms=ZYG_DB_SLOW_QUERY_MS,
+    log_sample_rate=ZYG_DB_SLOW_QUERY_LOG_SAMPLE_RATE,
 )
 
+_role = ROLE_WEB
+_engine: AsyncEngine | None = None
+
+
+def configure_engine(role: str) -> None:
+    """
+    Sets the role the engine is created for, before it is first used.
+    """
+    global _role
+    if _engine is not None:
+        raise RuntimeError("cannot configure the DB engine after it is created")
+    _role = role
+
+
+def engine_options(role: str) -> dict:
+    if role == ROLE_WORKER:
+        pool = {
+            "pool_size": ZYG_WORKER_DB_POOL_SIZE,
+            "max_overflow": ZYG_WORKER_DB_MAX_OVERFLOW,
+        }
+    elif ZYG_DB_CONNECTION_BUDGET:
+        # stay within the budget across all the web worker processes.
+        pool_size = max(1, int(ZYG_DB_CONNECTION_BUDGET) // ZYG_WEB_WORKERS)
+        pool = {"pool_size": pool_size, "max_overflow": 0}
+    else:
+        pool = {"pool_size": ZYG_DB_POOL_SIZE, "max_overflow": ZYG_DB_MAX_OVERFLOW}
+    return {
+        "echo": ZYG_DB_ECHO,
+        "poolclass": TimedAsyncAdaptedQueuePool,
+        "pool_recycle": ZYG_DB_POOL_RECYCLE,
+        "pool_pre_ping": ZYG_DB_POOL_PRE_PING,
+        "connect_args": {"prepared_statement_cache_size": ZYG_DB_STATEMENT_CACHE_SIZE},
+        **pool,
+    }
+
+
+def get_engine() -> AsyncEngine:
+    global _engine
+    if _engine is None:
+        engine = create_async_engine(POSTGRES_URI, future=True, **engine_options(_role))
+        instrument_pool(engine)
+        query_log.attach(engine)
+        _engine = engine
+    return _engine
+
 
-print("****************** DB engine created ******************")
-print(id(engine))
-print("****************** DB engine created ******************")
+def discard_engine_after_fork() -> None:
+    """
+    Drops the pool inherited from the parent process, if any, without closing
+    its connections, they still belong to the parent.
+    """
+    if _engine is not None:
+        _engine.sync_engine.dispose(close=False)
@@ -1,6 +1,9 @@
-from sqlalchemy.engine.base import Engine
+from typing import List, Tuple
 
-from src.adapters.db import engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.adapters.db import get_engine
+from src.config import ZYG_SLACK_EVENT_STORAGE
 from src.domain.models import (
     InSyncSlackChannel,
     InSyncSlackUser,
@@ -30,14 +33,29 @@ from .respositories import (
     TenantRepository,
     UserRepository,
 )
+from .storage import STORAGE_SLIM, compress_payload, slim_payload
 
 
 class SlackEventDBAdapter:
-    def __init__(self, engine: Engine = engine) -> None:
-        self.engine = engine
+    def __init__(
+        self,
+        engine: AsyncEngine | None = None,
+        storage: str = ZYG_SLACK_EVENT_STORAGE,
+    ) -> None:
+        self.engine = engine if engine is not None else get_engine()
+        self.storage = storage
 
     def _map_to_db_entity(self, slack_event: SlackEvent) -> SlackEventDBEntity:
         event = slack_event.event.to_dict() if slack_event.event else None
+        token = slack_event.token
+        payload = slack_event.payload
+        payload_zlib = None
+        # only a first capture has the callback payload as sent, an event read
+        # back is saved as stored, the upsert keeps its compressed payload.
+        if self.storage == STORAGE_SLIM and slack_event.event_id is None:
+            token = None
+            payload_zlib = compress_payload(payload)
+            payload = slim_payload(payload)
         return SlackEventDBEntity(
             event_id=slack_event.event_id,
             tenant_id=slack_event.tenant_id,
@@ -46,8 +64,9 @@ class SlackEventDBAdapter:
             event=event,
             event_dispatched_ts=slack_event.event_dispatched_ts,
             api_app_id=slack_event.api_app_id,
-            token=slack_event.token,
-            payload=slack_event.payload,
+            token=token,
+            payload=payload,
+            payload_zlib=payload_zlib,
             is_ack=slack_event.is_ack,
         )
 
@@ -77,10 +96,36 @@ class SlackEventDBAdapter:
                 result = self._map_to_domain(slack_event_entity)
         return result
 
+    async def find_unacked_after(
+        self,
+        since_ts: int,
+        until_ts: int,
+        after_ts: int | None = None,
+        after_event_id: str | None = None,
+        limit: int = 500,
+    ) -> List[SlackEventDBEntity]:
+        """
+        Returns the db entities as is and leaves mapping to domain to the caller,
+        so that a malformed payload does not stop the whole replay.
+
+        Each page is read in its own short transaction.
+        """
+        async with self.engine.begin() as conn:
+            return await SlackEventRepository(conn).find_unacked_after(
+                since_ts=since_ts,
+                until_ts=until_ts,
+                after_ts=after_ts,
+                after_event_id=after_event_id,
+                limit=limit,
+            )
+
+    def to_domain(self, slack_event_entity: SlackEventDBEntity) -> SlackEvent:
+        return self._map_to_domain(slack_event_entity)
+
 
 class TenantDBAdapter:
-    def __init__(self, engine: Engine = engine) -> None:
-        self.engine = engine
+    def __init__(self, engine: AsyncEngine | None = None) -> None:
+        self.engine = engine if engine is not None else get_engine()
 
     def _map_to_db_entity(self, tenant: Tenant) -> TenantDBEntity:
         return TenantDBEntity(
@@ -132,8 +177,8 @@ class TenantDBAdapter:
 
 
 class InSyncChannelDBAdapter:
-    def __init__(self, engine: Engine = engine) -> None:
-        self.engine = engine
+    def __init__(self, engine: AsyncEngine | None = None) -> None:
+        self.engine = engine if engine is not None else get_engine()
 
     def _map_to_db_entity(
         self, insync_slack_channel: InSyncSlackChannel
@@ -230,8 +275,8 @@ class InSyncChannelDBAdapter:
 
 
 class SlackChannelDBAdapter:
-    def __init__(self, engine: Engine = engine) -> None:
-        self.engine = engine
+    def __init__(self, engine: AsyncEngine | None = None) -> None:
+        self.engine = engine if engine is not None else get_engine()
 
     def _map_to_db_entity(self, slack_channel: SlackChannel) -> SlackChannelDBEntity:
         triage_channel = slack_channel.triage_channel
@@ -311,10 +356,28 @@ class SlackChannelDBAdapter:
             result = self._map_to_domain(slack_channel_entity)
         return result
 
+    async def find_with_issue_by_slack_channel_ref_message_ts(
+        self, tenant_id: str, slack_channel_ref: str, slack_message_ts: str
+    ) -> Tuple[SlackChannel, Issue | None] | None:
+        async with self.engine.begin() as conn:
+            result = await SlackChannelRepository(
+                conn
+            ).find_with_issue_by_tenant_id_slack_channel_ref_message_ts(
+                tenant_id, slack_channel_ref, slack_message_ts
+            )
+        if result is None:
+            return None
+        slack_channel_entity, issue_entity = result
+        slack_channel = self._map_to_domain(slack_channel_entity)
+        if issue_entity is None:
+            return slack_channel, None
+        issue = IssueDBAdapter(self.engine)._map_to_domain(issue_entity)
+        return slack_channel, issue
+
 
 class IssueDBAdapter:
-    def __init__(self, engine: Engine = engine) -> None:
-        self.engine = engine
+    def __init__(self, engine: AsyncEngine | None = None) -> None:
+        self.engine = engine if engine is not None else get_engine()
 
     def _map_to_db_entity(self, issue: Issue) -> IssueDBEntity:
         return IssueDBEntity(
@@ -370,8 +433,8 @@ class IssueDBAdapter:
 
 
 class InSyncSlackUserDBAdapter:
-    def __init__(self, engine: Engine = engine) -> None:
-        self.engine = engine
+    def __init__(self, engine: AsyncEngine | None = None) -> None:
+        self.engine = engine if engine is not None else get_engine()
 
     def _map_to_db_entity(
         self, insync_slack_user: InSyncSlackUser
@@ -438,8 +501,8 @@ class InSyncSlackUserDBAdapter:
 
 
 class UserDBAdapter:
-    def __init__(self, engine: Engine = engine) -> None:
-        self.engine = engine
+    def __init__(self, engine: AsyncEngine | None = None) -> None:
+        self.engine = engine if engine is not None else get_engine()
 
     def _map_to_db_entity(self, user: User) -> UserDBEntity:
         return UserDBEntity(
@@ -500,3 +563,9 @@ class UserDBAdapter:
                 return None
             result = self._map_to_domain(user_entity)
         return result
+
+    async def find_all_by_tenant_id(self, tenant_id: str) -> List[User]:
+        async with self.engine.begin() as conn:
+            user_entities = await UserRepository(conn).find_all_by_tenant_id(tenant_id)
+            results = [self._map_to_domain(e) for e in user_entities]
+        return results
@@ -30,8 +30,9 @@ class SlackEventDBEntity(DBEntity):
     inner_event_type: str | None = None
     event_dispatched_ts: int
     api_app_id: str
-    token: str
+    token: str | None = None  # not kept when stored slim.
     payload: dict
+    payload_zlib: bytes | None = None  # full payload when stored slim.
     is_ack: bool = False
 
 
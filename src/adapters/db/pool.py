@@ -0,0 +1,58 @@
+import time
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.metrics import Gauge, Histogram
+
+DB_POOL_CHECKOUT_WAIT_SECONDS = Histogram(
+    "zyg_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool, "
+    + "includes connecting when the pool grows.",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+
+DB_POOL_SIZE = Gauge("zyg_db_pool_size", "Configured size of the DB pool.")
+DB_POOL_CHECKED_OUT = Gauge(
+    "zyg_db_pool_checked_out", "DB connections currently checked out."
+)
+DB_POOL_OVERFLOW = Gauge(
+    "zyg_db_pool_overflow", "DB connections opened beyond the pool size."
+)
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Same as the default pool for async engines, but records how long
+    each checkout waited for a connection.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT_SECONDS.observe(time.perf_counter() - started)
+
+
+def instrument_pool(engine: AsyncEngine) -> None:
+    """
+    Pool stats are read at collection time. We read `engine.pool` every time
+    as the pool is replaced when the engine is disposed.
+    """
+    sync_engine = engine.sync_engine
+    DB_POOL_SIZE.set_function(lambda: sync_engine.pool.size())
+    DB_POOL_CHECKED_OUT.set_function(lambda: sync_engine.pool.checkedout())
+    DB_POOL_OVERFLOW.set_function(lambda: sync_engine.pool.overflow())
+
+
+def pool_saturation(engine: AsyncEngine) -> float:
+    """
+    Share of the connections the pool can open that are checked out,
+    1.0 means the next checkout waits.
+    """
+    pool = engine.sync_engine.pool
+    capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+    if capacity <= 0:
+        return 0.0
+    return pool.checkedout() / capacity
@@ -0,0 +1,132 @@
+"""
+Times every SQL statement run by the engine, logs the slow ones and keeps
+aggregates per query fingerprint.
+
+A fingerprint is the statement with literals replaced and whitespace
+collapsed, so that the same query with different values is aggregated together.
+"""
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![$\w])\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# max distinct statements for which the fingerprint is remembered.
+_MAX_FINGERPRINT_CACHE = 1024
+# durations kept per fingerprint to compute percentiles.
+_MAX_SAMPLES = 512
+
+
+def fingerprint(statement: str) -> str:
+    fp = _STRING_LITERAL.sub("?", statement)
+    fp = _NUMBER_LITERAL.sub("?", fp)
+    fp = _IN_LIST.sub("(?+)", fp)
+    return _WHITESPACE.sub(" ", fp).strip().lower()
+
+
+class QueryStats:
+    __slots__ = ("fingerprint", "count", "total", "max", "samples")
+
+    def __init__(self, fingerprint: str) -> None:
+        self.fingerprint = fingerprint
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: Deque[float] = deque(maxlen=_MAX_SAMPLES)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        samples = sorted(self.samples)
+        if not samples:
+            return 0.0
+        index = min(len(samples) - 1, int(round(q * (len(samples) - 1))))
+        return samples[index]
+
+    def to_dict(self) -> dict:
+        return {
+            "fingerprint": self.fingerprint,
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0,
+            "p95_ms": round(self.percentile(0.95) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class QueryLog:
+    def __init__(self, slow_query_ms: float, log_sample_rate: float = 1.0) -> None:
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.log_sample_rate = log_sample_rate
+        self._fingerprints: Dict[str, str] = {}
+        self._stats: Dict[str, QueryStats] = {}
+        self._lock = threading.Lock()
+
+    def _fingerprint(self, statement: str) -> str:
+        fp = self._fingerprints.get(statement, None)
+        if fp is None:
+            fp = fingerprint(statement)
+            if len(self._fingerprints) >= _MAX_FINGERPRINT_CACHE:
+                self._fingerprints.clear()
+            self._fingerprints[statement] = fp
+        return fp
+
+    def record(self, statement: str, seconds: float) -> None:
+        fp = self._fingerprint(statement)
+        with self._lock:
+            stats = self._stats.get(fp, None)
+            if stats is None:
+                stats = self._stats[fp] = QueryStats(fp)
+            stats.add(seconds)
+
+        if seconds < self.slow_query_seconds:
+            return
+        if self.log_sample_rate < 1.0 and random.random() >= self.log_sample_rate:
+            return
+        # parameters are never logged, they can carry whole slack payloads.
+        logger.warning(f"slow query took {seconds * 1000:.1f}ms: {fp}")
+
+    def stats(self, limit: int = 50) -> List[dict]:
+        """returns aggregates of the most expensive queries by total time."""
+        with self._lock:
+            items = sorted(self._stats.values(), key=lambda s: s.total, reverse=True)
+            return [s.to_dict() for s in items[:limit]]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        context._zyg_query_started = time.perf_counter()
+
+    def _after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        started = getattr(context, "_zyg_query_started", None)
+        if started is None:
+            return
+        self.record(statement, time.perf_counter() - started)
+
+    def attach(self, engine: AsyncEngine) -> None:
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
@@ -1,6 +1,7 @@
 import abc
 import json
 import uuid
+from typing import List, Tuple
 
 from sqlalchemy import Connection
 from sqlalchemy.exc import IntegrityError
@@ -210,12 +211,12 @@ class SlackEventRepository(AbstractSlackEventRepository, BaseRepository):
             insert into slack_event (
                 event_id, tenant_id, slack_event_ref,
                 inner_event_type, event_dispatched_ts, api_app_id,
-                token, payload, is_ack
+                token, payload, payload_zlib, is_ack
             )
             values (
                 :event_id, :tenant_id, :slack_event_ref,
                 :inner_event_type, :event_dispatched_ts, :api_app_id,
-                :token, :payload, :is_ack
+                :token, :payload, :payload_zlib, :is_ack
             )
             on conflict (event_id) do update set
                 tenant_id = :tenant_id,
@@ -225,11 +226,10 @@ class SlackEventRepository(AbstractSlackEventRepository, BaseRepository):
                 api_app_id = :api_app_id,
                 token = :token,
                 payload = :payload,
+                payload_zlib = coalesce(excluded.payload_zlib, slack_event.payload_zlib),
                 is_ack = :is_ack,
                 updated_at = now()
-            returning event_id, tenant_id, slack_event_ref,
-                inner_event_type, event_dispatched_ts, api_app_id,
-                token, payload, is_ack, created_at, updated_at
+            returning event_id, created_at, updated_at
         """
         parameters = {
             "event_id": slack_event.event_id,
@@ -242,6 +242,7 @@ class SlackEventRepository(AbstractSlackEventRepository, BaseRepository):
             "payload": json.dumps(slack_event.payload)
             if isinstance(slack_event.payload, dict)
             else None,
+            "payload_zlib": slack_event.payload_zlib,
             "is_ack": slack_event.is_ack,
         }
         try:
@@ -256,7 +257,8 @@ class SlackEventRepository(AbstractSlackEventRepository, BaseRepository):
             # Having custom exceptions for database related exceptions
             # also helps us to have a better control over the error handling.
             raise DBIntegrityException(e)
-        return SlackEventDBEntity(**result)
+        # the payload is not returned, no need to send it back over the wire.
+        return slack_event.model_copy(update=dict(result))
 
     async def _insert(self, slack_event: SlackEventDBEntity) -> SlackEventDBEntity:
         event_id = self.generate_id()
@@ -264,16 +266,14 @@ class SlackEventRepository(AbstractSlackEventRepository, BaseRepository):
             insert into slack_event (
                 event_id, tenant_id, slack_event_ref,
                 inner_event_type, event_dispatched_ts, api_app_id,
-                token, payload, is_ack
+                token, payload, payload_zlib, is_ack
             )
             values (
                 :event_id, :tenant_id, :slack_event_ref,
                 :inner_event_type, :event_dispatched_ts, :api_app_id,
-                :token, :payload, :is_ack
+                :token, :payload, :payload_zlib, :is_ack
             )
-            returning event_id, tenant_id, slack_event_ref,
-                inner_event_type, event_dispatched_ts, api_app_id,
-                token, payload, is_ack, created_at, updated_at
+            returning event_id, created_at, updated_at
         """
         parameters = {
             "event_id": event_id,
@@ -286,6 +286,7 @@ class SlackEventRepository(AbstractSlackEventRepository, BaseRepository):
             "payload": json.dumps(slack_event.payload)
             if isinstance(slack_event.payload, dict)
             else None,
+            "payload_zlib": slack_event.payload_zlib,
             "is_ack": slack_event.is_ack,
         }
         try:
@@ -300,13 +301,51 @@ class SlackEventRepository(AbstractSlackEventRepository, BaseRepository):
             # Having custom exceptions for database related exceptions
             # also helps us to have a better control over the error handling.
             raise DBIntegrityException(e)
-        return SlackEventDBEntity(**result)
+        # the payload is not returned, no need to send it back over the wire.
+        return slack_event.model_copy(update=dict(result))
 
     async def save(self, slack_event: SlackEventDBEntity) -> SlackEventDBEntity:
         if slack_event.event_id is None:
             return await self._insert(slack_event)
         return await self._upsert(slack_event)
 
+    async def find_unacked_after(
+        self,
+        since_ts: int,
+        until_ts: int,
+        after_ts: int | None = None,
+        after_event_id: str | None = None,
+        limit: int = 500,
+    ) -> List[SlackEventDBEntity]:
+        """
+        Returns the next `limit` unacknowledged slack events dispatched within
+        the time range, right after the row `(after_ts, after_event_id)`.
+
+        Rows are ordered by `(event_dispatched_ts, event_id)`, pass the last row
+        of a page to get the next one, nothing is held open between pages.
+        """
+        query = """
+            select event_id, tenant_id, slack_event_ref,
+                inner_event_type, event_dispatched_ts, api_app_id,
+                token, payload, is_ack, created_at, updated_at
+            from slack_event
+            where is_ack = false
+            and event_dispatched_ts >= :since_ts
+            and event_dispatched_ts <= :until_ts
+            and (event_dispatched_ts, event_id) > (:after_ts, :after_event_id)
+            order by event_dispatched_ts, event_id
+            limit :limit
+        """
+        parameters = {
+            "since_ts": since_ts,
+            "until_ts": until_ts,
+            "after_ts": after_ts if after_ts is not None else since_ts - 1,
+            "after_event_id": after_event_id if after_event_id is not None else "",
+            "limit": limit,
+        }
+        rows = await self.conn.execute(statement=text(query), parameters=parameters)
+        return [SlackEventDBEntity(**result) for result in rows.mappings()]
+
 
 class AbstractInSyncChannelRepository(abc.ABC):
     @abc.abstractmethod
@@ -676,6 +715,63 @@ class SlackChannelRepository(AbstractSlackChannelRepository, BaseRepository):
             return None
         return SlackChannelDBEntity(**result)
 
+    async def find_with_issue_by_tenant_id_slack_channel_ref_message_ts(
+        self, tenant_id: str, slack_channel_ref: str, slack_message_ts: str
+    ) -> Tuple[SlackChannelDBEntity, IssueDBEntity | None] | None:
+        """
+        Finds the linked slack channel along with the issue, if any, for the
+        slack message in a single round trip.
+        """
+        query = """
+            select sc.tenant_id, sc.slack_channel_id, sc.slack_channel_ref,
+                sc.slack_channel_name, sc.triage_slack_channel_ref,
+                sc.triage_slack_channel_name, sc.created_at, sc.updated_at,
+                i.issue_id, i.issue_number, i.slack_message_ts, i.body,
+                i.status, i.priority, i.tags,
+                i.created_at as issue_created_at, i.updated_at as issue_updated_at
+            from slack_channel sc
+            left join issue i
+                on i.slack_channel_id = sc.slack_channel_id
+                and i.slack_message_ts = :slack_message_ts
+            where sc.tenant_id = :tenant_id
+            and sc.slack_channel_ref = :slack_channel_ref
+        """
+        parameters = {
+            "tenant_id": tenant_id,
+            "slack_channel_ref": slack_channel_ref,
+            "slack_message_ts": slack_message_ts,
+        }
+        rows = await self.conn.execute(statement=text(query), parameters=parameters)
+        result = rows.mappings().first()
+        if result is None:
+            return None
+        slack_channel = SlackChannelDBEntity(
+            tenant_id=result["tenant_id"],
+            slack_channel_id=result["slack_channel_id"],
+            slack_channel_ref=result["slack_channel_ref"],
+            slack_channel_name=result["slack_channel_name"],
+            triage_slack_channel_ref=result["triage_slack_channel_ref"],
+            triage_slack_channel_name=result["triage_slack_channel_name"],
+            created_at=result["created_at"],
+            updated_at=result["updated_at"],
+        )
+        if result["issue_id"] is None:
+            return slack_channel, None
+        issue = IssueDBEntity(
+            tenant_id=result["tenant_id"],
+            issue_id=result["issue_id"],
+            issue_number=result["issue_number"],
+            slack_channel_id=result["slack_channel_id"],
+            slack_message_ts=result["slack_message_ts"],
+            body=result["body"],
+            status=result["status"],
+            priority=result["priority"],
+            tags=result["tags"],
+            created_at=result["issue_created_at"],
+            updated_at=result["issue_updated_at"],
+        )
+        return slack_channel, issue
+
 
 class AbstractIssueRepository(abc.ABC):
     @abc.abstractmethod
@@ -1056,6 +1152,18 @@ class UserRepository(AbstractUserRepository, BaseRepository):
             return None
         return UserDBEntity(**result)
 
+    async def find_all_by_tenant_id(self, tenant_id: str) -> List[UserDBEntity]:
+        query = """
+            select user_id, tenant_id, slack_user_ref, name, role,
+            created_at, updated_at
+            from zyguser
+            where tenant_id = :tenant_id
+            order by slack_user_ref
+        """
+        parameters = {"tenant_id": tenant_id}
+        rows = await self.conn.execute(statement=text(query), parameters=parameters)
+        return [UserDBEntity(**result) for result in rows.mappings()]
+
     async def get_by_id(self, user_id: str) -> UserDBEntity:
         user = await self.find_by_user_id(user_id)
         if user is None:
@@ -0,0 +1,38 @@
+"""
+Storage formats for captured slack event payloads, see `ZYG_SLACK_EVENT_STORAGE`.
+
+`full`  the callback payload as is in `payload`.
+`slim`  only what handling the event needs in `payload`, and the callback
+        payload as is, zlib compressed, in `payload_zlib`, read it back with
+        `decompress_payload`.
+"""
+import json
+import zlib
+
+STORAGE_FULL = "full"
+STORAGE_SLIM = "slim"
+
+# top level callback keys kept in the slim payload, notably leaves out
+# `authorizations` and `token`.
+_SLIM_KEYS = ("event_id", "event_time", "team_id", "api_app_id", "type")
+
+# inner event keys left out of the slim payload, available in the full payload.
+_SLIM_DROPPED_EVENT_KEYS = frozenset(("blocks", "attachments"))
+
+
+def slim_payload(payload: dict) -> dict:
+    slim = {k: payload[k] for k in _SLIM_KEYS if k in payload}
+    inner_event = payload.get("event", None)
+    if isinstance(inner_event, dict):
+        slim["event"] = {
+            k: v for k, v in inner_event.items() if k not in _SLIM_DROPPED_EVENT_KEYS
+        }
+    return slim
+
+
+def compress_payload(payload: dict) -> bytes:
+    return zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+
+def decompress_payload(data: bytes) -> dict:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
@@ -10,8 +10,11 @@ from src.application.commands.api import (
     FindIssueBySlackChannelIdMessageTsAPICommand,
     FindSlackChannelByRefAPICommand,
     FindUserByRefAPICommand,
+    ListUserAPICommand,
+    ResolveEventContextAPICommand,
 )
 from src.config import ZYG_BASE_URL
+from src.correlation import CORRELATION_ID_HEADER, get_correlation_id
 from src.domain.models import TenantContext
 
 from .exceptions import (
@@ -20,9 +23,12 @@ from .exceptions import (
     FindSlackChannelAPIError,
     FindUserAPIError,
     IssueNotFoundAPIError,
+    ListUserAPIError,
+    ResolveEventContextAPIError,
     SlackChannelNotFoundAPIError,
     UserNotFoundAPIError,
 )
+from .transport import AbstractTransport, default_transport
 
 logger = logging.getLogger(__name__)
 
@@ -48,17 +54,37 @@ class WebAPIBaseConnector:
 
 
 class ZygWebAPIConnector(WebAPIBaseConnector):
-    def __init__(self, tenant_context: TenantContext, base_url=ZYG_BASE_URL) -> None:
+    """
+    Calls Zyg's own APIs through a transport, over HTTP or in-process,
+    see `ZYG_API_TRANSPORT`.
+    """
+
+    def __init__(
+        self,
+        tenant_context: TenantContext,
+        base_url=ZYG_BASE_URL,
+        transport: AbstractTransport | None = None,
+    ) -> None:
         self.tenant_context = tenant_context
         self.base_url = base_url
+        self.transport = (
+            transport if transport is not None else default_transport(base_url)
+        )
+
+    def headers(self) -> dict:
+        """
+        Sends the correlation id along, in-process calls share the context.
+        """
+        correlation_id = get_correlation_id()
+        if correlation_id is None:
+            return {}
+        return {CORRELATION_ID_HEADER: correlation_id}
 
     async def create_issue(self, command: CreateIssueAPICommand) -> dict:
         try:
-            response = httpx.post(
-                f"{self.base_url}/issues/",
-                headers={
-                    "content-type": "application/json",
-                },
+            response = await self.transport.post(
+                "/issues/",
+                headers=self.headers(),
                 json={
                     "tenant_id": command.tenant_id,
                     "slack_channel_id": command.slack_channel_id,
@@ -83,12 +109,11 @@ class ZygWebAPIConnector(WebAPIBaseConnector):
         self, command: FindIssueBySlackChannelIdMessageTsAPICommand
     ) -> List | None:
         try:
-            response = httpx.post(
-                f"{self.base_url}/issues/:search/",
-                headers={
-                    "content-type": "application/json",
-                },
+            response = await self.transport.post(
+                "/issues/:search/",
+                headers=self.headers(),
                 json={
+                    "tenant_id": command.tenant_id,
                     "slack_channel_id": command.slack_channel_id,
                     "slack_message_ts": command.slack_message_ts,
                 },
@@ -126,12 +151,11 @@ class ZygWebAPIConnector(WebAPIBaseConnector):
         Unlike get we raise an error if not found.
         """
         try:
-            response = httpx.post(
-                f"{self.base_url}/tenants/channels/linked/:search/",
-                headers={
-                    "content-type": "application/json",
-                },
+            response = await self.transport.post(
+                "/tenants/channels/linked/:search/",
+                headers=self.headers(),
                 json={
+                    "tenant_id": command.tenant_id,
                     "slack_channel_ref": command.slack_channel_ref,
                 },
             )
@@ -164,6 +188,40 @@ class ZygWebAPIConnector(WebAPIBaseConnector):
             )
         return items[0]
 
+    async def resolve_event_context(
+        self, command: ResolveEventContextAPICommand
+    ) -> dict | None:
+        """
+        Returns the linked slack channel and the issue, if any, for the slack
+        message as `{"slack_channel": ..., "issue": ...}`.
+
+        Returns None if the slack channel is not linked.
+        """
+        try:
+            response = await self.transport.post(
+                "/tenants/channels/linked/:resolve/",
+                headers=self.headers(),
+                json={
+                    "tenant_id": command.tenant_id,
+                    "slack_channel_ref": command.slack_channel_ref,
+                    "slack_message_ts": command.slack_message_ts,
+                },
+            )
+            items = self.respond(response)
+            if len(items) == 0:
+                return None
+            return items[0]
+        except httpx.HTTPError as exc:
+            logger.error(f"HTTP Exception for {exc.request.url} - {exc}")
+            raise ResolveEventContextAPIError(
+                "Request failed to resolve event context at HTTP level"
+            ) from exc
+        except WebAPIException as exc:
+            logger.error(f"Web API Exception for {exc}")
+            raise ResolveEventContextAPIError(
+                "Request failed to resolve event context"
+            ) from exc
+
     async def find_user_by_slack_ref(
         self, command: FindUserByRefAPICommand
     ) -> List | None:
@@ -172,12 +230,11 @@ class ZygWebAPIConnector(WebAPIBaseConnector):
         Unlike get we raise an error if not found.
         """
         try:
-            response = httpx.post(
-                f"{self.base_url}/tenants/users/:search/",
-                headers={
-                    "content-type": "application/json",
-                },
+            response = await self.transport.post(
+                "/tenants/users/:search/",
+                headers=self.headers(),
                 json={
+                    "tenant_id": command.tenant_id,
                     "slack_user_ref": command.slack_user_ref,
                 },
             )
@@ -203,3 +260,23 @@ class ZygWebAPIConnector(WebAPIBaseConnector):
         if items is None:
             raise UserNotFoundAPIError("No user found for the provided reference")
         return items[0]
+
+    async def list_users(self, command: ListUserAPICommand) -> List:
+        """
+        Returns all the users of the tenant.
+        """
+        try:
+            response = await self.transport.post(
+                "/tenants/users/:list/",
+                headers=self.headers(),
+                json={"tenant_id": command.tenant_id},
+            )
+            return self.respond(response)
+        except httpx.HTTPError as exc:
+            logger.error(f"HTTP Exception for {exc.request.url} - {exc}")
+            raise ListUserAPIError(
+                "Request failed to list users at HTTP level"
+            ) from exc
+        except WebAPIException as e:
+            logger.error(f"Web API Exception for {e}")
+            raise ListUserAPIError("Request failed to list users") from e
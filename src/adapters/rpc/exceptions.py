@@ -30,5 +30,13 @@ class FindUserAPIError(Exception):
     pass
 
 
+class ListUserAPIError(Exception):
+    pass
+
+
 class IssueNotFoundAPIError(Exception):
     pass
+
+
+class ResolveEventContextAPIError(Exception):
+    pass
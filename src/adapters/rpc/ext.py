@@ -13,6 +13,7 @@ from src.application.commands.slack import (
     NudgePostMessageCommand,
     ReplyPostMessageCommand,
 )
+from src.config import SLACK_API_BASE_URL
 from src.domain.models import (
     InSyncSlackChannel,
     InSyncSlackUser,
@@ -103,8 +104,8 @@ class SlackChannelMessageItemResponse(BaseModel):
 
 
 class SlackWebAPI:
-    def __init__(self, token: str) -> None:
-        self._client = WebClient(token=token)
+    def __init__(self, token: str, base_url: str = SLACK_API_BASE_URL) -> None:
+        self._client = WebClient(token=token, base_url=base_url)
 
     def chat_post_message(
         self,
@@ -262,9 +263,14 @@ class SlackWebAPIConnector(SlackWebAPI):
     - https://api.slack.com/events/message
     """
 
-    def __init__(self, tenant_context: TenantContext, token: str) -> None:
+    def __init__(
+        self,
+        tenant_context: TenantContext,
+        token: str,
+        base_url: str = SLACK_API_BASE_URL,
+    ) -> None:
         self.tenant_context = tenant_context  # TODO: raad token later from here.
-        super().__init__(token=token)
+        super().__init__(token=token, base_url=base_url)
 
     def get_channels(self, command: GetChannelsCommand) -> List[InSyncSlackChannel]:
         result = self.conversation_list(types=command.types)
@@ -0,0 +1,190 @@
+"""
+Transports for `ZygWebAPIConnector`.
+
+`HTTPTransport` calls the web app over HTTP. `InProcessTransport` invokes the
+same services the web app routes to, in the calling process, and returns the
+same representation as the web app would, saving a network hop, JSON encoding
+and a web worker slot per call.
+"""
+import abc
+import logging
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+import httpx
+
+from src.config import ZYG_API_TRANSPORT, ZYG_BASE_URL
+
+logger = logging.getLogger(__name__)
+
+
+class TransportResponse:
+    """
+    Quacks like the parts of `httpx.Response` the connector relies on.
+    """
+
+    def __init__(self, status_code: int, data: Any) -> None:
+        self.status_code = status_code
+        self._data = data
+
+    def json(self) -> Any:
+        return self._data
+
+
+class AbstractTransport(abc.ABC):
+    @abc.abstractmethod
+    async def post(
+        self, path: str, json: dict, headers: dict | None = None
+    ) -> httpx.Response | TransportResponse:
+        raise NotImplementedError
+
+
+class HTTPTransport(AbstractTransport):
+    def __init__(self, base_url: str = ZYG_BASE_URL) -> None:
+        self.base_url = base_url
+
+    async def post(
+        self, path: str, json: dict, headers: dict | None = None
+    ) -> httpx.Response:
+        return httpx.post(
+            f"{self.base_url}{path}",
+            headers={
+                "content-type": "application/json",
+                **(headers or {}),
+            },
+            json=json,
+        )
+
+
+async def _create_issue(body: dict) -> Tuple[int, Any]:
+    from src.application.commands import CreateIssueCommand
+    from src.application.repr.api import issue_repr
+    from src.services.issue import CreateIssueService
+
+    command = CreateIssueCommand(
+        tenant_id=body["tenant_id"],
+        slack_channel_id=body["slack_channel_id"],
+        slack_message_ts=body["slack_message_ts"],
+        body=body["body"],
+        status=body.get("status"),
+        priority=body.get("priority"),
+        tags=body.get("tags"),
+    )
+    issue = await CreateIssueService().create(command)
+    return HTTPStatus.CREATED, issue_repr(issue).model_dump()
+
+
+async def _search_issue(body: dict) -> Tuple[int, Any]:
+    from src.application.commands import SearchIssueCommand
+    from src.application.repr.api import issue_repr
+    from src.services.issue import CreateIssueService
+
+    command = SearchIssueCommand(
+        tenant_id=body["tenant_id"],
+        issue_id=body.get("issue_id"),
+        issue_number=body.get("issue_number"),
+        slack_channel_id=body.get("slack_channel_id"),
+        slack_message_ts=body.get("slack_message_ts"),
+    )
+    result = await CreateIssueService().search(command)
+    if result is None:
+        return HTTPStatus.OK, []
+    return HTTPStatus.OK, [issue_repr(result).model_dump()]
+
+
+async def _search_slack_channel(body: dict) -> Tuple[int, Any]:
+    from src.application.commands import SearchSlackChannelCommand
+    from src.application.repr.api import slack_channel_repr
+    from src.services.channel import SlackChannelService
+
+    command = SearchSlackChannelCommand(
+        tenant_id=body["tenant_id"],
+        slack_channel_id=body.get("slack_channel_id"),
+        slack_channel_name=body.get("slack_channel_name"),
+        slack_channel_ref=body.get("slack_channel_ref"),
+    )
+    result = await SlackChannelService().search(command)
+    if result is None:
+        return HTTPStatus.OK, []
+    return HTTPStatus.OK, [slack_channel_repr(result).model_dump()]
+
+
+async def _resolve_event_context(body: dict) -> Tuple[int, Any]:
+    from src.application.commands import ResolveEventContextCommand
+    from src.application.repr.api import event_context_repr
+    from src.services.channel import SlackChannelService
+
+    command = ResolveEventContextCommand(
+        tenant_id=body["tenant_id"],
+        slack_channel_ref=body["slack_channel_ref"],
+        slack_message_ts=body["slack_message_ts"],
+    )
+    result = await SlackChannelService().resolve_event_context(command)
+    if result is None:
+        return HTTPStatus.OK, []
+    slack_channel, issue = result
+    return HTTPStatus.OK, [event_context_repr(slack_channel, issue).model_dump()]
+
+
+async def _search_user(body: dict) -> Tuple[int, Any]:
+    from src.application.commands import SearchUserCommand
+    from src.application.repr.api import user_repr
+    from src.services.user import UserService
+
+    command = SearchUserCommand(
+        tenant_id=body["tenant_id"],
+        user_id=body.get("user_id"),
+        slack_user_ref=body.get("slack_user_ref"),
+    )
+    result = await UserService().search(command=command)
+    if result is None:
+        return HTTPStatus.OK, []
+    return HTTPStatus.OK, [user_repr(result).model_dump()]
+
+
+async def _list_users(body: dict) -> Tuple[int, Any]:
+    from src.application.commands import ListUserCommand
+    from src.application.repr.api import user_repr
+    from src.services.user import UserService
+
+    command = ListUserCommand(tenant_id=body["tenant_id"])
+    results = await UserService().list(command=command)
+    return HTTPStatus.OK, [user_repr(r).model_dump() for r in results]
+
+
+class InProcessTransport(AbstractTransport):
+    """
+    Maps the web app paths the connector uses to the services behind them.
+
+    Services are imported on first use, so that the worker only pulls in
+    the DB adapters when configured for in-process calls.
+    """
+
+    routes: Dict[str, Callable[[dict], Awaitable[Tuple[int, Any]]]] = {
+        "/issues/": _create_issue,
+        "/issues/:search/": _search_issue,
+        "/tenants/channels/linked/:search/": _search_slack_channel,
+        "/tenants/channels/linked/:resolve/": _resolve_event_context,
+        "/tenants/users/:search/": _search_user,
+        "/tenants/users/:list/": _list_users,
+    }
+
+    async def post(
+        self, path: str, json: dict, headers: dict | None = None
+    ) -> TransportResponse:
+        handler = self.routes.get(path, None)
+        if handler is None:
+            return TransportResponse(HTTPStatus.NOT_FOUND, None)
+        try:
+            status_code, data = await handler(json)
+        except Exception as e:
+            # same as an unhandled error in the web app.
+            logger.error(f"in-process call to `{path}` failed with error: {e}")
+            return TransportResponse(HTTPStatus.INTERNAL_SERVER_ERROR, None)
+        return TransportResponse(status_code, data)
+
+
+def default_transport(base_url: str = ZYG_BASE_URL) -> AbstractTransport:
+    if ZYG_API_TRANSPORT == "inprocess":
+        return InProcessTransport()
+    return HTTPTransport(base_url=base_url)
@@ -1,5 +1,8 @@
 from celery.app import Celery
 
+from src.profiling import is_profiling
+
+from .base import PROFILE_TASK_HEADER
 from .init import app
 
 
@@ -8,6 +11,10 @@ class Worker:
         self.celery: Celery = app
 
     def apply_async(self, task_name, *args, **kwargs):
+        if is_profiling():
+            # profiles the task too, e.g. for a profiled slack event request.
+            headers = kwargs.get("headers", None) or {}
+            kwargs["headers"] = {**headers, PROFILE_TASK_HEADER: True}
         return self.celery.tasks[task_name].apply_async(*args, **kwargs)
 
 
@@ -0,0 +1,26 @@
+from celery import Task
+
+from src.profiling import profile, should_profile
+
+# message header set on tasks dispatched from a profiled request or task.
+PROFILE_TASK_HEADER = "zyg_profile"
+
+
+class ProfiledTask(Task):
+    """
+    Base class of our tasks, profiles a sample of task runs and the tasks
+    dispatched with the `zyg_profile` header, see `src.profiling`.
+    """
+
+    def _is_forced(self) -> bool:
+        request = self.request
+        if getattr(request, PROFILE_TASK_HEADER, None):
+            return True
+        headers = getattr(request, "headers", None) or {}
+        return bool(headers.get(PROFILE_TASK_HEADER, None))
+
+    def __call__(self, *args, **kwargs):
+        if not should_profile(self._is_forced()):
+            return super().__call__(*args, **kwargs)
+        with profile(self.name):
+            return super().__call__(*args, **kwargs)
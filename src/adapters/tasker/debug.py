@@ -0,0 +1,59 @@
+"""
+Admin only debug endpoints of a worker process, served next to `/metrics`
+on the worker's metrics port, each prefork process has its own port.
+
+e.g. `curl -X POST -H "x-zyg-admin-token: ..." localhost:9100/memory/tracemalloc/`
+"""
+from typing import Any, Callable, Dict, Tuple
+
+from src.admin import ADMIN_TOKEN_HEADER, is_admin_token
+from src.memory import (
+    KEY_TYPES,
+    NoBaselineSnapshot,
+    TracemallocNotStarted,
+    memory_tracker,
+)
+from src.metrics import RouteHandler, add_route
+
+
+def _is_admin(headers) -> bool:
+    return is_admin_token(headers.get(ADMIN_TOKEN_HEADER, None))
+
+
+def _stats(func: Callable[..., list]) -> RouteHandler:
+    def handler(query: Dict[str, str]) -> Tuple[int, Any]:
+        key_type = query.get("key_type", "lineno")
+        if key_type not in KEY_TYPES:
+            return 400, {"detail": f"key_type must be one of: {KEY_TYPES}"}
+        try:
+            stats = func(limit=int(query.get("limit", "25")), key_type=key_type)
+        except ValueError:
+            return 400, {"detail": "limit must be an integer."}
+        except (TracemallocNotStarted, NoBaselineSnapshot) as e:
+            return 409, {"detail": str(e)}
+        return 200, {**memory_tracker.status(), "stats": stats}
+
+    return handler
+
+
+def _snapshot(query: Dict[str, str]) -> Tuple[int, Any]:
+    try:
+        return 200, memory_tracker.snapshot()
+    except TracemallocNotStarted as e:
+        return 409, {"detail": str(e)}
+
+
+def add_debug_routes() -> None:
+    """
+    Same as the `/admin/memory/` routes of the web app.
+    """
+    routes = [
+        ("GET", "/memory/", lambda query: (200, memory_tracker.status())),
+        ("POST", "/memory/tracemalloc/", lambda query: (200, memory_tracker.start())),
+        ("DELETE", "/memory/tracemalloc/", lambda query: (200, memory_tracker.stop())),
+        ("POST", "/memory/snapshots/", _snapshot),
+        ("GET", "/memory/top/", _stats(memory_tracker.top)),
+        ("GET", "/memory/diff/", _stats(memory_tracker.diff)),
+    ]
+    for method, path, handler in routes:
+        add_route(method, path, handler, authorize=_is_admin)
@@ -1,8 +1,5 @@
 import logging
-import logging.config
 import os
-import sys
-from logging import handlers
 
 from celery import signals
 
@@ -10,11 +7,13 @@ from celery import signals
 # https://docs.celeryq.dev/en/latest/index.html
 from celery.app import Celery
 
-_SYSLOG_PLATFORM_ADDRESS = {
-    "win32": ("localhost", 514),
-    "darwin": "/var/run/syslog",
-}
-
+from src.adapters.cache.remote import invalidation_listener
+from src.adapters.db import ROLE_WORKER, configure_engine
+from src.adapters.tasker.base import ProfiledTask
+from src.adapters.tasker.debug import add_debug_routes
+from src.config import ZYG_WORKER_MAX_MEMORY_MB, ZYG_WORKER_METRICS_PORT
+from src.logger import setup_logging
+from src.metrics import start_http_server
 
 redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
 
@@ -22,9 +21,14 @@ app = Celery(
     "zyg",
     broker=redis_url,
     backend=redis_url,
+    task_cls=ProfiledTask,
     broker_connection_retry_on_startup=True,  # disable deprecation warning
 )
 
+if ZYG_WORKER_MAX_MEMORY_MB > 0:
+    # checked after each task, the process is replaced once the task is done.
+    app.conf.worker_max_memory_per_child = ZYG_WORKER_MAX_MEMORY_MB * 1024  # KiB
+
 
 # Note:
 # We need to load task modules from all registered modules and packages.
@@ -39,26 +43,35 @@ app = Celery(
 # even if they have already been loaded before.
 
 
+@signals.worker_init.connect
+def configure_worker_engine(*args, **kwargs):
+    # before any task touches the DB, workers have their own pool settings.
+    # not at import, the web app imports this module to dispatch tasks.
+    configure_engine(ROLE_WORKER)
+
+
 @signals.after_setup_logger.connect
 def setup_loggers_for_root(*args, **kwargs):
-    logger = logging.getLogger()
-    formatter = logging.Formatter(
-        "[zyg:celery]|%(levelname)s|%(asctime)s|%(process)d|%(module)s|"
-        "%(filename)s:%(lineno)d|%(funcName)s|"
-        "%(message)s"
-    )
-    handler = logging.StreamHandler()
-    handler.setLevel(logging.INFO)
-    handler.setFormatter(formatter)
-
-    logger.addHandler(handler)
-
-    slh = handlers.SysLogHandler(
-        address=_SYSLOG_PLATFORM_ADDRESS.get(sys.platform, "/dev/log")
-    )
-    slh.setLevel(logging.INFO)
-    slh.setFormatter(formatter)
-    logger.addHandler(slh)
+    # logs go through a queue drained by a background thread,
+    # the writer is restarted in each forked worker process.
+    setup_logging(prefix="zyg:celery")
+
+
+@signals.worker_process_init.connect
+def start_metrics_server(*args, **kwargs):
+    if not ZYG_WORKER_METRICS_PORT:
+        return
+    add_debug_routes()
+    try:
+        start_http_server(int(ZYG_WORKER_METRICS_PORT), attempts=16)
+    except OSError as e:
+        logging.getLogger(__name__).warning(f"cannot serve worker metrics: {e}")
+
+
+@signals.worker_process_init.connect
+def start_invalidation_listener(*args, **kwargs):
+    # keeps the in-process caches of this worker process in sync.
+    invalidation_listener.start()
 
 
 app.autodiscover_tasks(["src.adapters.tasker.tasks"], force=True)
@@ -1,9 +1,12 @@
 import asyncio
 import logging
+import time
 from typing import Any, Dict
 
 from src.adapters.tasker.init import app
+from src.correlation import correlation_scope
 from src.domain.models import SlackEvent, Tenant
+from src.metrics import observe_slack_event_stage
 from src.tasks.event import event_handler
 
 logger = logging.getLogger(__name__)
@@ -11,15 +14,31 @@ logger = logging.getLogger(__name__)
 
 @app.task(bind=True, name="zyg.slack_event_handler")
 def slack_event_handler(self, context: Dict[str, Any], body: Dict[str, Any]):
+    # older tasks in the queue may not have a correlation id.
+    correlation_id = context.get("correlation_id", None) or context["dispatch_id"]
+    with correlation_scope(correlation_id):
+        return _handle_slack_event(context, body)
+
+
+def _handle_slack_event(context: Dict[str, Any], body: Dict[str, Any]) -> bool:
+    started_ts = time.time()
     dispatch_id = context["dispatch_id"]
     dispatched_at = context["dispatched_at"]
-    print(f"dispatch_id: {dispatch_id}")
-    print(f"dispatched_at: {dispatched_at}")
+    logger.info(f"dispatch_id: {dispatch_id} dispatched_at: {dispatched_at}")
 
     tenant = Tenant.from_dict(context["tenant"])
 
     event = body["event"]
     subscribed_event = event["subscribed_event"]
+
+    # older tasks in the queue may not have the latency checkpoints.
+    dispatched_ts = context.get("dispatched_ts", None)
+    event_time = context.get("event_time", None)
+    if dispatched_ts is not None:
+        observe_slack_event_stage(
+            "queue", tenant.tenant_id, subscribed_event, started_ts - dispatched_ts
+        )
+
     if SlackEvent.is_event_subscribed(subscribed_event):
         event_id = body["event_id"]
         payload = body["payload"]
@@ -29,9 +48,25 @@ def slack_event_handler(self, context: Dict[str, Any], body: Dict[str, Any]):
 
         handler = event_handler(subscribed_event)
         loop = asyncio.get_event_loop()
-        result = loop.run_until_complete(
-            handler(tenant=tenant, slack_event=slack_event)
-        )
+        try:
+            result = loop.run_until_complete(
+                handler(tenant=tenant, slack_event=slack_event)
+            )
+        finally:
+            finished_ts = time.time()
+            observe_slack_event_stage(
+                "handler",
+                tenant.tenant_id,
+                subscribed_event,
+                finished_ts - started_ts,
+            )
+            if event_time is not None:
+                observe_slack_event_stage(
+                    "end_to_end",
+                    tenant.tenant_id,
+                    subscribed_event,
+                    finished_ts - event_time,
+                )
 
         print(f"result: {result}")
     else:
@@ -0,0 +1,15 @@
+from fastapi import Header, HTTPException
+
+from src.admin import ADMIN_TOKEN_HEADER, is_admin_token
+
+__all__ = ["ADMIN_TOKEN_HEADER", "is_admin_token", "require_admin"]
+
+
+async def require_admin(
+    x_zyg_admin_token: str | None = Header(default=None),
+) -> None:
+    """
+    FastAPI dependency for admin only routes.
+    """
+    if not is_admin_token(x_zyg_admin_token):
+        raise HTTPException(status_code=403, detail="admin only.")
@@ -0,0 +1,99 @@
+"""
+Gunicorn settings for running the web app in production, e.g:
+
+    gunicorn -c src/adapters/web/gunicorn_conf.py src.adapters.web.server:app
+
+see `bin/server-prod.sh`, settings are read from `src.config`.
+
+Metrics are kept in each worker process, so `/metrics` on the app port only
+has the worker that served the scrape. With `ZYG_WEB_METRICS_PORT` each worker
+serves its own from the first free port from it on, scrape each of them as a
+target, e.g. ports 9100 to 9100 + 2 * `ZYG_WEB_WORKERS` - 1, as workers are
+restarted the ports are reused.
+
+Docs: https://docs.gunicorn.org/en/stable/settings.html
+"""
+import os
+import signal
+import threading
+
+from src.config import (
+    ZYG_WEB_BIND,
+    ZYG_WEB_GRACEFUL_TIMEOUT,
+    ZYG_WEB_MAX_MEMORY_MB,
+    ZYG_WEB_MAX_REQUESTS,
+    ZYG_WEB_MAX_REQUESTS_JITTER,
+    ZYG_WEB_METRICS_PORT,
+    ZYG_WEB_WORKERS,
+)
+
+bind = ZYG_WEB_BIND
+workers = ZYG_WEB_WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# the app is imported once in the master and shared copy-on-write by the
+# workers, they start faster and use less memory.
+preload_app = True
+
+# recycles workers to bound slow leaks, jitter keeps them from restarting at once.
+max_requests = ZYG_WEB_MAX_REQUESTS
+max_requests_jitter = ZYG_WEB_MAX_REQUESTS_JITTER
+
+# on HUP or TERM workers stop accepting and get this long to finish.
+graceful_timeout = ZYG_WEB_GRACEFUL_TIMEOUT
+timeout = ZYG_WEB_GRACEFUL_TIMEOUT + 30
+keepalive = 5
+
+# logs go through the app's logging, see `src.logger`.
+accesslog = None
+
+
+def post_fork(server, worker):
+    # each worker gets its own pool, never connections opened in the master.
+    from src.adapters.db import discard_engine_after_fork
+
+    discard_engine_after_fork()
+
+
+# seconds between checks of a worker's resident memory.
+_MEMORY_CHECK_INTERVAL = 15
+
+
+def _watch_memory(worker, max_bytes: int) -> None:
+    from src.memory import rss_bytes
+
+    stop = threading.Event()
+    while not stop.wait(_MEMORY_CHECK_INTERVAL):
+        rss = rss_bytes()
+        if rss > max_bytes:
+            worker.log.warning(
+                f"worker {worker.pid} uses {rss // 2**20}MB of memory, "
+                f"above {max_bytes // 2**20}MB, restarting"
+            )
+            # same as a graceful shutdown, the arbiter starts a new worker.
+            os.kill(worker.pid, signal.SIGTERM)
+            return
+
+
+def _start_metrics_server(worker) -> None:
+    from src.metrics import start_http_server
+
+    # room for the new workers started on reload while the old ones finish.
+    attempts = 2 * ZYG_WEB_WORKERS
+    try:
+        start_http_server(int(ZYG_WEB_METRICS_PORT), attempts=attempts)
+    except OSError as e:
+        worker.log.warning(f"cannot serve metrics of worker {worker.pid}: {e}")
+
+
+def post_worker_init(worker):
+    if ZYG_WEB_METRICS_PORT:
+        _start_metrics_server(worker)
+    if ZYG_WEB_MAX_MEMORY_MB <= 0:
+        return
+    threading.Thread(
+        target=_watch_memory,
+        args=(worker, ZYG_WEB_MAX_MEMORY_MB * 2**20),
+        name="zyg-memory-watch",
+        daemon=True,
+    ).start()
@@ -0,0 +1,176 @@
+"""
+Readiness probes of the web app's dependencies.
+
+Probes run in the background every `ZYG_HEALTH_PROBE_INTERVAL_SECONDS` and
+`/readyz` only reads the last results, so that load balancer checks cost
+nothing and do not pile up on a slow dependency.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from attrs import define
+from redis import Redis
+from sqlalchemy.sql import text
+
+from src.adapters.db import get_engine
+from src.adapters.db.pool import pool_saturation
+from src.config import (
+    REDIS_URL,
+    ZYG_HEALTH_POOL_SATURATION,
+    ZYG_HEALTH_PROBE_INTERVAL_SECONDS,
+    ZYG_HEALTH_PROBE_TIMEOUT_SECONDS,
+)
+from src.metrics import Gauge
+
+logger = logging.getLogger(__name__)
+
+HEALTH_PROBE_UP = Gauge(
+    "zyg_health_probe_up",
+    "Whether the last readiness probe passed, per probe.",
+    labelnames=("probe",),
+)
+
+# results older than this many intervals are stale, e.g. the loop is stuck.
+_STALE_INTERVALS = 3
+
+
+@define(frozen=True)
+class ProbeResult:
+    name: str
+    ok: bool
+    detail: str
+    checked_at: float
+
+    def as_dict(self) -> dict:
+        return {"ok": self.ok, "detail": self.detail}
+
+
+class HealthChecker:
+    """
+    Runs the probes concurrently, each bounded by `timeout`, and keeps the
+    last result of each.
+    """
+
+    def __init__(
+        self,
+        interval: float = ZYG_HEALTH_PROBE_INTERVAL_SECONDS,
+        timeout: float = ZYG_HEALTH_PROBE_TIMEOUT_SECONDS,
+        saturation: float = ZYG_HEALTH_POOL_SATURATION,
+    ) -> None:
+        self.interval = interval
+        self.timeout = timeout
+        self.saturation = saturation
+        self.results: Dict[str, ProbeResult] = {}
+        self._task: asyncio.Task | None = None
+        self._redis: Redis | None = None
+        self._probes: Dict[str, Callable[[], Awaitable[str]]] = {
+            "postgres": self._probe_postgres,
+            "db_pool": self._probe_db_pool,
+            "broker": self._probe_broker,
+        }
+        self._up = {name: HEALTH_PROBE_UP.labels(name) for name in self._probes}
+
+    async def _probe_postgres(self) -> str:
+        async with get_engine().connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return "connected"
+
+    async def _probe_db_pool(self) -> str:
+        saturation = pool_saturation(get_engine())
+        if saturation >= self.saturation:
+            raise RuntimeError(f"saturated at {saturation:.0%}")
+        return f"{saturation:.0%} checked out"
+
+    def _ping_broker(self) -> None:
+        # own client with short timeouts, the shared one can block for longer.
+        if self._redis is None:
+            self._redis = Redis.from_url(
+                REDIS_URL,
+                socket_timeout=self.timeout,
+                socket_connect_timeout=self.timeout,
+            )
+        self._redis.ping()
+
+    async def _probe_broker(self) -> str:
+        await asyncio.to_thread(self._ping_broker)
+        return "connected"
+
+    async def _run_probe(
+        self, name: str, probe: Callable[[], Awaitable[str]]
+    ) -> ProbeResult:
+        try:
+            detail = await asyncio.wait_for(probe(), timeout=self.timeout)
+            ok = True
+        except asyncio.TimeoutError:
+            ok, detail = False, f"timed out after {self.timeout}s"
+        except Exception as e:
+            ok, detail = False, str(e) or type(e).__name__
+        if not ok:
+            logger.warning(f"readiness probe `{name}` failed: {detail}")
+        self._up[name].set(1 if ok else 0)
+        return ProbeResult(name, ok, detail, time.monotonic())
+
+    async def refresh(self) -> List[ProbeResult]:
+        # the pool is read before the others run, the postgres probe holds a
+        # connection and would count towards the saturation, e.g. 100% with a
+        # pool of one connection.
+        results = [await self._run_probe("db_pool", self._probes["db_pool"])]
+        results += await asyncio.gather(
+            *(
+                self._run_probe(name, probe)
+                for name, probe in self._probes.items()
+                if name != "db_pool"
+            )
+        )
+        self.results = {r.name: r for r in results}
+        return results
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"error refreshing readiness probes: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="zyg-health")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._redis is not None:
+            self._redis.close()
+            self._redis = None
+
+    def readiness(self) -> tuple[bool, dict]:
+        """
+        Not ready before the first refresh, or when any result is stale.
+        """
+        now = time.monotonic()
+        max_age = self.interval * _STALE_INTERVALS
+        ready = bool(self.results)
+        probes = {}
+        for name in self._probes:
+            result = self.results.get(name, None)
+            if result is None:
+                ready = False
+                probes[name] = {"ok": False, "detail": "not checked yet"}
+                continue
+            probe = result.as_dict()
+            if now - result.checked_at > max_age:
+                probe = {"ok": False, "detail": "stale"}
+            ready = ready and probe["ok"]
+            probes[name] = probe
+        return ready, probes
+
+
+health_checker = HealthChecker()
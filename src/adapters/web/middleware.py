@@ -0,0 +1,203 @@
+import asyncio
+import time
+from typing import Dict, Iterable
+
+from starlette.routing import BaseRoute, Route
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.correlation import CORRELATION_ID_HEADER, correlation_scope, get_correlation_id
+from src.metrics import Counter, Gauge, Histogram
+from src.profiling import PROFILE_HEADER, profile, should_profile
+
+from .auth import ADMIN_TOKEN_HEADER, is_admin_token
+
+HTTP_REQUEST_DURATION_SECONDS = Histogram(
+    "zyg_http_request_duration_seconds",
+    "Latency of HTTP requests per route.",
+    labelnames=("method", "route"),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+HTTP_RESPONSES = Counter(
+    "zyg_http_responses",
+    "HTTP responses per route and status code.",
+    labelnames=("method", "route", "status"),
+)
+
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "zyg_http_requests_in_flight",
+    "HTTP requests currently being served.",
+)
+
+# label used for requests that did not match any route, like 404s.
+_UNMATCHED = "<unmatched>"
+
+# status codes we expect to see, their counters are created upfront.
+_PREALLOCATED_STATUSES = (200, 201, 400, 401, 403, 404, 409, 422, 500, 503)
+
+
+class _RouteMetrics:
+    __slots__ = ("method", "route", "latency", "statuses")
+
+    def __init__(self, method: str, route: str) -> None:
+        self.method = method
+        self.route = route
+        self.latency = HTTP_REQUEST_DURATION_SECONDS.labels(method, route)
+        self.statuses = {
+            status: HTTP_RESPONSES.labels(method, route, str(status))
+            for status in _PREALLOCATED_STATUSES
+        }
+
+    def record(self, status: int, seconds: float) -> None:
+        self.latency.observe(seconds, get_correlation_id())
+        counter = self.statuses.get(status, None)
+        if counter is None:
+            counter = HTTP_RESPONSES.labels(self.method, self.route, str(status))
+            self.statuses[status] = counter
+        counter.inc()
+
+
+class HTTPMetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, response codes and requests
+    in flight per route.
+
+    Metric children are resolved per route object and method, and created
+    upfront for the known routes, so that serving a request does not allocate
+    label values. Uses the route template, e.g. `/issues/:search/`, and not the
+    raw path to keep the label cardinality bounded.
+    """
+
+    def __init__(self, app: ASGIApp, routes: Iterable[BaseRoute] = ()) -> None:
+        self.app = app
+        # by `id` of the route, routes are not hashable and live as long as the app.
+        self._by_route: Dict[int, Dict[str, _RouteMetrics]] = {}
+        self._unmatched: Dict[str, _RouteMetrics] = {}
+        for route in routes:
+            if isinstance(route, Route) and route.methods:
+                for method in route.methods:
+                    self._route_metrics(route, method)
+
+    def _route_metrics(self, route: object, method: str) -> _RouteMetrics:
+        if route is None:
+            by_method = self._unmatched
+        else:
+            by_method = self._by_route.setdefault(id(route), {})
+        metrics = by_method.get(method, None)
+        if metrics is None:
+            path = getattr(route, "path", _UNMATCHED) if route else _UNMATCHED
+            metrics = _RouteMetrics(method, path)
+            by_method[method] = metrics
+        return metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # the router sets the matched route on the scope.
+            route = scope.get("route", None)
+            if route is None:
+                by_method = self._unmatched
+            else:
+                by_method = self._by_route.get(id(route), None)
+            metrics = by_method.get(scope["method"], None) if by_method else None
+            if metrics is None:
+                metrics = self._route_metrics(route, scope["method"])
+            metrics.record(status, elapsed)
+
+
+_CORRELATION_ID_HEADER = CORRELATION_ID_HEADER.encode("latin-1")
+
+
+class CorrelationIdMiddleware:
+    """
+    Pure ASGI middleware setting the correlation id for the request, the one
+    sent by the caller in `x-zyg-correlation-id`, e.g. the worker, or a new
+    one. The id is sent back in the response headers.
+
+    Must wrap `HTTPMetricsMiddleware` so that latencies get the id as exemplar.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        correlation_id = None
+        for name, value in scope["headers"]:
+            if name == _CORRELATION_ID_HEADER:
+                correlation_id = value.decode("latin-1")
+                break
+
+        with correlation_scope(correlation_id) as correlation_id:
+            header = (_CORRELATION_ID_HEADER, correlation_id.encode("latin-1"))
+
+            async def send_with_header(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    message["headers"] = [*message.get("headers", ()), header]
+                await send(message)
+
+            await self.app(scope, receive, send_with_header)
+
+
+_PROFILE_HEADER = PROFILE_HEADER.encode("latin-1")
+_ADMIN_TOKEN_HEADER = ADMIN_TOKEN_HEADER.encode("latin-1")
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware profiling a sample of requests, see `src.profiling`,
+    and requests sent by admins with the `x-zyg-profile: 1` header.
+
+    The path of the profile is sent back in the `x-zyg-profile` header.
+    Only the request's own task is sampled, sync endpoints run in the thread
+    pool and show up as `<awaiting>`.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    @staticmethod
+    def _is_forced(scope: Scope) -> bool:
+        asked, token = False, None
+        for name, value in scope["headers"]:
+            if name == _PROFILE_HEADER:
+                asked = value == b"1"
+            elif name == _ADMIN_TOKEN_HEADER:
+                token = value.decode("latin-1")
+        return asked and is_admin_token(token)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not should_profile(self._is_forced(scope)):
+            await self.app(scope, receive, send)
+            return
+
+        name = f"{scope['method']}{scope['path']}"
+        with profile(name, task=asyncio.current_task()) as path:
+            header = (_PROFILE_HEADER, path.encode("latin-1"))
+
+            async def send_with_header(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    message["headers"] = [*message.get("headers", ()), header]
+                await send(message)
+
+            await self.app(scope, receive, send_with_header)
@@ -0,0 +1,108 @@
+# Admin only routes for inspecting a running instance.
+# Requires the `x-zyg-admin-token` header, see `ZYG_ADMIN_TOKEN`.
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from src.adapters.db import query_log
+from src.adapters.web.auth import require_admin
+from src.memory import (
+    KEY_TYPES,
+    NoBaselineSnapshot,
+    TracemallocNotStarted,
+    memory_tracker,
+)
+from src.profiling import list_profiles, read_profile
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/db/queries/")
+async def db_queries(limit: int = 50):
+    """
+    Aggregates per query fingerprint, most expensive by total time first.
+    """
+    return {
+        "slow_query_ms": query_log.slow_query_seconds * 1000,
+        "queries": query_log.stats(limit=limit),
+    }
+
+
+@router.delete("/db/queries/")
+async def reset_db_queries():
+    query_log.reset()
+    return {"detail": "reset"}
+
+
+# file system access, FastAPI runs these in the thread pool.
+@router.get("/profiles/")
+def profiles():
+    """
+    Profiles of sampled or admin profiled requests and tasks on this host.
+    """
+    return {"profiles": list_profiles()}
+
+
+@router.get("/profiles/{name}", response_class=PlainTextResponse)
+def profile(name: str):
+    """
+    Folded stacks, e.g. for `flamegraph.pl` or speedscope.
+    """
+    folded = read_profile(name)
+    if folded is None:
+        raise HTTPException(status_code=404, detail="profile not found.")
+    return folded
+
+
+# Memory of the web worker process serving the request, see `src.memory`.
+# Snapshots walk every traced allocation, these run in the thread pool.
+@router.get("/memory/")
+def memory_status():
+    return memory_tracker.status()
+
+
+@router.post("/memory/tracemalloc/")
+def start_tracemalloc():
+    return memory_tracker.start()
+
+
+@router.delete("/memory/tracemalloc/")
+def stop_tracemalloc():
+    return memory_tracker.stop()
+
+
+def _check_key_type(key_type: str) -> None:
+    if key_type not in KEY_TYPES:
+        raise HTTPException(
+            status_code=400, detail=f"key_type must be one of: {KEY_TYPES}"
+        )
+
+
+@router.post("/memory/snapshots/")
+def take_memory_snapshot():
+    """
+    Takes the baseline snapshot for `/memory/diff/`.
+    """
+    try:
+        return memory_tracker.snapshot()
+    except TracemallocNotStarted as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/memory/top/")
+def memory_top(limit: int = 25, key_type: str = "lineno"):
+    _check_key_type(key_type)
+    try:
+        stats = memory_tracker.top(limit=limit, key_type=key_type)
+    except TracemallocNotStarted as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {**memory_tracker.status(), "stats": stats}
+
+
+@router.get("/memory/diff/")
+def memory_diff(limit: int = 25, key_type: str = "lineno"):
+    _check_key_type(key_type)
+    try:
+        stats = memory_tracker.diff(limit=limit, key_type=key_type)
+    except (TracemallocNotStarted, NoBaselineSnapshot) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {**memory_tracker.status(), "stats": stats}
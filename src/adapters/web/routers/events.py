@@ -54,9 +54,8 @@ async def slack_event(request: Request) -> Any:
     # control over the request data model.
     body: dict = await request.json()
 
-    print("**************** body ****************")
-    print(json.dumps(body, indent=2))
-    print("**************** body ****************")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"slack event callback body: {json.dumps(body)}")
 
     token = body.get("token", None)
     if token is None or token != SLACK_VERIFICATION_TOKEN:
@@ -126,8 +125,13 @@ async def slack_event(request: Request) -> Any:
         service = SlackEventCallBackService()
 
         try:
-            if service.is_ignored(body):
-                logger.info("Slack event set to be ignored will terminate here.")
+            route = service.route(body)
+            if route.is_dropped:
+                service.forget_edited_message(body)
+                logger.info(
+                    f"Slack event dropped for `{route.drop_reason}` "
+                    "will terminate here."
+                )
                 return JSONResponse(
                     status_code=200,
                     content={
@@ -0,0 +1,27 @@
+# Liveness and readiness checks for load balancers and orchestrators.
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from src.adapters.web.health import health_checker
+
+router = APIRouter()
+
+
+@router.get("/healthz")
+async def healthz():
+    """
+    The process is up and serving requests, does not check dependencies.
+    """
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+async def readyz():
+    """
+    Reads the last results of the background probes, 503 when not ready.
+    """
+    ready, probes = health_checker.readiness()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ok" if ready else "unavailable", "probes": probes},
+    )
@@ -6,12 +6,15 @@ from pydantic import BaseModel, constr
 
 from src.application.commands import (
     LinkSlackChannelCommand,
+    ListUserCommand,
+    ResolveEventContextCommand,
     SearchSlackChannelCommand,
     SearchUserCommand,
     SlackSyncUserCommand,
     TenantSyncChannelCommand,
 )
 from src.application.repr.api import (
+    event_context_repr,
     insync_slack_channel_repr,
     insync_slack_user_repr,
     insync_slack_user_with_upsert,
@@ -47,6 +50,16 @@ class SearchSlackChannelRequestBody(BaseModel):
     slack_channel_ref: Optional[str] = None
 
 
+class ResolveEventContextRequestBody(BaseModel):
+    tenant_id: str
+    slack_channel_ref: constr(min_length=3, max_length=255, to_lower=True)
+    slack_message_ts: str
+
+
+class ListUserRequestBody(BaseModel):
+    tenant_id: str
+
+
 class SearchUserRequestBody(BaseModel):
     user_id: Optional[str] = None
     slack_user_ref: Optional[str] = None
@@ -109,6 +122,25 @@ async def search_slack_channel(body: SearchSlackChannelRequestBody):
     return JSONResponse(status_code=200, content=[slack_channel.model_dump()])
 
 
+@router.post("/channels/linked/:resolve/")
+async def resolve_event_context(body: ResolveEventContextRequestBody):
+    """
+    Resolves the linked slack channel and the issue, if any, for a slack message
+    in one call, e.g. for handling reactions.
+    """
+    command = ResolveEventContextCommand(
+        tenant_id=body.tenant_id,
+        slack_channel_ref=body.slack_channel_ref,
+        slack_message_ts=body.slack_message_ts,
+    )
+    result = await SlackChannelService().resolve_event_context(command)
+    if result is None:
+        return JSONResponse(status_code=200, content=[])
+    slack_channel, issue = result
+    event_context = event_context_repr(slack_channel, issue)
+    return JSONResponse(status_code=200, content=[event_context.model_dump()])
+
+
 @router.post("/users/:search/")
 async def search_user(body: SearchUserRequestBody):
     command = SearchUserCommand(
@@ -121,3 +153,12 @@ async def search_user(body: SearchUserRequestBody):
         return JSONResponse(status_code=200, content=[])
     user = user_repr(result)
     return JSONResponse(status_code=200, content=[user.model_dump()])
+
+
+@router.post("/users/:list/")
+async def list_users(body: ListUserRequestBody):
+    command = ListUserCommand(tenant_id=body.tenant_id)
+    results = await UserService().list(command=command)
+    return JSONResponse(
+        status_code=200, content=[user_repr(r).model_dump() for r in results]
+    )
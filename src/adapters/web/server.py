@@ -1,10 +1,17 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from sqlalchemy.sql import text
 
-from src.adapters.db import engine
+from src.adapters.db import get_engine
 from src.logger import logger
+from src.metrics import render_for_accept
 
-from .routers import events, interactions, issues, onboardings, tenants
+from .health import health_checker
+from .middleware import (
+    CorrelationIdMiddleware,
+    HTTPMetricsMiddleware,
+    ProfilingMiddleware,
+)
+from .routers import admin, events, health, interactions, issues, onboardings, tenants
 
 app = FastAPI()
 
@@ -34,6 +41,25 @@ app.include_router(
     prefix="/issues",
 )
 
+app.include_router(
+    admin.router,
+    prefix="/admin",
+    include_in_schema=False,
+)
+
+app.include_router(
+    health.router,
+    include_in_schema=False,
+)
+
+
+# the middleware stack is built on the first request, by then all the routes
+# are in place and their metrics are created upfront.
+app.add_middleware(HTTPMetricsMiddleware, routes=app.routes)
+app.add_middleware(ProfilingMiddleware)
+# added last so that it is the outermost, the others see the correlation id.
+app.add_middleware(CorrelationIdMiddleware)
+
 
 @app.get("/")
 async def root():
@@ -41,16 +67,26 @@ async def root():
     return {"message": "Hey there! I am zyg."}
 
 
+# metrics of this process only, with many web workers scrape each of them,
+# see `ZYG_WEB_METRICS_PORT`.
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    content, media_type = render_for_accept(request.headers.get("accept", None))
+    return Response(content=content, media_type=media_type)
+
+
 @app.on_event("startup")
 async def startup():
-    async with engine.begin() as conn:
+    async with get_engine().begin() as conn:
         query = text("SELECT NOW()::timestamp AS now")
         rows = await conn.execute(query)
         result = rows.mappings().first()
         logger.info(f"db connected at: {result['now']}")
+    health_checker.start()
 
 
 @app.on_event("shutdown")
 async def shutdown():
     logger.warning("cleaning up...")
-    await engine.dispose()
+    await health_checker.stop()
+    await get_engine().dispose()
@@ -0,0 +1,14 @@
+"""
+Admin token checks, shared by the web app and the worker's debug endpoints.
+"""
+import hmac
+
+from src.config import ZYG_ADMIN_TOKEN
+
+ADMIN_TOKEN_HEADER = "x-zyg-admin-token"
+
+
+def is_admin_token(token: str | None) -> bool:
+    if not ZYG_ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token, ZYG_ADMIN_TOKEN)
@@ -1,10 +1,13 @@
 from .base import (
     CreateIssueCommand,
     LinkSlackChannelCommand,
+    ListUserCommand,
+    ResolveEventContextCommand,
     SearchIssueCommand,
     SearchSlackChannelCommand,
     SearchUserCommand,
     SlackEventCallBackCommand,
+    SlackEventReplayCommand,
     SlackSyncUserCommand,
     TenantProvisionCommand,
     TenantSyncChannelCommand,
@@ -20,4 +23,7 @@ __all__ = [
     "SlackSyncUserCommand",
     "SearchUserCommand",
     "SearchIssueCommand",
+    "SlackEventReplayCommand",
+    "ResolveEventContextCommand",
+    "ListUserCommand",
 ]
@@ -17,7 +17,17 @@ class FindUserByRefAPICommand(BaseModel):
     slack_user_ref: constr(min_length=3, max_length=255, to_lower=True)
 
 
+class ListUserAPICommand(BaseModel):
+    tenant_id: str
+
+
 class FindIssueBySlackChannelIdMessageTsAPICommand(BaseModel):
     tenant_id: str
     slack_channel_id: str
     slack_message_ts: str
+
+
+class ResolveEventContextAPICommand(BaseModel):
+    tenant_id: str
+    slack_channel_ref: constr(min_length=3, max_length=255, to_lower=True)
+    slack_message_ts: str
@@ -53,6 +53,10 @@ class SearchUserCommand(BaseModel):
         return v.lower() if v else v
 
 
+class ListUserCommand(BaseModel):
+    tenant_id: str
+
+
 class CreateIssueCommand(BaseModel):
     tenant_id: str
     slack_channel_id: str
@@ -69,3 +73,17 @@ class SearchIssueCommand(BaseModel):
     issue_number: Optional[int] = None
     slack_channel_id: Optional[str] = None
     slack_message_ts: Optional[str] = None
+
+
+class SlackEventReplayCommand(BaseModel):
+    since_ts: int
+    until_ts: int
+    batch_size: int = 500
+    rate: float = 50.0  # events per second
+    checkpoint_path: Optional[str] = None
+
+
+class ResolveEventContextCommand(BaseModel):
+    tenant_id: str
+    slack_channel_ref: constr(min_length=3, max_length=255, to_lower=True)
+    slack_message_ts: str
@@ -87,6 +87,11 @@ class IssueRepr(BaseModel):
     tags: List[str] = []
 
 
+class EventContextRepr(BaseModel):
+    slack_channel: SlackChannelRepr
+    issue: IssueRepr | None = None
+
+
 class UserRepr(BaseModel):
     user_id: str
     slack_user_ref: str
@@ -197,3 +202,12 @@ def user_repr(item: User) -> UpsertUserRepr:
         name=item.display_name,
         role=item.role,
     )
+
+
+def event_context_repr(
+    slack_channel: SlackChannel, issue: Issue | None
+) -> EventContextRepr:
+    return EventContextRepr(
+        slack_channel=slack_channel_repr(slack_channel),
+        issue=issue_repr(issue) if issue is not None else None,
+    )
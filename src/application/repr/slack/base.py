@@ -1,10 +1,11 @@
-import json
-
-from jinja2 import Template
-
 from src.domain.models import Issue
 
-from .blocks import CREATE_ISSUE_TEMPLATE_BLOCK  # TODO: move away from jinja.
+from .blocks import CREATE_ISSUE_TEMPLATE_BLOCK
+from .templates import compile_blocks
+
+_build_issue_message = compile_blocks(
+    CREATE_ISSUE_TEMPLATE_BLOCK, name="build_issue_message"
+)
 
 
 class BlockBuilder:
@@ -31,15 +32,12 @@ class BlockBuilder:
 
 
 def issue_message_blocks_repr(issue: Issue):
-    template = Template(CREATE_ISSUE_TEMPLATE_BLOCK)
-    rendered_template = template.render(
+    rendered = _build_issue_message(
         status=issue.status_display_name,
         issue_number=issue.issue_number,
         text=issue.body,
         priority=issue.priority_display_name,
     )
-
-    rendered = json.loads(rendered_template, strict=False)
     return rendered["blocks"]
 
 
@@ -0,0 +1,77 @@
+"""
+Slack block templates compiled once into builder functions.
+
+A template is Block Kit JSON with `{{ name }}` placeholders in its strings.
+It is parsed once and turned into Python code that builds the blocks straight
+from the arguments, so rendering needs no template parsing and no JSON parsing.
+
+Values are escaped for Slack mrkdwn, see `escape_mrkdwn`, use `{{ name|safe }}`
+for values already in Slack's format, like the text of a Slack message.
+"""
+import json
+import keyword
+import re
+from typing import Any, Callable, List, Set
+
+_PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*(?:\|\s*(\w+)\s*)?\}\}")
+
+_FILTERS = {
+    None: "_escape",
+    "escape": "_escape",
+    "safe": "_str",
+}
+
+
+def escape_mrkdwn(value: Any) -> str:
+    """
+    Escapes the control characters of Slack's mrkdwn, see:
+    https://api.slack.com/reference/surfaces/formatting#escaping
+    """
+    return str(value).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _compile_string(value: str, names: Set[str]) -> str:
+    parts: List[str] = []
+    position = 0
+    for match in _PLACEHOLDER.finditer(value):
+        name, filter_name = match.group(1), match.group(2)
+        if not name.isidentifier() or keyword.iskeyword(name):
+            raise ValueError(f"invalid placeholder name: `{name}`")
+        if filter_name not in _FILTERS:
+            raise ValueError(f"unknown filter: `{filter_name}`")
+        if match.start() > position:
+            parts.append(repr(value[position : match.start()]))
+        parts.append(f"{_FILTERS[filter_name]}({name})")
+        names.add(name)
+        position = match.end()
+    if position < len(value) or not parts:
+        parts.append(repr(value[position:]))
+    return " + ".join(parts)
+
+
+def _compile_value(value: Any, names: Set[str]) -> str:
+    if isinstance(value, dict):
+        items = ", ".join(
+            f"{k!r}: {_compile_value(v, names)}" for k, v in value.items()
+        )
+        return "{" + items + "}"
+    if isinstance(value, list):
+        return "[" + ", ".join(_compile_value(v, names) for v in value) + "]"
+    if isinstance(value, str):
+        return _compile_string(value, names)
+    # numbers, booleans and null as parsed from JSON.
+    return repr(value)
+
+
+def compile_blocks(template: str, name: str = "build") -> Callable[..., Any]:
+    """
+    Compiles the JSON template into a function taking the placeholders as
+    keyword arguments and returning new dicts and lists on every call.
+    """
+    names: Set[str] = set()
+    body = _compile_value(json.loads(template, strict=False), names)
+    params = ", ".join(sorted(names))
+    source = f"def {name}({'*, ' + params if params else ''}):\n    return {body}\n"
+    namespace = {"_escape": escape_mrkdwn, "_str": str}
+    exec(compile(source, f"<blocks {name}>", "exec"), namespace)
+    return namespace[name]
@@ -9,7 +9,122 @@ SLACK_VERIFICATION_TOKEN = os.getenv("SLACK_VERIFICATION_TOKEN", None)
 SLACK_USER_OAUTH_TOKEN = os.getenv("SLACK_USER_OAUTH_TOKEN", None)
 SLACK_BOT_OAUTH_TOKEN = os.getenv("SLACK_BOT_OAUTH_TOKEN", None)
 
+# Slack Web API the workers call, e.g. `bench/fake_slack.py` for load tests.
+SLACK_API_BASE_URL = os.getenv("SLACK_API_BASE_URL", "https://slack.com/api/")
+
 POSTGRES_URI = os.getenv("POSTGRES_URI", None)
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 
 ZYG_BASE_URL = os.getenv("ZYG_BASE_URL", "http://localhost:8000")
+
+# port for the worker to serve `/metrics` on, unset disables it.
+# with more than one worker process each binds to the next free port.
+ZYG_WORKER_METRICS_PORT = os.getenv("ZYG_WORKER_METRICS_PORT", None)
+
+# token expected in the `x-zyg-admin-token` header for admin only endpoints,
+# unset disables admin endpoints.
+ZYG_ADMIN_TOKEN = os.getenv("ZYG_ADMIN_TOKEN", None)
+
+# logs every SQL statement with its parameters, only for local debugging.
+ZYG_DB_ECHO = os.getenv("ZYG_DB_ECHO", "false").lower() == "true"
+# statements slower than this are logged, without their parameters.
+ZYG_DB_SLOW_QUERY_MS = float(os.getenv("ZYG_DB_SLOW_QUERY_MS", "100"))
+# fraction of slow statements that are logged, aggregates include all statements.
+ZYG_DB_SLOW_QUERY_LOG_SAMPLE_RATE = float(
+    os.getenv("ZYG_DB_SLOW_QUERY_LOG_SAMPLE_RATE", "1.0")
+)
+
+# `text` or `json` for structured logs.
+ZYG_LOG_FORMAT = os.getenv("ZYG_LOG_FORMAT", "text")
+# max log records buffered before new records are dropped.
+ZYG_LOG_QUEUE_SIZE = int(os.getenv("ZYG_LOG_QUEUE_SIZE", "10000"))
+
+# how the worker reaches Zyg's own APIs, `http` calls the web app at
+# `ZYG_BASE_URL`, `inprocess` calls the services directly and needs DB access.
+ZYG_API_TRANSPORT = os.getenv("ZYG_API_TRANSPORT", "http")
+
+# worker side cache of linked slack channels, slack channels that are not linked
+# are cached for shorter, linking a slack channel invalidates it right away.
+ZYG_CHANNEL_CACHE_MAXSIZE = int(os.getenv("ZYG_CHANNEL_CACHE_MAXSIZE", "10000"))
+ZYG_CHANNEL_CACHE_TTL_SECONDS = float(os.getenv("ZYG_CHANNEL_CACHE_TTL_SECONDS", "600"))
+ZYG_CHANNEL_CACHE_MISSING_TTL_SECONDS = float(
+    os.getenv("ZYG_CHANNEL_CACHE_MISSING_TTL_SECONDS", "120")
+)
+
+# worker side cache of users, users that are not found are cached for shorter,
+# syncing users invalidates the upserted users.
+ZYG_USER_CACHE_MAXSIZE = int(os.getenv("ZYG_USER_CACHE_MAXSIZE", "50000"))
+ZYG_USER_CACHE_TTL_SECONDS = float(os.getenv("ZYG_USER_CACHE_TTL_SECONDS", "3600"))
+ZYG_USER_CACHE_MISSING_TTL_SECONDS = float(
+    os.getenv("ZYG_USER_CACHE_MISSING_TTL_SECONDS", "300")
+)
+
+# a user is nudged at most once per window in a slack channel, 0 disables it.
+ZYG_NUDGE_SUPPRESSION_SECONDS = float(os.getenv("ZYG_NUDGE_SUPPRESSION_SECONDS", "900"))
+
+# how long messages in linked channels are kept to resolve reactions without
+# the Slack API, 0 disables it.
+ZYG_MESSAGE_CACHE_TTL_SECONDS = float(os.getenv("ZYG_MESSAGE_CACHE_TTL_SECONDS", "900"))
+
+# how captured slack event payloads are stored, `full` or `slim`.
+# with `slim` only what is needed to handle the event is stored as JSON
+# and the full payload is stored compressed.
+ZYG_SLACK_EVENT_STORAGE = os.getenv("ZYG_SLACK_EVENT_STORAGE", "full")
+
+# production web server, see `src/adapters/web/gunicorn_conf.py`.
+ZYG_WEB_BIND = os.getenv("ZYG_WEB_BIND", "0.0.0.0:8000")
+# worker processes, defaults to the number of cores.
+ZYG_WEB_WORKERS = int(os.getenv("ZYG_WEB_WORKERS", "0")) or os.cpu_count() or 1
+# a worker is restarted after serving about this many requests, 0 disables it.
+ZYG_WEB_MAX_REQUESTS = int(os.getenv("ZYG_WEB_MAX_REQUESTS", "10000"))
+ZYG_WEB_MAX_REQUESTS_JITTER = int(os.getenv("ZYG_WEB_MAX_REQUESTS_JITTER", "1000"))
+# seconds for in flight requests to finish on restart or shutdown.
+ZYG_WEB_GRACEFUL_TIMEOUT = int(os.getenv("ZYG_WEB_GRACEFUL_TIMEOUT", "30"))
+# first port for the web workers to serve `/metrics` on, unset disables it.
+# each worker process binds to the next free port, like the Celery worker.
+ZYG_WEB_METRICS_PORT = os.getenv("ZYG_WEB_METRICS_PORT", None)
+
+# DB connections for all web workers together, each worker gets an equal share
+# as its pool size, unset uses `ZYG_DB_POOL_SIZE` per process.
+ZYG_DB_CONNECTION_BUDGET = os.getenv("ZYG_DB_CONNECTION_BUDGET", None)
+
+# DB pool per web process.
+ZYG_DB_POOL_SIZE = int(os.getenv("ZYG_DB_POOL_SIZE", "5"))
+ZYG_DB_MAX_OVERFLOW = int(os.getenv("ZYG_DB_MAX_OVERFLOW", "1"))
+# DB pool per worker process, a worker process handles one task at a time.
+ZYG_WORKER_DB_POOL_SIZE = int(os.getenv("ZYG_WORKER_DB_POOL_SIZE", "1"))
+ZYG_WORKER_DB_MAX_OVERFLOW = int(os.getenv("ZYG_WORKER_DB_MAX_OVERFLOW", "1"))
+# seconds after which pooled connections are replaced, -1 never.
+ZYG_DB_POOL_RECYCLE = int(os.getenv("ZYG_DB_POOL_RECYCLE", "1800"))
+# checks a pooled connection is alive on checkout, costs a round trip.
+ZYG_DB_POOL_PRE_PING = os.getenv("ZYG_DB_POOL_PRE_PING", "false").lower() == "true"
+# prepared statements cached per connection, 0 behind pgbouncer in transaction mode.
+ZYG_DB_STATEMENT_CACHE_SIZE = int(os.getenv("ZYG_DB_STATEMENT_CACHE_SIZE", "100"))
+
+# readiness probes of the web app, refreshed in the background every interval,
+# results older than 3 intervals are stale and the instance is not ready.
+ZYG_HEALTH_PROBE_INTERVAL_SECONDS = float(
+    os.getenv("ZYG_HEALTH_PROBE_INTERVAL_SECONDS", "5")
+)
+ZYG_HEALTH_PROBE_TIMEOUT_SECONDS = float(
+    os.getenv("ZYG_HEALTH_PROBE_TIMEOUT_SECONDS", "2")
+)
+# not ready when this share of the DB pool, overflow included, is checked out.
+ZYG_HEALTH_POOL_SATURATION = float(os.getenv("ZYG_HEALTH_POOL_SATURATION", "0.9"))
+
+# fraction of requests and worker tasks profiled by stack sampling, 0 disables it,
+# admins can profile a request with the `x-zyg-profile: 1` header.
+ZYG_PROFILE_SAMPLE_RATE = float(os.getenv("ZYG_PROFILE_SAMPLE_RATE", "0"))
+# seconds between stack samples of a profiled request or task.
+ZYG_PROFILE_INTERVAL_SECONDS = float(os.getenv("ZYG_PROFILE_INTERVAL_SECONDS", "0.005"))
+# profiles are written here as folded stacks, the oldest are removed beyond max.
+ZYG_PROFILE_DIR = os.getenv("ZYG_PROFILE_DIR", "/tmp/zyg-profiles")
+ZYG_PROFILE_MAX_FILES = int(os.getenv("ZYG_PROFILE_MAX_FILES", "200"))
+
+# frames kept per allocation by `tracemalloc` once started from the admin
+# endpoints, more frames cost more memory and time per allocation.
+ZYG_TRACEMALLOC_FRAMES = int(os.getenv("ZYG_TRACEMALLOC_FRAMES", "10"))
+# a worker process is replaced once its resident memory passes this, 0 disables it.
+ZYG_WORKER_MAX_MEMORY_MB = int(os.getenv("ZYG_WORKER_MAX_MEMORY_MB", "0"))
+# same for web worker processes, only when running under gunicorn.
+ZYG_WEB_MAX_MEMORY_MB = int(os.getenv("ZYG_WEB_MAX_MEMORY_MB", "0"))
@@ -0,0 +1,54 @@
+"""
+Correlation ids to follow one request or slack event across processes.
+
+The id is set at ingest, in the web app, carried to the worker in the task
+context and sent along as the `x-zyg-correlation-id` header on calls to the
+web app. Log records and latency histograms pick it up from the context.
+"""
+import contextlib
+import logging
+import uuid
+from contextvars import ContextVar
+from typing import Iterator
+
+CORRELATION_ID_HEADER = "x-zyg-correlation-id"
+
+# ids from callers are used as is, but are bounded in size.
+_MAX_LENGTH = 64
+
+_correlation_id: ContextVar[str | None] = ContextVar("correlation_id", default=None)
+
+
+def new_correlation_id() -> str:
+    return uuid.uuid4().hex
+
+
+def get_correlation_id() -> str | None:
+    return _correlation_id.get()
+
+
+@contextlib.contextmanager
+def correlation_scope(correlation_id: str | None = None) -> Iterator[str]:
+    """
+    Sets the correlation id for the enclosed code, a new one if none is given.
+    """
+    if correlation_id:
+        correlation_id = correlation_id[:_MAX_LENGTH]
+    else:
+        correlation_id = new_correlation_id()
+    token = _correlation_id.set(correlation_id)
+    try:
+        yield correlation_id
+    finally:
+        _correlation_id.reset(token)
+
+
+class CorrelationIdFilter(logging.Filter):
+    """
+    Sets `correlation_id` on the record, attached to the handler so that it
+    runs in the logging thread, before the record is queued.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = _correlation_id.get() or "-"
+        return True
@@ -10,6 +10,8 @@ from src.domain.exceptions import SlackChannelReferenceValueError, TenantValueEr
 
 
 class AbstractEntity(abc.ABC):
+    __slots__ = ()
+
     @abc.abstractmethod
     def __eq__(self, other: object) -> bool:
         raise NotImplementedError
@@ -20,7 +22,7 @@ class AbstractEntity(abc.ABC):
 
 
 class AbstractValueObject:
-    pass
+    __slots__ = ()
 
 
 @define(frozen=True)
@@ -43,6 +45,8 @@ class TenantContext(AbstractValueObject):
 
 
 class Tenant(AbstractEntity):
+    __slots__ = ("tenant_id", "name", "slack_team_ref")
+
     def __init__(self, tenant_id: str | None, name: str, slack_team_ref: str) -> None:
         self.tenant_id = tenant_id
         self.name = name
@@ -90,6 +94,8 @@ class UserRole(Enum):
 
 
 class User(AbstractEntity):
+    __slots__ = ("tenant_id", "user_id", "slack_user_ref", "name", "_role")
+
     def __init__(
         self,
         tenant_id: str,
@@ -190,6 +196,8 @@ class User(AbstractEntity):
 
 
 class BaseEvent:
+    __slots__ = ("tenant_id", "slack_event_ref", "inner_event_type")
+
     def __init__(
         self,
         tenant_id: str,
@@ -207,6 +215,8 @@ class BaseEvent:
 class ChannelMessage(BaseEvent):
     subscribed_event = "message.channels"
 
+    __slots__ = ("slack_channel_ref", "slack_user_ref", "ts", "text", "blocks")
+
     def __init__(
         self,
         tenant_id: str,
@@ -275,6 +285,14 @@ class ChannelMessage(BaseEvent):
 class MessageReactionAdded(BaseEvent):
     subscribed_event = "reaction_added"
 
+    __slots__ = (
+        "reaction",
+        "slack_user_ref",
+        "slack_channel_ref",
+        "message_ts",
+        "message_user_ref",
+    )
+
     def __init__(
         self,
         tenant_id: str,
@@ -341,6 +359,38 @@ class MessageReactionAdded(BaseEvent):
         )"""
 
 
+@define(frozen=True)
+class SlackEventRoute(AbstractValueObject):
+    """
+    Where a Slack inner event goes, to the subscribed event or, if not
+    subscribed, dropped for `drop_reason`.
+    """
+
+    subscribed_event: str | None
+    drop_reason: str | None = None
+
+    @property
+    def is_dropped(self) -> bool:
+        return self.subscribed_event is None
+
+
+# Routing table for Slack inner events keyed by (`type`, `subtype`, `channel_type`)
+# built once, events not in here are not subscribed, e.g. other message subtypes
+# or messages in other than public channels.
+#
+# Add support for more subscribed events here.
+_SLACK_EVENT_ROUTES = {
+    ("message", None, "channel"): SlackEventRoute("message.channels"),
+    ("message", "thread_broadcast", "channel"): SlackEventRoute("message.channels"),
+    ("message", "file_share", "channel"): SlackEventRoute("message.channels"),
+    ("reaction_added", None, None): SlackEventRoute("reaction_added"),
+}
+
+_SLACK_EVENT_DROP_NO_TYPE = SlackEventRoute(None, "no_type")
+_SLACK_EVENT_DROP_BOT = SlackEventRoute(None, "bot")
+_SLACK_EVENT_DROP_UNSUBSCRIBED = SlackEventRoute(None, "unsubscribed")
+
+
 class SlackEvent(AbstractEntity):
     """
     `subscribed_events` - list of events that we are subscribed to in Slack.
@@ -348,6 +398,16 @@ class SlackEvent(AbstractEntity):
 
     subscribed_events = ("message.channels", "reaction_added")
 
+    __slots__ = (
+        "tenant_id",
+        "event_id",
+        "slack_event_ref",
+        "event_dispatched_ts",
+        "payload",
+        "is_ack",
+        "event",
+    )
+
     def __init__(
         self,
         tenant_id: str,
@@ -425,29 +485,40 @@ class SlackEvent(AbstractEntity):
         slack_event.event = event
         return slack_event
 
+    @classmethod
+    def route(cls, event: dict) -> SlackEventRoute:
+        """
+        Classifies the inner event with a lookup in the routing table,
+        cheap enough to run on the raw payload before anything else.
+
+        Messages from bots, including ours, are dropped.
+        """
+        event_type = event.get("type", None)
+        if not event_type:
+            return _SLACK_EVENT_DROP_NO_TYPE
+        subtype = event.get("subtype", None)
+        if event.get("bot_id", None) or subtype == "bot_message":
+            return _SLACK_EVENT_DROP_BOT
+        route = _SLACK_EVENT_ROUTES.get(
+            (event_type, subtype, event.get("channel_type", None)), None
+        )
+        if route is None or route.subscribed_event not in cls.subscribed_events:
+            return _SLACK_EVENT_DROP_UNSUBSCRIBED
+        return route
+
     def _parse_to_subscribed_event(self, event: dict) -> str:
         """
         Parses the inner event type to find the subscribed event.
         Returns the subscribed event name as subscribed.
 
         If we are not able to find the subscribed event, we raise an error.
-
-        Note: Add support for more subscribed events.
         """
-        event_type = event.get("type", None)
-        if not event_type:
-            raise ValueError("inner event type is required")
-        if event_type == "message":
-            # follow the path to `message.*`
-            channel_type = event.get("channel_type", None)
-            if not channel_type:
-                raise ValueError("channel type is required")
-            if channel_type == "channel":
-                # follow the path `message.channels`
-                return "message.channels"
-        elif event_type == "reaction_added":
-            return "reaction_added"
-        raise ValueError("event type is not supported or subscribed")
+        route = self.route(event)
+        if route.is_dropped:
+            raise ValueError(
+                f"event type is not supported or subscribed: {route.drop_reason}"
+            )
+        return route.subscribed_event
 
     def build_event(self, event: dict) -> None:
         """
@@ -671,6 +742,14 @@ class TriageSlackChannel(AbstractValueObject):
 
 
 class SlackChannel(AbstractEntity):
+    __slots__ = (
+        "tenant_id",
+        "slack_channel_id",
+        "slack_channel_ref",
+        "slack_channel_name",
+        "triage_channel",
+    )
+
     def __init__(
         self,
         tenant_id: str,
@@ -761,6 +840,18 @@ class IssuePriority(Enum):
 
 
 class Issue(AbstractEntity):
+    __slots__ = (
+        "tenant_id",
+        "slack_channel_id",
+        "slack_message_ts",
+        "issue_id",
+        "issue_number",
+        "body",
+        "_status",
+        "_priority",
+        "_tags",
+    )
+
     def __init__(
         self,
         tenant_id: str,
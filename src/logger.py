@@ -1,61 +1,163 @@
+"""
+Logging goes through a bounded in-memory queue drained by a background thread,
+so that writing to stdout or syslog never blocks the caller.
+
+When the queue is full records are dropped and counted, instead of blocking.
+Set `ZYG_LOG_FORMAT=json` for structured output.
+"""
+import atexit
+import json
 import logging
-import logging.config
+import os
+import queue
 import sys
+from datetime import datetime, timezone
+from logging import handlers
+
+from src.config import ZYG_LOG_FORMAT, ZYG_LOG_QUEUE_SIZE
+from src.correlation import CorrelationIdFilter
+from src.metrics import Counter
 
 _SYSLOG_PLATFORM_ADDRESS = {
     "win32": ("localhost", 514),
     "darwin": "/var/run/syslog",
 }
 
-logging.basicConfig(
-    format=(
-        "[zyg] %(levelname)s %(asctime)s %(module)s %(process)d "
-        "%(filename)s:%(lineno)d %(message)s"
-    ),
-    datefmt="%Y-%m-%d %H:%M:%S %Z",
-    level=logging.INFO,
+LOG_RECORDS_DROPPED = Counter(
+    "zyg_log_records_dropped",
+    "Log records dropped because the logging queue was full.",
 )
 
 
-logging.config.dictConfig(
-    {
-        "version": 1,
-        "formatters": {
-            "default": {
-                "format": (
-                    "[zyg]|%(levelname)s|%(asctime)s|%(process)d|%(module)s|"
-                    "%(filename)s:%(lineno)d|%(funcName)s|"
-                    "%(message)s"
-                ),
-                "datefmt": "%Y-%m-%d %H:%M:%S %Z",
-            },
-        },
-        "handlers": {
-            "console": {
-                "level": "INFO",
-                "class": "logging.StreamHandler",
-                "formatter": "default",
-                "stream": "ext://sys.stdout",
-            },
-            "syslog": {
-                "level": "INFO",
-                "class": "logging.handlers.SysLogHandler",
-                "formatter": "default",
-                "address": _SYSLOG_PLATFORM_ADDRESS.get(sys.platform, "/dev/log"),
-            },
-        },
-        "root": {
-            "handlers": ["console", "syslog"],
-            "level": "INFO",
-        },
-        "loggers": {
-            "uvicorn": {
-                "handlers": ["console", "syslog"],
-                "level": "INFO",
-                "propagate": False,
-            },
-        },
-    }
-)
+class JSONFormatter(logging.Formatter):
+    def __init__(self, prefix: str = "zyg") -> None:
+        super().__init__()
+        self.prefix = prefix
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "app": self.prefix,
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.process,
+            "module": record.module,
+            "location": f"{record.filename}:{record.lineno}",
+            "func": record.funcName,
+            "correlation_id": getattr(record, "correlation_id", "-"),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+def build_formatter(prefix: str = "zyg") -> logging.Formatter:
+    if ZYG_LOG_FORMAT == "json":
+        return JSONFormatter(prefix=prefix)
+    return logging.Formatter(
+        f"[{prefix}]|%(levelname)s|%(asctime)s|%(process)d|%(module)s|"
+        "%(filename)s:%(lineno)d|%(funcName)s|%(correlation_id)s|"
+        "%(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S %Z",
+    )
+
+
+class DroppingQueueHandler(handlers.QueueHandler):
+    """
+    Never blocks on a full queue, the record is dropped and counted instead.
+    """
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+class LoggingPipeline:
+    def __init__(self, targets: list, maxsize: int = ZYG_LOG_QUEUE_SIZE) -> None:
+        self.targets = targets
+        self.maxsize = maxsize
+        self.handler = DroppingQueueHandler(queue.Queue(maxsize=maxsize))
+        # the context is only there in the thread that logs.
+        self.handler.addFilter(CorrelationIdFilter())
+        self.listener: handlers.QueueListener | None = None
+
+    def start(self) -> None:
+        self.listener = handlers.QueueListener(
+            self.handler.queue, *self.targets, respect_handler_level=True
+        )
+        self.listener.start()
+
+    def stop(self) -> None:
+        """flushes what is left in the queue, called at exit."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def restart_in_child(self) -> None:
+        """
+        The writer thread does not survive a fork, a forked child, like a
+        prefork worker, gets a fresh queue and its own writer thread.
+        """
+        self.handler.queue = queue.Queue(maxsize=self.maxsize)
+        self.start()
+
+
+def _build_targets(prefix: str) -> list:
+    formatter = build_formatter(prefix)
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setLevel(logging.INFO)
+    console.setFormatter(formatter)
+    targets = [console]
+
+    address = _SYSLOG_PLATFORM_ADDRESS.get(sys.platform, "/dev/log")
+    if isinstance(address, str) and not os.path.exists(address):
+        # e.g. in containers, otherwise every record fails to be written.
+        print(f"[{prefix}] syslog is not available at: {address}", file=sys.stderr)
+        return targets
+
+    syslog = handlers.SysLogHandler(address=address)
+    syslog.setLevel(logging.INFO)
+    syslog.setFormatter(formatter)
+    targets.append(syslog)
+    return targets
+
+
+_pipeline: LoggingPipeline | None = None
+
+
+def setup_logging(prefix: str = "zyg") -> LoggingPipeline:
+    """
+    Routes the root and uvicorn loggers through the queue.
+
+    Safe to call again, e.g. after Celery has set up its own handlers,
+    the handlers are attached again with the formatter for `prefix`.
+    """
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = LoggingPipeline(_build_targets(prefix))
+        _pipeline.start()
+        atexit.register(_pipeline.stop)
+        os.register_at_fork(after_in_child=_pipeline.restart_in_child)
+    else:
+        formatter = build_formatter(prefix)
+        for target in _pipeline.targets:
+            target.setFormatter(formatter)
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.handlers = [_pipeline.handler]
+
+    uvicorn = logging.getLogger("uvicorn")
+    uvicorn.handlers = [_pipeline.handler]
+    uvicorn.setLevel(logging.INFO)
+    uvicorn.propagate = False
+    return _pipeline
+
+
+setup_logging()
 
 logger = logging.getLogger(__name__)
@@ -0,0 +1,151 @@
+"""
+Memory inspection of a running process with `tracemalloc`.
+
+Tracing is off until started, it slows down every allocation. Take a snapshot
+as the baseline, let the process run for a while and diff against it to find
+the allocation sites that keep growing.
+
+State is per process, with many web or worker processes each is inspected
+on its own, responses include the `pid`.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import List
+
+from src.config import ZYG_TRACEMALLOC_FRAMES
+from src.metrics import Gauge
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# the allocations of tracemalloc itself and of the import machinery.
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+KEY_TYPES = ("lineno", "filename", "traceback")
+
+
+def rss_bytes() -> int:
+    """
+    Resident memory of this process. Where `/proc` is not available, e.g. on
+    macOS, it is the peak resident memory instead, it never goes down.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # bytes on macOS, kilobytes elsewhere.
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+PROCESS_RESIDENT_MEMORY_BYTES = Gauge(
+    "zyg_process_resident_memory_bytes",
+    "Resident memory of this process, peak resident memory where /proc is missing.",
+    func=rss_bytes,
+)
+
+
+class TracemallocNotStarted(Exception):
+    pass
+
+
+class NoBaselineSnapshot(Exception):
+    pass
+
+
+def _stat_repr(stat: tracemalloc.Statistic | tracemalloc.StatisticDiff) -> dict:
+    frames = [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+    data = {
+        "site": frames[0] if frames else "<unknown>",
+        "size_bytes": stat.size,
+        "count": stat.count,
+    }
+    if isinstance(stat, tracemalloc.StatisticDiff):
+        data["size_diff_bytes"] = stat.size_diff
+        data["count_diff"] = stat.count_diff
+    if len(frames) > 1:
+        data["traceback"] = frames
+    return data
+
+
+class MemoryTracker:
+    def __init__(self, frames: int = ZYG_TRACEMALLOC_FRAMES) -> None:
+        self.frames = frames
+        self.baseline: tracemalloc.Snapshot | None = None
+        self.baseline_at: float | None = None
+        self._lock = threading.Lock()
+
+    def status(self) -> dict:
+        tracing = tracemalloc.is_tracing()
+        traced, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            "pid": os.getpid(),
+            "rss_bytes": rss_bytes(),
+            "tracing": tracing,
+            "traced_bytes": traced,
+            "traced_peak_bytes": peak,
+            "baseline_at": self.baseline_at,
+        }
+
+    def start(self) -> dict:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            logger.warning(f"tracemalloc started with {self.frames} frames")
+        return self.status()
+
+    def stop(self) -> dict:
+        with self._lock:
+            self.baseline = None
+            self.baseline_at = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.warning("tracemalloc stopped")
+        return self.status()
+
+    @staticmethod
+    def _take() -> tracemalloc.Snapshot:
+        if not tracemalloc.is_tracing():
+            raise TracemallocNotStarted("tracemalloc is not started.")
+        return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+    def snapshot(self) -> dict:
+        """
+        Takes the baseline snapshot, `diff` compares against it.
+        """
+        snapshot = self._take()
+        with self._lock:
+            self.baseline = snapshot
+            self.baseline_at = time.time()
+        return self.status()
+
+    def top(self, limit: int = 25, key_type: str = "lineno") -> List[dict]:
+        """
+        Allocation sites holding the most memory right now.
+        """
+        stats = self._take().statistics(key_type)
+        return [_stat_repr(s) for s in stats[:limit]]
+
+    def diff(self, limit: int = 25, key_type: str = "lineno") -> List[dict]:
+        """
+        Allocation sites that grew the most since the baseline snapshot.
+        """
+        baseline = self.baseline
+        if baseline is None:
+            raise NoBaselineSnapshot("no baseline snapshot, take one first.")
+        stats = self._take().compare_to(baseline, key_type)
+        return [_stat_repr(s) for s in stats[:limit]]
+
+
+memory_tracker = MemoryTracker()
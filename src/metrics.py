@@ -0,0 +1,447 @@
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+Metrics are registered once at import and label children are cached, so that
+recording on the hot path is a dict lookup and an add.
+
+Histograms keep the last exemplar per bucket, e.g. the correlation id of a
+slow request, exposed only when the scraper asks for OpenMetrics.
+
+Exposition format docs:
+https://prometheus.io/docs/instrumenting/exposition_formats/
+"""
+import abc
+import json
+import logging
+import math
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from src.correlation import get_correlation_id
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+CONTENT_TYPE_OPENMETRICS = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    300.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, int) or value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Metric(abc.ABC):
+    type_name = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        registry: "Registry | None" = None,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    @abc.abstractmethod
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """
+        Returns the child for the label values, creating it on first use.
+
+        Callers on a hot path should keep the returned child around instead
+        of looking it up again per call.
+        """
+        child = self._children.get(values, None)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(
+                    f"metric `{self.name}` expects labels: {self.labelnames}"
+                )
+            child = self._children.setdefault(
+                tuple(str(v) for v in values), self._new_child()
+            )
+        return child
+
+    @abc.abstractmethod
+    def _samples(self) -> List[Tuple[str, str, float, str]]:
+        """
+        Returns `(suffix, labels, value, exemplar)`, exemplar is "" if none.
+        """
+        raise NotImplementedError
+
+    def render(self, openmetrics: bool = False) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for suffix, labels, value, exemplar in self._samples():
+            line = f"{self.name}{suffix}{labels} {_format_value(value)}"
+            if openmetrics and exemplar:
+                line += exemplar
+            lines.append(line)
+        return "\n".join(lines)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+    def _samples(self):
+        return [
+            ("_total", _format_labels(self.labelnames, k), c.value, "")
+            for k, c in list(self._children.items())
+        ]
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class Gauge(Metric):
+    """
+    A gauge is either set by the caller or, when `func` is given,
+    read from `func` at collection time.
+    """
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        registry: "Registry | None" = None,
+        func: Callable[[], float] | None = None,
+    ) -> None:
+        self._func = func
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._children[()].set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._children[()].dec(amount)
+
+    def set_function(self, func: Callable[[], float]) -> None:
+        self._func = func
+
+    def _samples(self):
+        if self._func is not None:
+            try:
+                return [("", "", float(self._func()), "")]
+            except Exception as e:
+                logger.warning(f"error collecting gauge `{self.name}`: {e}")
+                return []
+        return [
+            ("", _format_labels(self.labelnames, k), c.value, "")
+            for k, c in list(self._children.items())
+        ]
+
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "buckets", "exemplars", "sum", "count")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]) -> None:
+        self.upper_bounds = upper_bounds
+        self.buckets = [0] * len(upper_bounds)
+        # last `(correlation_id, value, timestamp)` per bucket.
+        self.exemplars: List[Tuple[str, float, float] | None] = [None] * len(
+            upper_bounds
+        )
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float, exemplar: str | None = None) -> None:
+        self.sum += value
+        self.count += 1
+        index = bisect_left(self.upper_bounds, value)
+        self.buckets[index] += 1
+        if exemplar:
+            self.exemplars[index] = (exemplar, value, time.time())
+
+
+def _format_exemplar(exemplar: Tuple[str, float, float] | None) -> str:
+    if exemplar is None:
+        return ""
+    correlation_id, value, ts = exemplar
+    return (
+        f' # {{correlation_id="{_escape(correlation_id)}"}} '
+        f"{_format_value(value)} {ts:.3f}"
+    )
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        registry: "Registry | None" = None,
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        upper_bounds = tuple(sorted(float(b) for b in buckets))
+        if not upper_bounds or upper_bounds[-1] != math.inf:
+            upper_bounds += (math.inf,)
+        self.upper_bounds = upper_bounds
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float, exemplar: str | None = None) -> None:
+        self._children[()].observe(value, exemplar)
+
+    def _samples(self):
+        samples = []
+        for key, child in list(self._children.items()):
+            cumulative = 0
+            buckets = zip(
+                child.upper_bounds, list(child.buckets), list(child.exemplars)
+            )
+            for bound, count, exemplar in buckets:
+                cumulative += count
+                labels = _format_labels(
+                    self.labelnames + ("le",), key + (_format_value(bound),)
+                )
+                samples.append(
+                    ("_bucket", labels, cumulative, _format_exemplar(exemplar))
+                )
+            labels = _format_labels(self.labelnames, key)
+            samples.append(("_sum", labels, child.sum, ""))
+            samples.append(("_count", labels, child.count, ""))
+        return samples
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric `{metric.name}` is already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self, openmetrics: bool = False) -> str:
+        body = "\n".join(
+            m.render(openmetrics=openmetrics) for m in list(self._metrics.values())
+        )
+        return body + ("\n# EOF\n" if openmetrics else "\n")
+
+
+REGISTRY = Registry()
+
+
+def render_latest(registry: Registry = REGISTRY) -> str:
+    return registry.render()
+
+
+def render_for_accept(
+    accept: str | None, registry: Registry = REGISTRY
+) -> Tuple[str, str]:
+    """
+    Returns the body and its content type, OpenMetrics with exemplars if the
+    scraper accepts it, the Prometheus text format otherwise.
+    """
+    if accept and "application/openmetrics-text" in accept:
+        return registry.render(openmetrics=True), CONTENT_TYPE_OPENMETRICS
+    return registry.render(), CONTENT_TYPE_LATEST
+
+
+# handlers get the query parameters and return the status code and the data
+# sent back as JSON.
+RouteHandler = Callable[[Dict[str, str]], Tuple[int, Any]]
+
+_ROUTES: Dict[Tuple[str, str], Tuple[RouteHandler, Callable[[Any], bool] | None]] = {}
+
+
+def add_route(
+    method: str,
+    path: str,
+    handler: RouteHandler,
+    authorize: Callable[[Any], bool] | None = None,
+) -> None:
+    """
+    Serves more than `/metrics` from `start_http_server`, e.g. debug endpoints
+    of the worker. `authorize` gets the request headers, 403 if it says no.
+    """
+    _ROUTES[(method, path)] = (handler, authorize)
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def _send_json(self, status: int, data: Any) -> None:
+        body = json.dumps(data, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self, method: str) -> None:
+        url = urlsplit(self.path)
+        route = _ROUTES.get((method, url.path), None)
+        if route is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        handler, authorize = route
+        if authorize is not None and not authorize(self.headers):
+            self._send_json(403, {"detail": "admin only."})
+            return
+        try:
+            status, data = handler(dict(parse_qsl(url.query)))
+        except Exception as e:
+            logger.error(f"error serving `{method} {url.path}`: {e}")
+            status, data = 500, {"detail": "something went wrong."}
+        self._send_json(status, data)
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_DELETE(self):
+        self._route("DELETE")
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self._route("GET")
+            return
+        body, content_type = render_for_accept(self.headers.get("Accept", None))
+        body = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # scrapes are frequent, dont flood the logs.
+        pass
+
+
+def start_http_server(port: int, addr: str = "0.0.0.0", attempts: int = 1) -> int:
+    """
+    Serves `/metrics`, and the routes added with `add_route`, from a daemon
+    thread for processes that have no web app, like the Celery worker.
+
+    With `attempts` > 1 the next ports are tried if the port is taken, so that
+    each prefork child can export its own metrics.
+
+    Returns the port bound to.
+    """
+    for offset in range(attempts):
+        try:
+            server = ThreadingHTTPServer((addr, port + offset), _MetricsRequestHandler)
+        except OSError:
+            continue
+        thread = threading.Thread(
+            target=server.serve_forever, name="zyg-metrics", daemon=True
+        )
+        thread.start()
+        logger.info(f"serving metrics on port: {port + offset}")
+        return port + offset
+    raise OSError(f"cannot bind metrics server on ports {port}-{port + attempts - 1}")
+
+
+# Slack event latency from when Slack says the event happened, up to when
+# the worker is done handling it. See `stage` for the checkpoints:
+#
+# capture      slack `event_time` to captured in `slack_event` (web)
+# dispatch     time taken to publish the task to the broker (web)
+# queue        published to picked up by the worker (worker)
+# handler      handler start to finish (worker)
+# end_to_end   slack `event_time` to handler finish (worker)
+#
+# Note: slack `event_time` has a resolution of seconds.
+SLACK_EVENT_STAGE_SECONDS = Histogram(
+    "zyg_slack_event_stage_seconds",
+    "Latency of slack events per processing stage.",
+    labelnames=("stage", "tenant_id", "subscribed_event"),
+)
+
+
+def observe_slack_event_stage(
+    stage: str, tenant_id: str, subscribed_event: str, seconds: float
+) -> None:
+    # clock skew between Slack and us can make early stages negative.
+    SLACK_EVENT_STAGE_SECONDS.labels(stage, tenant_id, subscribed_event).observe(
+        max(seconds, 0.0), get_correlation_id()
+    )
@@ -0,0 +1,210 @@
+"""
+Opt-in statistical profiling of single requests and worker tasks.
+
+A profiled request or task gets a sampler thread that reads the stack of the
+thread running it every `ZYG_PROFILE_INTERVAL_SECONDS`. Stacks are written
+as folded stacks, one `frame;frame;frame count` per line, the input of
+flamegraph.pl, speedscope and most flamegraph viewers.
+
+When not profiled the cost is a random number per request or task, nothing
+when `ZYG_PROFILE_SAMPLE_RATE` is 0.
+"""
+import asyncio
+import contextlib
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from types import FrameType
+from typing import Iterator, List
+
+from src.config import (
+    ZYG_PROFILE_DIR,
+    ZYG_PROFILE_INTERVAL_SECONDS,
+    ZYG_PROFILE_MAX_FILES,
+    ZYG_PROFILE_SAMPLE_RATE,
+)
+from src.correlation import get_correlation_id
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-zyg-profile"
+
+# frame recorded while the profiled asyncio task is not running, i.e. it is
+# waiting on I/O or on other tasks sharing the event loop.
+AWAITING_FRAME = "<awaiting>"
+
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]+")
+
+_profiling: ContextVar[bool] = ContextVar("profiling", default=False)
+
+
+def is_profiling() -> bool:
+    """
+    True within a profiled request or task, e.g. to profile the tasks it
+    dispatches too.
+    """
+    return _profiling.get()
+
+
+def should_profile(forced: bool = False, rate: float = ZYG_PROFILE_SAMPLE_RATE) -> bool:
+    return forced or (rate > 0 and random.random() < rate)
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({code.co_filename}:{code.co_firstlineno})"
+
+
+def _fold(frame: FrameType | None) -> List[str]:
+    stack = []
+    while frame is not None:
+        stack.append(_frame_name(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+class StackSampler:
+    """
+    Samples the stack of `thread_id` from a daemon thread, which writes the
+    profile to `path` once stopped, so that the profiled code does not wait
+    on the file system.
+
+    With `task` only the samples taken while that asyncio task is running
+    have its stack, others are recorded as `<awaiting>`, so that concurrent
+    requests on the same event loop do not show up in the profile.
+    """
+
+    def __init__(
+        self,
+        thread_id: int,
+        interval: float = ZYG_PROFILE_INTERVAL_SECONDS,
+        task: asyncio.Task | None = None,
+        path: str | None = None,
+    ) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.task = task
+        self.path = path
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _sample(self) -> None:
+        if self.task is not None:
+            loop = self.task.get_loop()
+            if asyncio.current_task(loop) is not self.task:
+                self.stacks[AWAITING_FRAME] += 1
+                return
+        frame = sys._current_frames().get(self.thread_id, None)
+        if frame is not None:
+            self.stacks[";".join(_fold(frame))] += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self._sample()
+            except Exception as e:
+                logger.warning(f"error sampling stack: {e}")
+                break
+        if self.path is not None:
+            write_profile(self, self.path)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="zyg-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread = None
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+
+def profile_path(name: str, directory: str = ZYG_PROFILE_DIR) -> str:
+    correlation_id = get_correlation_id() or "-"
+    filename = f"{int(time.time() * 1000)}-{name}-{correlation_id}.folded"
+    return os.path.join(directory, _UNSAFE_NAME.sub("_", filename))
+
+
+def _prune(directory: str, max_files: int) -> None:
+    # only our profiles, the directory might be shared, e.g. `/tmp`.
+    paths = [
+        entry.path
+        for entry in os.scandir(directory)
+        if entry.is_file() and entry.name.endswith(".folded")
+    ]
+    paths.sort(key=os.path.getmtime)
+    for path in paths[: max(len(paths) - max_files, 0)]:
+        os.remove(path)
+
+
+def write_profile(
+    sampler: StackSampler, path: str, max_files: int = ZYG_PROFILE_MAX_FILES
+) -> None:
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            f.write(sampler.folded())
+        _prune(directory, max_files)
+    except OSError as e:
+        logger.warning(f"cannot write profile to: {path} error: {e}")
+        return
+    logger.info(f"profile written to: {path} samples: {sampler.stacks.total()}")
+
+
+@contextlib.contextmanager
+def profile(
+    name: str, task: asyncio.Task | None = None, path: str | None = None
+) -> Iterator[str]:
+    """
+    Profiles the enclosed code running in this thread, or only `task` when
+    given, yields the path the profile is written to when done.
+    """
+    path = path if path is not None else profile_path(name)
+    sampler = StackSampler(threading.get_ident(), task=task, path=path)
+    token = _profiling.set(True)
+    sampler.start()
+    try:
+        yield path
+    finally:
+        sampler.stop()
+        _profiling.reset(token)
+
+
+def list_profiles(directory: str = ZYG_PROFILE_DIR) -> List[dict]:
+    """
+    Profiles written by this host, newest first.
+    """
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.endswith(".folded"):
+            stat = entry.stat()
+            profiles.append(
+                {"name": entry.name, "size": stat.st_size, "mtime": stat.st_mtime}
+            )
+    profiles.sort(key=lambda p: p["mtime"], reverse=True)
+    return profiles
+
+
+def read_profile(name: str, directory: str = ZYG_PROFILE_DIR) -> str | None:
+    # only plain file names, not paths.
+    if name != os.path.basename(name) or not name.endswith(".folded"):
+        return None
+    try:
+        with open(os.path.join(directory, name)) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
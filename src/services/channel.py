@@ -1,3 +1,6 @@
+from typing import Tuple
+
+from src.adapters.cache.channels import publish_slack_channel_invalidation
 from src.adapters.db.adapters import (
     InSyncChannelDBAdapter,
     SlackChannelDBAdapter,
@@ -5,9 +8,10 @@ from src.adapters.db.adapters import (
 )
 from src.application.commands import (
     LinkSlackChannelCommand,
+    ResolveEventContextCommand,
     SearchSlackChannelCommand,
 )
-from src.domain.models import SlackChannel, TriageSlackChannel
+from src.domain.models import Issue, SlackChannel, TriageSlackChannel
 
 
 class SlackChannelService:
@@ -44,8 +48,11 @@ class SlackChannelService:
         )
 
         slack_channel.add_triage_channel(triage_slack_channel)
-        slack_channel = await self.slack_channel_db.save(
-            slack_channel
+        slack_channel = await self.slack_channel_db.save(slack_channel)
+        # workers might have cached the slack channel as not linked.
+        publish_slack_channel_invalidation(
+            tenant_id=slack_channel.tenant_id,
+            slack_channel_ref=slack_channel.slack_channel_ref,
         )
         return slack_channel
 
@@ -75,3 +82,17 @@ class SlackChannelService:
                 )
             )
             return channel
+
+    async def resolve_event_context(
+        self, command: ResolveEventContextCommand
+    ) -> Tuple[SlackChannel, Issue | None] | None:
+        """
+        Resolves the linked slack channel and the issue, if any, for a slack
+        message. Returns None if the slack channel is not linked.
+        """
+        slack_channel_db = self.slack_channel_db
+        return await slack_channel_db.find_with_issue_by_slack_channel_ref_message_ts(
+            tenant_id=command.tenant_id,
+            slack_channel_ref=command.slack_channel_ref,
+            slack_message_ts=command.slack_message_ts,
+        )
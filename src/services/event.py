@@ -1,15 +1,41 @@
+import asyncio
+import json
 import logging
+import os
+import time
 import uuid
 from datetime import datetime
+from typing import Callable, Dict
 
+from attrs import define
+
+from src.adapters.cache.messages import slack_message_cache
 from src.adapters.db.adapters import SlackEventDBAdapter, TenantDBAdapter
 from src.adapters.tasker import worker
-from src.application.commands import SlackEventCallBackCommand
+from src.application.commands import (
+    SlackEventCallBackCommand,
+    SlackEventReplayCommand,
+)
 from src.application.exceptions import SlackTeamReferenceException
-from src.domain.models import SlackEvent, Tenant
+from src.correlation import get_correlation_id
+from src.domain.models import SlackEvent, SlackEventRoute, Tenant
+from src.metrics import Counter, observe_slack_event_stage
 
 logger = logging.getLogger(__name__)
 
+SLACK_EVENTS_DROPPED = Counter(
+    "zyg_slack_events_dropped",
+    "Slack events dropped at ingest before capture, per reason.",
+    labelnames=("reason",),
+)
+_DROPPED = {
+    reason: SLACK_EVENTS_DROPPED.labels(reason)
+    for reason in ("ignored", "no_event", "no_type", "bot", "unsubscribed")
+}
+
+_ROUTE_IGNORED = SlackEventRoute(None, "ignored")
+_ROUTE_NO_EVENT = SlackEventRoute(None, "no_event")
+
 
 class SlackEventCallBackService:
     def __init__(self) -> None:
@@ -33,28 +59,93 @@ class SlackEventCallBackService:
 
         return is_ignored
 
+    @classmethod
+    def route(cls, event: dict) -> SlackEventRoute:
+        """
+        Classifies the event callback before any DB or broker I/O, events we
+        would not handle are dropped and counted per reason.
+
+        Events sent by us are marked to be ignored in their metadata.
+        """
+        inner_event: dict | None = event.get("event", None)
+        if not inner_event:
+            route = _ROUTE_NO_EVENT
+        elif cls.is_ignored(event):
+            route = _ROUTE_IGNORED
+        else:
+            route = SlackEvent.route(inner_event)
+        if route.is_dropped:
+            _DROPPED[route.drop_reason].inc()
+        return route
+
+    @staticmethod
+    def forget_edited_message(event: dict) -> None:
+        """
+        Drops the cached slack message when it is edited or deleted, those
+        events are not subscribed, reactions then fetch it from the Slack API.
+        """
+        inner_event: dict = event.get("event", None) or {}
+        subtype = inner_event.get("subtype", None)
+        if subtype == "message_changed":
+            message: dict = inner_event.get("message", None) or {}
+            ts = message.get("ts", None)
+        elif subtype == "message_deleted":
+            ts = inner_event.get("deleted_ts", None)
+        else:
+            return None
+        slack_team_ref = event.get("team_id", None)
+        slack_channel_ref = inner_event.get("channel", None)
+        if slack_team_ref and slack_channel_ref and ts:
+            slack_message_cache.drop(slack_team_ref, slack_channel_ref, ts)
+
+    @staticmethod
+    def _subscribed_event(slack_event: SlackEvent) -> str:
+        if slack_event.event is None:
+            return "n/a"
+        return slack_event.event.subscribed_event
+
     async def _capture(self, slack_event: SlackEvent) -> SlackEvent:
         slack_event = await self.slack_event_db.save(slack_event)
         logger.info('captured slack event: "%s"', slack_event)
+        observe_slack_event_stage(
+            "capture",
+            slack_event.tenant_id,
+            self._subscribed_event(slack_event),
+            time.time() - slack_event.event_dispatched_ts,
+        )
         return slack_event
 
     async def _dispatch(self, tenant: Tenant, slack_event: SlackEvent) -> None:
         now = datetime.utcnow()
         dispatch_id = str(uuid.uuid4())
+        dispatched_ts = time.time()
+        # the request's own, replays have none and use the dispatch id.
+        correlation_id = get_correlation_id() or dispatch_id
         context = {
             "dispatch_id": dispatch_id,
+            "correlation_id": correlation_id,
             "dispatched_at": now.isoformat(),
+            # epoch seconds for latency checkpoints in the worker.
+            "dispatched_ts": dispatched_ts,
+            "event_time": slack_event.event_dispatched_ts,
             "tenant": tenant.to_dict(),
         }
 
         logger.info(
             "dispatching slack event to `slack_event_dispatch_handler` "
-            f"with dispatch_id: {dispatch_id} at {now.isoformat()}"
+            f"with dispatch_id: {dispatch_id} correlation_id: {correlation_id} "
+            f"at {now.isoformat()}"
         )
 
         task = worker.apply_async(
             "zyg.slack_event_handler", (context, slack_event.to_dict())
         )
+        observe_slack_event_stage(
+            "dispatch",
+            tenant.tenant_id,
+            self._subscribed_event(slack_event),
+            time.time() - dispatched_ts,
+        )
         logger.info("invoked task with task id: %s", task)
         return dispatch_id
 
@@ -127,3 +218,153 @@ class SlackEventCallBackService:
         )
 
         return captured_event
+
+
+@define
+class SlackEventReplayProgress:
+    """
+    Represents the progress of a replay, also used as the checkpoint.
+
+    `last_event_dispatched_ts` and `last_event_id` point to the last row
+    replayed, replay resumes right after it.
+    """
+
+    replayed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    last_event_dispatched_ts: int | None = None
+    last_event_id: str | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "replayed": self.replayed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "last_event_dispatched_ts": self.last_event_dispatched_ts,
+            "last_event_id": self.last_event_id,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SlackEventReplayProgress":
+        return cls(
+            replayed=data.get("replayed", 0),
+            failed=data.get("failed", 0),
+            skipped=data.get("skipped", 0),
+            last_event_dispatched_ts=data.get("last_event_dispatched_ts"),
+            last_event_id=data.get("last_event_id"),
+        )
+
+
+class SlackEventReplayService(SlackEventCallBackService):
+    """
+    Replays captured slack events that are not yet acknowledged,
+    for example after an outage instead of waiting for Slack to retry.
+
+    Events are read from the database a page at a time and dispatched in rate
+    limited batches, progress is checkpointed after each batch so that an
+    interrupted replay can be resumed.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._tenants: Dict[str, Tenant] = {}
+
+    @staticmethod
+    def load_checkpoint(path: str | None) -> SlackEventReplayProgress:
+        if not path or not os.path.exists(path):
+            return SlackEventReplayProgress()
+        with open(path, "r") as f:
+            return SlackEventReplayProgress.from_dict(json.load(f))
+
+    @staticmethod
+    def save_checkpoint(path: str | None, progress: SlackEventReplayProgress):
+        if not path:
+            return
+        # write and then rename, so that we never end up with a partial checkpoint.
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(progress.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    async def _find_tenant(self, tenant_id: str) -> Tenant | None:
+        tenant = self._tenants.get(tenant_id, None)
+        if tenant is None:
+            # not cached when not found, skipped events can be replayed again.
+            tenant = await self.tenant_db.find_by_id(tenant_id)
+            if tenant is not None:
+                self._tenants[tenant_id] = tenant
+        return tenant
+
+    async def _dispatch_batch(
+        self, batch: list, progress: SlackEventReplayProgress
+    ) -> None:
+        for slack_event_entity in batch:
+            try:
+                tenant = await self._find_tenant(slack_event_entity.tenant_id)
+                if tenant is None:
+                    logger.warning(
+                        f"tenant not found: {slack_event_entity.tenant_id} "
+                        f"skipped slack event: {slack_event_entity.event_id}"
+                    )
+                    progress.skipped += 1
+                else:
+                    slack_event = self.slack_event_db.to_domain(slack_event_entity)
+                    await self._dispatch(tenant, slack_event)
+                    progress.replayed += 1
+            except Exception as e:
+                logger.error(
+                    f"error replaying slack event: {slack_event_entity.event_id} {e}"
+                )
+                progress.failed += 1
+            progress.last_event_dispatched_ts = slack_event_entity.event_dispatched_ts
+            progress.last_event_id = slack_event_entity.event_id
+
+    async def replay(
+        self,
+        command: SlackEventReplayCommand,
+        on_progress: Callable[[SlackEventReplayProgress], None] | None = None,
+    ) -> SlackEventReplayProgress:
+        progress = self.load_checkpoint(command.checkpoint_path)
+        if progress.last_event_id:
+            logger.info(
+                f"resuming replay after event_id: {progress.last_event_id} "
+                f"with {progress.replayed} replayed, {progress.failed} failed "
+                f"and {progress.skipped} skipped"
+            )
+
+        # number of events dispatched in this run, used for rate limiting.
+        dispatched = 0
+        started_at = time.monotonic()
+        while True:
+            # keyset paging from the last row seen, no transaction or cursor
+            # is held open while dispatching or sleeping.
+            batch = await self.slack_event_db.find_unacked_after(
+                since_ts=command.since_ts,
+                until_ts=command.until_ts,
+                after_ts=progress.last_event_dispatched_ts,
+                after_event_id=progress.last_event_id,
+                limit=command.batch_size,
+            )
+            if not batch:
+                break
+            await self._dispatch_batch(batch, progress)
+            dispatched += len(batch)
+            self.save_checkpoint(command.checkpoint_path, progress)
+            logger.info(
+                f"replay progress {progress.replayed} replayed, "
+                f"{progress.failed} failed and {progress.skipped} skipped"
+            )
+            if on_progress is not None:
+                on_progress(progress)
+            if len(batch) < command.batch_size:
+                break
+            # sleep off whatever is ahead of the rate limit.
+            ahead = dispatched / command.rate - (time.monotonic() - started_at)
+            if ahead > 0:
+                await asyncio.sleep(ahead)
+
+        logger.info(
+            f"replay done with {progress.replayed} replayed, "
+            f"{progress.failed} failed and {progress.skipped} skipped"
+        )
+        return progress
@@ -1,6 +1,7 @@
 import logging
 from typing import Dict, List
 
+from src.adapters.cache.users import publish_user_invalidation
 from src.adapters.db.adapters import (
     InSyncChannelDBAdapter,
     InSyncSlackUserDBAdapter,
@@ -138,6 +139,16 @@ class SlackUserSyncService:
                 upserted_user["insync_user"] = insync_user
                 upserted_user["user"] = user
                 insync_user_upserts.append(upserted_user)
+            # workers drop the upserted users and warm their cache again.
+            publish_user_invalidation(
+                tenant_id=tenant.tenant_id,
+                slack_user_refs=[
+                    r["user"].slack_user_ref
+                    for r in insync_user_upserts
+                    if r["user"] is not None
+                ],
+                warm=True,
+            )
             return insync_user_upserts
         else:
             return insync_users
@@ -1,5 +1,7 @@
+from typing import List
+
 from src.adapters.db.adapters import UserDBAdapter
-from src.application.commands import SearchUserCommand
+from src.application.commands import ListUserCommand, SearchUserCommand
 from src.domain.models import User
 
 
@@ -16,3 +18,6 @@ class UserService:
                 command.tenant_id, command.slack_user_ref
             )
         return user
+
+    async def list(self, command: ListUserCommand) -> List[User]:
+        return await self.user_db.find_all_by_tenant_id(command.tenant_id)
@@ -1,14 +1,21 @@
 import logging
 from typing import Callable
 
+from src.adapters.cache.channels import linked_slack_channel_cache
+from src.adapters.cache.local import MISSING
+from src.adapters.cache.messages import slack_message_cache
+from src.adapters.cache.singleflight import SingleFlight
+from src.adapters.cache.suppression import SuppressionWindow
+from src.adapters.cache.users import user_cache
 from src.adapters.rpc.api import ZygWebAPIConnector
-from src.adapters.rpc.exceptions import UserNotFoundAPIError
+from src.adapters.rpc.exceptions import ListUserAPIError, UserNotFoundAPIError
 from src.adapters.rpc.ext import SlackWebAPIConnector
 from src.application.commands.api import (
     CreateIssueAPICommand,
     FindIssueBySlackChannelIdMessageTsAPICommand,
-    FindSlackChannelByRefAPICommand,
     FindUserByRefAPICommand,
+    ListUserAPICommand,
+    ResolveEventContextAPICommand,
 )
 from src.application.commands.slack import (
     ChatPostMessageCommand,
@@ -24,7 +31,7 @@ from src.application.repr.slack import (
     nudge_issue_message_blocks_repr,
     nudge_issue_message_text_repr,
 )
-from src.config import SLACK_BOT_OAUTH_TOKEN
+from src.config import SLACK_BOT_OAUTH_TOKEN, ZYG_NUDGE_SUPPRESSION_SECONDS
 from src.domain.models import (
     ChannelMessage,
     Issue,
@@ -34,10 +41,79 @@ from src.domain.models import (
     Tenant,
     User,
 )
+from src.metrics import Counter
 from src.services.exceptions import UnSupportedSlackEventException
 
 logger = logging.getLogger(__name__)
 
+SLACK_NUDGES = Counter(
+    "zyg_slack_nudges",
+    "Issue nudges for channel messages, sent or suppressed.",
+    labelnames=("result",),
+)
+_NUDGES_SENT = SLACK_NUDGES.labels("sent")
+_NUDGES_SUPPRESSED = SLACK_NUDGES.labels("suppressed")
+
+# keyed by tenant, slack channel and slack user.
+nudge_suppression = SuppressionWindow("zyg:nudge", ZYG_NUDGE_SUPPRESSION_SECONDS)
+
+# keyed by tenant, slack channel and slack message ts.
+reaction_flight = SingleFlight("reaction")
+
+
+def _user_from_response(tenant_id: str, response: dict) -> User:
+    data = {
+        "tenant_id": tenant_id,
+        "user_id": response["user_id"],
+        "slack_user_ref": response["slack_user_ref"],
+        "name": response["name"],
+        "role": response["role"],
+    }
+    return User.from_dict(data)
+
+
+async def _warm_user_cache(zyg_api: ZygWebAPIConnector, tenant: Tenant) -> None:
+    try:
+        results = await zyg_api.list_users(
+            ListUserAPICommand(tenant_id=tenant.tenant_id)
+        )
+    except ListUserAPIError as e:
+        logger.warning(f"cannot warm user cache: {e}")
+        return None
+    count = user_cache.warm(_user_from_response(tenant.tenant_id, r) for r in results)
+    logger.info(f"warmed user cache with {count} users")
+
+
+async def _resolve_user(tenant: Tenant, slack_user_ref: str) -> User | None:
+    """
+    Returns the user from the cache or the API, None if there is no such user.
+    """
+    zyg_api = ZygWebAPIConnector(tenant_context=tenant.build_context())
+
+    if user_cache.take_pending_warm(tenant.tenant_id):
+        await _warm_user_cache(zyg_api, tenant)
+
+    user = user_cache.get(tenant.tenant_id, slack_user_ref)
+    if user is MISSING:
+        return None
+    if user is not None:
+        return user
+
+    try:
+        response = await zyg_api.get_user_by_slack_ref(
+            command=FindUserByRefAPICommand(
+                tenant_id=tenant.tenant_id,
+                slack_user_ref=slack_user_ref,
+            )
+        )
+    except UserNotFoundAPIError as e:
+        logger.error(f"error: {e}")
+        user_cache.set_missing(tenant.tenant_id, slack_user_ref)
+        return None
+    user = _user_from_response(tenant.tenant_id, response)
+    user_cache.set(user)
+    return user
+
 
 async def channel_message_handler(tenant: Tenant, slack_event: SlackEvent):
     """
@@ -58,25 +134,25 @@ async def channel_message_handler(tenant: Tenant, slack_event: SlackEvent):
     if not slack_user_ref:
         raise ValueError("`slack_user_ref` is required for channel message event")
 
-    zyg_api = ZygWebAPIConnector(tenant_context=tenant.build_context())
+    # for reactions on the message later on, only kept for linked slack channels.
+    if linked_slack_channel_cache.get_linked(tenant.tenant_id, event.slack_channel_ref):
+        slack_message_cache.add(tenant, event)
+
+    # the user was nudged recently in the slack channel, skip it all.
+    window = (tenant.tenant_id, event.slack_channel_ref, slack_user_ref)
+    if not nudge_suppression.acquire(*window):
+        _NUDGES_SUPPRESSED.inc()
+        logger.info("user was nudged recently ignore and terminate")
+        return None
 
     try:
-        response = await zyg_api.get_user_by_slack_ref(
-            command=FindUserByRefAPICommand(
-                tenant_id=tenant.tenant_id,
-                slack_user_ref=slack_user_ref,
-            )
-        )
-        data = {
-            "tenant_id": tenant.tenant_id,
-            "user_id": response["user_id"],
-            "slack_user_ref": response["slack_user_ref"],
-            "name": response["name"],
-            "role": response["role"],
-        }
-        user = User.from_dict(data)
-    except UserNotFoundAPIError as e:
-        logger.error(f"error: {e}")
+        user = await _resolve_user(tenant, slack_user_ref)
+    except Exception:
+        # not nudged, so dont suppress the next one.
+        nudge_suppression.release(*window)
+        raise
+    if user is None:
+        logger.info("user not found ignore and terminate")
         return None
 
     slack_api = SlackWebAPIConnector(
@@ -94,70 +170,84 @@ async def channel_message_handler(tenant: Tenant, slack_event: SlackEvent):
         "event_type": "issue_nudge",
         "event_payload": {"is_ignored": True},
     }
-    response = slack_api.nudge_for_issue(command, metadata=metadata)
+    try:
+        response = slack_api.nudge_for_issue(command, metadata=metadata)
+    except Exception:
+        # not nudged, so dont suppress the next one.
+        nudge_suppression.release(*window)
+        raise
+    _NUDGES_SENT.inc()
 
     print(f"response: {response}")
 
     return response
 
 
-async def reaction_added_handler(tenant: Tenant, slack_event: SlackEvent):
+async def _create_issue_for_reaction(
+    tenant: Tenant, event: MessageReactionAdded
+) -> dict | None:
     """
-    func named after Slack API event type: `reaction_added`
-    """
-    logger.info("handler for slack event: `reaction_added`")
-    logger.info(f"tenant: {tenant}")
-    logger.info(f"slack_event: {slack_event}")
-
-    if not slack_event.is_reaction_added:
-        raise RuntimeError("slack event is not a reaction added event")
-
-    event: MessageReactionAdded = slack_event.event
-    if not event.is_reaction_ticket:
-        logger.info("reaction is not a ticket emoji ignore and terminate")
-        return None
-    logger.info("reaction is a ticket emoji")
+    Creates the issue for the reacted slack message, if not yet created.
 
+    Returns the created issue's id and number, shared with concurrent reactions.
+    """
     zyg_api = ZygWebAPIConnector(tenant_context=tenant.build_context())
     slack_api = SlackWebAPIConnector(
         tenant_context=tenant.build_context(),
         token=SLACK_BOT_OAUTH_TOKEN,
     )
 
-    logger.info("find slack channel by ref...")
-    command = FindSlackChannelByRefAPICommand(
-        tenant_id=tenant.tenant_id,
-        slack_channel_ref=event.slack_channel_ref,
-    )
-
-    result = await zyg_api.find_slack_channel_by_ref(command)
-    if not result:
-        logger.warning("slack channel not found or is not linked to track for issue")
-        return None
-    slack_channel = SlackChannel.from_dict(tenant.tenant_id, result[0])
-
-    logger.info("find issue for slack channel id and message ts...")
-    command = FindIssueBySlackChannelIdMessageTsAPICommand(
-        tenant_id=tenant.tenant_id,
-        slack_channel_id=slack_channel.slack_channel_id,
-        slack_message_ts=event.message_ts,
+    slack_channel = linked_slack_channel_cache.get_linked(
+        tenant.tenant_id, event.slack_channel_ref
     )
+    if slack_channel is not None:
+        logger.info("find issue for the slack message in the linked slack channel...")
+        command = FindIssueBySlackChannelIdMessageTsAPICommand(
+            tenant_id=tenant.tenant_id,
+            slack_channel_id=slack_channel.slack_channel_id,
+            slack_message_ts=event.message_ts,
+        )
+        issues = await zyg_api.find_issue_by_slack_channel_id_message_ts(command)
+        has_issue = issues is not None
+    else:
+        logger.info("resolve slack channel and issue for the slack message...")
+        command = ResolveEventContextAPICommand(
+            tenant_id=tenant.tenant_id,
+            slack_channel_ref=event.slack_channel_ref,
+            slack_message_ts=event.message_ts,
+        )
+        result = await zyg_api.resolve_event_context(command)
+        if not result:
+            logger.warning(
+                "slack channel not found or is not linked to track for issue"
+            )
+            linked_slack_channel_cache.set_not_linked(
+                tenant.tenant_id, event.slack_channel_ref
+            )
+            return None
+        slack_channel = SlackChannel.from_dict(
+            tenant.tenant_id, result["slack_channel"]
+        )
+        linked_slack_channel_cache.set_linked(slack_channel)
+        has_issue = bool(result["issue"])
 
-    result = await zyg_api.find_issue_by_slack_channel_id_message_ts(command)
-    if result:
+    if has_issue:
         logger.info("issue already exists for the slack message ignore and terminate")
         return None
 
     logger.info("issue not yet created for the slack message...")
     logger.info("getting slack message for added reaction...")
-    command = GetSingleChannelMessage(
-        channel=event.slack_channel_ref,
-        limit=1,
-        oldest=event.message_ts,
-        inclusive=True,
+    slack_message = slack_message_cache.get(
+        tenant, event.slack_channel_ref, event.message_ts
     )
-
-    slack_message = slack_api.find_single_channel_message(command)
+    if slack_message is None:
+        command = GetSingleChannelMessage(
+            channel=event.slack_channel_ref,
+            limit=1,
+            oldest=event.message_ts,
+            inclusive=True,
+        )
+        slack_message = slack_api.find_single_channel_message(command)
     if slack_message is None:
         logger.warning("no slack message found for the reaction added")
         return None
@@ -193,7 +283,38 @@ async def reaction_added_handler(tenant: Tenant, slack_event: SlackEvent):
         },
     }
     response = slack_api.reply_to_message(command, metadata=metadata)
-    return response
+    logger.info(f"response: {response}")
+    return {"issue_id": issue.issue_id, "issue_number": issue.issue_number}
+
+
+async def reaction_added_handler(tenant: Tenant, slack_event: SlackEvent):
+    """
+    func named after Slack API event type: `reaction_added`
+    """
+    logger.info("handler for slack event: `reaction_added`")
+    logger.info(f"tenant: {tenant}")
+    logger.info(f"slack_event: {slack_event}")
+
+    if not slack_event.is_reaction_added:
+        raise RuntimeError("slack event is not a reaction added event")
+
+    event: MessageReactionAdded = slack_event.event
+    if not event.is_reaction_ticket:
+        logger.info("reaction is not a ticket emoji ignore and terminate")
+        return None
+    logger.info("reaction is a ticket emoji")
+
+    if linked_slack_channel_cache.is_not_linked(
+        tenant.tenant_id, event.slack_channel_ref
+    ):
+        logger.info("slack channel is not linked ignore and terminate")
+        return None
+
+    # concurrent reactions on the same message, only one creates the issue.
+    key = f"{tenant.tenant_id}:{event.slack_channel_ref.lower()}:{event.message_ts}"
+    return await reaction_flight.run(
+        key, lambda: _create_issue_for_reaction(tenant, event)
+    )
 
 
 _SUBSCRIBED_EVENT_HANDLERS = {
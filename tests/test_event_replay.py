@@ -0,0 +1,185 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.application.commands import SlackEventReplayCommand
+from src.services.event import SlackEventReplayProgress, SlackEventReplayService
+
+
+class InMemorySlackEventDB:
+    def __init__(self, rows: list) -> None:
+        self.rows = rows
+        self.pages = 0
+
+    async def find_unacked_after(
+        self, since_ts, until_ts, after_ts=None, after_event_id=None, limit=500
+    ):
+        self.pages += 1
+        after = (
+            after_ts if after_ts is not None else since_ts - 1,
+            after_event_id if after_event_id is not None else "",
+        )
+        rows = sorted(
+            (
+                r
+                for r in self.rows
+                if since_ts <= r.event_dispatched_ts <= until_ts
+                and (r.event_dispatched_ts, r.event_id) > after
+            ),
+            key=lambda r: (r.event_dispatched_ts, r.event_id),
+        )
+        return rows[:limit]
+
+    def to_domain(self, slack_event_entity):
+        return slack_event_entity
+
+
+class InMemoryTenantDB:
+    def __init__(self, tenant_ids: tuple) -> None:
+        self.tenants = {i: SimpleNamespace(tenant_id=i) for i in tenant_ids}
+        self.lookups = 0
+
+    async def find_by_id(self, tenant_id):
+        self.lookups += 1
+        return self.tenants.get(tenant_id, None)
+
+
+class InMemoryReplayService(SlackEventReplayService):
+    def __init__(self, rows: list, tenant_ids: tuple = ("tn1",)) -> None:
+        self._tenants = {}
+        self.tenant_db = InMemoryTenantDB(tenant_ids)
+        self.slack_event_db = InMemorySlackEventDB(rows)
+        self.dispatched = []
+
+    async def _dispatch(self, tenant, slack_event):
+        self.dispatched.append(slack_event.event_id)
+
+
+class Interrupted(Exception):
+    pass
+
+
+def _rows() -> list:
+    # same dispatched ts across page boundaries, ordered by event_id within.
+    ts = [100, 100, 100, 101, 101, 102, 103, 103]
+    ids = ["ev5", "ev2", "ev8", "ev1", "ev7", "ev3", "ev6", "ev4"]
+    return [
+        SimpleNamespace(tenant_id="tn1", event_id=i, event_dispatched_ts=t)
+        for t, i in zip(ts, ids)
+    ]
+
+
+_ORDER = ["ev2", "ev5", "ev8", "ev1", "ev7", "ev3", "ev4", "ev6"]
+
+
+def _command(checkpoint_path=None, since_ts=100, until_ts=200, batch_size=3):
+    return SlackEventReplayCommand(
+        since_ts=since_ts,
+        until_ts=until_ts,
+        batch_size=batch_size,
+        rate=1_000_000,
+        checkpoint_path=checkpoint_path,
+    )
+
+
+def test_load_checkpoint_without_path():
+    assert SlackEventReplayService.load_checkpoint(None) == SlackEventReplayProgress()
+
+
+def test_load_checkpoint_missing_file(tmp_path):
+    path = str(tmp_path / "missing.json")
+    assert SlackEventReplayService.load_checkpoint(path) == SlackEventReplayProgress()
+
+
+def test_save_and_load_checkpoint(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    progress = SlackEventReplayProgress(
+        replayed=3, failed=1, last_event_dispatched_ts=101, last_event_id="ev7"
+    )
+    SlackEventReplayService.save_checkpoint(path, progress)
+
+    assert SlackEventReplayService.load_checkpoint(path) == progress
+    assert json.loads((tmp_path / "checkpoint.json").read_text()) == progress.to_dict()
+    # written and then renamed.
+    assert not (tmp_path / "checkpoint.json.tmp").exists()
+
+
+def test_save_checkpoint_without_path(tmp_path):
+    SlackEventReplayService.save_checkpoint(None, SlackEventReplayProgress())
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_replay_in_keyset_order():
+    service = InMemoryReplayService(_rows())
+    progress = await service.replay(_command(batch_size=3))
+
+    assert service.dispatched == _ORDER
+    assert progress.replayed == len(_ORDER)
+    assert progress.failed == 0
+    assert (progress.last_event_dispatched_ts, progress.last_event_id) == (103, "ev6")
+    # the last page is short, no need to ask for another.
+    assert service.slack_event_db.pages == 3
+
+
+@pytest.mark.asyncio
+async def test_replay_within_time_range():
+    service = InMemoryReplayService(_rows())
+    await service.replay(_command(since_ts=101, until_ts=102, batch_size=2))
+
+    assert service.dispatched == ["ev1", "ev7", "ev3"]
+
+
+@pytest.mark.asyncio
+async def test_replay_resumes_from_checkpoint(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    rows = _rows()
+
+    def interrupt(progress):
+        raise Interrupted()
+
+    first = InMemoryReplayService(rows)
+    with pytest.raises(Interrupted):
+        await first.replay(_command(path, batch_size=3), on_progress=interrupt)
+    assert first.dispatched == _ORDER[:3]
+    assert SlackEventReplayService.load_checkpoint(path) == SlackEventReplayProgress(
+        replayed=3, failed=0, last_event_dispatched_ts=100, last_event_id="ev8"
+    )
+
+    second = InMemoryReplayService(rows)
+    progress = await second.replay(_command(path, batch_size=3))
+
+    assert second.dispatched == _ORDER[3:]
+    assert progress.replayed == len(_ORDER)
+    assert SlackEventReplayService.load_checkpoint(path) == progress
+
+
+@pytest.mark.asyncio
+async def test_replay_counts_failures_and_moves_on(tmp_path):
+    class FailingReplayService(InMemoryReplayService):
+        async def _dispatch(self, tenant, slack_event):
+            if slack_event.event_id == "ev5":
+                raise RuntimeError("broker down")
+            await super()._dispatch(tenant, slack_event)
+
+    service = FailingReplayService(_rows())
+    progress = await service.replay(_command(batch_size=3))
+
+    assert service.dispatched == [i for i in _ORDER if i != "ev5"]
+    assert (progress.replayed, progress.failed) == (len(_ORDER) - 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_replay_skips_events_of_missing_tenants():
+    rows = _rows()
+    for row in rows:
+        if row.event_id in ("ev2", "ev7"):
+            row.tenant_id = "tn2"
+    service = InMemoryReplayService(rows, tenant_ids=("tn1",))
+    progress = await service.replay(_command(batch_size=3))
+
+    assert service.dispatched == [i for i in _ORDER if i not in ("ev2", "ev7")]
+    assert (progress.replayed, progress.failed, progress.skipped) == (6, 0, 2)
+    # found once and cached, looked up again for each event when not found.
+    assert service.tenant_db.lookups == 3
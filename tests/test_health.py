@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from src.adapters.web import health
+from src.adapters.web.health import HealthChecker
+
+
+class FakePool:
+    """One connection, like a pool sized from a small connection budget."""
+
+    def __init__(self) -> None:
+        self.checked_out = 0
+
+    def saturation(self) -> float:
+        return self.checked_out / 1
+
+
+@pytest.fixture
+def checker(monkeypatch) -> HealthChecker:
+    pool = FakePool()
+
+    async def probe_postgres():
+        pool.checked_out += 1
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            pool.checked_out -= 1
+        return "connected"
+
+    async def probe_broker():
+        return "connected"
+
+    monkeypatch.setattr(health, "pool_saturation", lambda engine: pool.saturation())
+    monkeypatch.setattr(health, "get_engine", lambda: None)
+    checker = HealthChecker(interval=5, timeout=1, saturation=0.9)
+    checker._probes["postgres"] = probe_postgres
+    checker._probes["broker"] = probe_broker
+    return checker
+
+
+@pytest.mark.asyncio
+async def test_pool_probe_does_not_count_the_postgres_probe(checker):
+    await checker.refresh()
+    ready, probes = checker.readiness()
+
+    assert probes["db_pool"] == {"ok": True, "detail": "0% checked out"}
+    assert ready
+
+
+@pytest.mark.asyncio
+async def test_not_ready_before_first_refresh(checker):
+    ready, probes = checker.readiness()
+
+    assert not ready
+    assert probes["postgres"] == {"ok": False, "detail": "not checked yet"}
@@ -0,0 +1,20 @@
+import statistics
+
+import pytest
+
+from bench.import_time import DEFAULT_BUDGETS_MS, ENTRY_POINTS, import_times
+
+# median of a few fresh interpreters, one run is too noisy to assert on.
+_RUNS = 3
+
+
+@pytest.mark.parametrize("name", sorted(ENTRY_POINTS))
+def test_entry_point_import_time_within_budget(name):
+    module = ENTRY_POINTS[name]
+    total = statistics.median(import_times(module)[0] for _ in range(_RUNS))
+
+    assert total <= DEFAULT_BUDGETS_MS[name], (
+        f"importing `{module}` takes {total:.0f} ms, "
+        f"over the budget of {DEFAULT_BUDGETS_MS[name]:.0f} ms, "
+        f"see `python -m bench.import_time` for the slowest imports"
+    )
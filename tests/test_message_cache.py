@@ -0,0 +1,134 @@
+import pytest
+
+from src.adapters.cache import messages
+from src.adapters.cache.channels import LinkedSlackChannelCache
+from src.adapters.cache.local import TTLCache
+from src.adapters.cache.messages import SlackMessageCache
+from src.domain.models import SlackChannel, SlackEvent, Tenant
+from src.services.event import SlackEventCallBackService
+from src.tasks import event as event_tasks
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key, None)
+
+    def set(self, key, value, px=None):
+        self.values[key] = value
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+class OpenWindow:
+    def acquire(self, *parts: str) -> bool:
+        return True
+
+    def release(self, *parts: str) -> None:
+        pass
+
+
+def _channel_message() -> SlackEvent:
+    payload = {
+        "team_id": "T0001",
+        "api_app_id": "A0001",
+        "event": {
+            "type": "message",
+            "text": "the export to CSV is failing",
+            "user": "U0001",
+            "ts": "1700000000.000100",
+            "team": "T0001",
+            "channel": "C0001",
+            "event_ts": "1700000000.000100",
+            "channel_type": "channel",
+        },
+        "type": "event_callback",
+        "event_id": "Ev0001",
+        "event_time": 1700000000,
+    }
+    return SlackEvent.from_payload(tenant_id="tn1", event_id="ev1", payload=payload)
+
+
+@pytest.fixture
+def message_cache(monkeypatch) -> SlackMessageCache:
+    redis = FakeRedis()
+    monkeypatch.setattr(messages, "get_redis", lambda: redis)
+    cache = SlackMessageCache(ttl=60)
+    monkeypatch.setattr(event_tasks, "slack_message_cache", cache)
+    monkeypatch.setattr("src.services.event.slack_message_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def channel_cache(monkeypatch) -> LinkedSlackChannelCache:
+    cache = LinkedSlackChannelCache(TTLCache("test_channel", maxsize=10, ttl=60))
+    monkeypatch.setattr(event_tasks, "linked_slack_channel_cache", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def no_nudge(monkeypatch):
+    async def resolve_user(tenant, slack_user_ref):
+        return None
+
+    monkeypatch.setattr(event_tasks, "nudge_suppression", OpenWindow())
+    monkeypatch.setattr(event_tasks, "_resolve_user", resolve_user)
+
+
+@pytest.mark.asyncio
+async def test_message_not_cached_unless_channel_is_linked(
+    message_cache, channel_cache
+):
+    tenant = Tenant("tn1", "tenant", "t0001")
+
+    await event_tasks.channel_message_handler(tenant, _channel_message())
+
+    assert message_cache.get(tenant, "C0001", "1700000000.000100") is None
+
+
+@pytest.mark.asyncio
+async def test_message_cached_in_linked_channel(message_cache, channel_cache):
+    tenant = Tenant("tn1", "tenant", "t0001")
+    channel_cache.set_linked(
+        SlackChannel.from_dict(
+            "tn1", {"channel_id": "sc1", "slack_channel_ref": "c0001"}
+        )
+    )
+
+    await event_tasks.channel_message_handler(tenant, _channel_message())
+
+    message = message_cache.get(tenant, "C0001", "1700000000.000100")
+    assert message.text == "the export to CSV is failing"
+
+
+@pytest.mark.parametrize(
+    "inner_event",
+    [
+        {
+            "type": "message",
+            "subtype": "message_changed",
+            "channel": "C0001",
+            "channel_type": "channel",
+            "message": {"type": "message", "text": "edited", "ts": "1700000000.000100"},
+        },
+        {
+            "type": "message",
+            "subtype": "message_deleted",
+            "channel": "C0001",
+            "channel_type": "channel",
+            "deleted_ts": "1700000000.000100",
+        },
+    ],
+)
+def test_edited_or_deleted_message_is_dropped(message_cache, inner_event):
+    tenant = Tenant("tn1", "tenant", "t0001")
+    message_cache.add(tenant, _channel_message().event)
+    event = {"team_id": "T0001", "type": "event_callback", "event": inner_event}
+
+    assert SlackEventCallBackService.route(event).is_dropped
+    SlackEventCallBackService.forget_edited_message(event)
+
+    assert message_cache.get(tenant, "C0001", "1700000000.000100") is None
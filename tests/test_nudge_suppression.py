@@ -0,0 +1,77 @@
+import pytest
+
+from src.domain.models import SlackEvent, Tenant
+from src.tasks import event as event_tasks
+
+
+class RecordingWindow:
+    def __init__(self, acquired: bool = True) -> None:
+        self.acquired = acquired
+        self.released = []
+
+    def acquire(self, *parts: str) -> bool:
+        return self.acquired
+
+    def release(self, *parts: str) -> None:
+        self.released.append(parts)
+
+
+class NoMessageCache:
+    def add(self, tenant, message) -> None:
+        pass
+
+
+def _channel_message() -> SlackEvent:
+    payload = {
+        "team_id": "T0001",
+        "api_app_id": "A0001",
+        "event": {
+            "type": "message",
+            "text": "the export to CSV is failing",
+            "user": "U0001",
+            "ts": "1700000000.000100",
+            "team": "T0001",
+            "channel": "C0001",
+            "event_ts": "1700000000.000100",
+            "channel_type": "channel",
+        },
+        "type": "event_callback",
+        "event_id": "Ev0001",
+        "event_time": 1700000000,
+    }
+    return SlackEvent.from_payload(tenant_id="tn1", event_id="ev1", payload=payload)
+
+
+@pytest.fixture
+def window(monkeypatch) -> RecordingWindow:
+    window = RecordingWindow()
+    monkeypatch.setattr(event_tasks, "nudge_suppression", window)
+    # not to reach Redis from the handler.
+    monkeypatch.setattr(event_tasks, "slack_message_cache", NoMessageCache())
+    return window
+
+
+@pytest.mark.asyncio
+async def test_window_released_when_user_lookup_fails(monkeypatch, window):
+    async def resolve_user(tenant, slack_user_ref):
+        raise ConnectionError("zyg api is not reachable")
+
+    monkeypatch.setattr(event_tasks, "_resolve_user", resolve_user)
+    tenant = Tenant("tn1", "tenant", "T0001")
+
+    with pytest.raises(ConnectionError):
+        await event_tasks.channel_message_handler(tenant, _channel_message())
+
+    assert window.released == [("tn1", "C0001", "U0001")]
+
+
+@pytest.mark.asyncio
+async def test_window_kept_when_user_not_found(monkeypatch, window):
+    async def resolve_user(tenant, slack_user_ref):
+        return None
+
+    monkeypatch.setattr(event_tasks, "_resolve_user", resolve_user)
+    tenant = Tenant("tn1", "tenant", "T0001")
+
+    assert await event_tasks.channel_message_handler(tenant, _channel_message()) is None
+    assert window.released == []
@@ -0,0 +1,105 @@
+import asyncio
+import os
+import time
+
+import pytest
+from celery import Celery
+
+from src import profiling
+from src.adapters.tasker.base import PROFILE_TASK_HEADER, ProfiledTask
+from src.adapters.web import middleware
+from src.adapters.web.middleware import ProfilingMiddleware
+
+
+def _wait_for(path: str, timeout: float = 2.0) -> str:
+    # written by the sampler thread once stopped.
+    deadline = time.monotonic() + timeout
+    while True:
+        if os.path.exists(path):
+            with open(path) as f:
+                folded = f.read()
+            if folded.endswith("\n"):
+                return folded
+        assert time.monotonic() < deadline, f"profile not written: {path}"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def profile_dir(monkeypatch, tmp_path) -> str:
+    directory = str(tmp_path)
+    original = profiling.profile_path
+
+    def profile_path(name: str) -> str:
+        return original(name, directory=directory)
+
+    monkeypatch.setattr(profiling, "profile_path", profile_path)
+    return directory
+
+
+@pytest.mark.asyncio
+async def test_forced_request_profile_is_written_and_sent_back(
+    monkeypatch, profile_dir
+):
+    monkeypatch.setattr(middleware, "is_admin_token", lambda token: token == "t0k")
+
+    async def app(scope, receive, send):
+        await asyncio.sleep(0.05)
+        time.sleep(0.05)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/health/",
+        "headers": [(b"x-zyg-profile", b"1"), (b"x-zyg-admin-token", b"t0k")],
+    }
+    await ProfilingMiddleware(app)(scope, None, send)
+
+    headers = dict(sent[0]["headers"])
+    path = headers[b"x-zyg-profile"].decode("latin-1")
+    assert os.path.dirname(path) == profile_dir
+    assert path.endswith(".folded")
+    folded = _wait_for(path)
+    assert f"{profiling.AWAITING_FRAME} " in folded
+    assert "test_forced_request_profile_is_written_and_sent_back" in folded
+
+
+def test_forced_task_profile_is_written(profile_dir):
+    app = Celery("test", task_cls=ProfiledTask)
+
+    @app.task(name="zyg.test_profiled")
+    def profiled():
+        time.sleep(0.05)
+        return True
+
+    assert profiled.apply(headers={PROFILE_TASK_HEADER: True}).get() is True
+    deadline = time.monotonic() + 2.0
+    while not os.listdir(profile_dir):
+        assert time.monotonic() < deadline, "profile not written"
+        time.sleep(0.01)
+    (name,) = os.listdir(profile_dir)
+    assert "zyg.test_profiled" in name
+    assert "profiled" in _wait_for(os.path.join(profile_dir, name))
+
+
+def test_prune_keeps_other_files(tmp_path):
+    directory = str(tmp_path)
+    for i in range(3):
+        path = os.path.join(directory, f"{i}-GET_health-.folded")
+        with open(path, "w") as f:
+            f.write("main 1\n")
+        os.utime(path, (i, i))
+    unrelated = os.path.join(directory, "unrelated.txt")
+    with open(unrelated, "w") as f:
+        f.write("not a profile\n")
+    os.utime(unrelated, (0, 0))
+
+    profiling._prune(directory, max_files=1)
+
+    assert sorted(os.listdir(directory)) == ["2-GET_health-.folded", "unrelated.txt"]
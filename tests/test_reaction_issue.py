@@ -0,0 +1,81 @@
+import pytest
+
+from src.adapters.cache.channels import LinkedSlackChannelCache
+from src.adapters.cache.local import TTLCache
+from src.domain.models import SlackChannel, SlackEvent, Tenant
+from src.tasks import event as event_tasks
+
+_CHANNEL = {
+    "channel_id": "sc1",
+    "slack_channel_ref": "c0001",
+    "slack_channel_name": "support",
+}
+
+
+class RecordingZygAPI:
+    calls = []
+
+    def __init__(self, tenant_context) -> None:
+        pass
+
+    async def resolve_event_context(self, command):
+        self.calls.append(("resolve_event_context", command.slack_channel_ref))
+        return {"slack_channel": _CHANNEL, "issue": {"issue_id": "is1"}}
+
+    async def find_issue_by_slack_channel_id_message_ts(self, command):
+        self.calls.append(("find_issue", command.slack_channel_id))
+        return [{"issue_id": "is1"}]
+
+
+def _reaction() -> SlackEvent:
+    payload = {
+        "team_id": "T0001",
+        "api_app_id": "A0001",
+        "event": {
+            "type": "reaction_added",
+            "user": "U0001",
+            "reaction": "ticket",
+            "item": {"type": "message", "channel": "C0001", "ts": "1700000000.0001"},
+            "item_user": "U0002",
+            "event_ts": "1700000001.000100",
+        },
+        "type": "event_callback",
+        "event_id": "Ev0002",
+        "event_time": 1700000001,
+    }
+    return SlackEvent.from_payload(tenant_id="tn1", event_id="ev2", payload=payload)
+
+
+@pytest.fixture
+def zyg_api(monkeypatch):
+    RecordingZygAPI.calls = []
+    monkeypatch.setattr(event_tasks, "ZygWebAPIConnector", RecordingZygAPI)
+    monkeypatch.setattr(event_tasks, "SlackWebAPIConnector", lambda **kwargs: None)
+    return RecordingZygAPI
+
+
+@pytest.fixture
+def channel_cache(monkeypatch) -> LinkedSlackChannelCache:
+    cache = LinkedSlackChannelCache(TTLCache("test_channel", maxsize=10, ttl=60))
+    monkeypatch.setattr(event_tasks, "linked_slack_channel_cache", cache)
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_resolves_the_slack_channel_when_not_cached(zyg_api, channel_cache):
+    tenant = Tenant("tn1", "tenant", "T0001")
+    event = _reaction().event
+
+    assert await event_tasks._create_issue_for_reaction(tenant, event) is None
+    assert zyg_api.calls == [("resolve_event_context", "c0001")]
+    assert channel_cache.get_linked("tn1", "C0001").slack_channel_id == "sc1"
+
+
+@pytest.mark.asyncio
+async def test_skips_the_slack_channel_lookup_when_cached(zyg_api, channel_cache):
+    tenant = Tenant("tn1", "tenant", "T0001")
+    event = _reaction().event
+    channel_cache.set_linked(SlackChannel.from_dict("tn1", _CHANNEL))
+
+    assert await event_tasks._create_issue_for_reaction(tenant, event) is None
+    assert zyg_api.calls == [("find_issue", "sc1")]
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from src.adapters.cache import singleflight
+from src.adapters.cache.singleflight import SingleFlight
+
+
+class FakeRedis:
+    """
+    Just enough of the blocking client, values never expire.
+    """
+
+    def __init__(self) -> None:
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self.values.get(key, None)
+
+    def set(self, key, value, nx=False, px=None):
+        with self._lock:
+            if nx and key in self.values:
+                return None
+            self.values[key] = value if isinstance(value, bytes) else value.encode()
+            return True
+
+    def eval(self, script, numkeys, key, token):
+        with self._lock:
+            if self.values.get(key, None) == token.encode():
+                del self.values[key]
+                return 1
+            return 0
+
+
+class UnreachableRedis:
+    def get(self, key):
+        raise ConnectionError("redis is not reachable")
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(singleflight, "get_redis", lambda: fake)
+    return fake
+
+
+def _flight() -> SingleFlight:
+    return SingleFlight("test", wait_timeout=2.0, poll_interval=0.01)
+
+
+@pytest.mark.asyncio
+async def test_leader_runs_and_shares_the_result(redis):
+    calls = []
+
+    async def func():
+        calls.append(1)
+        return {"issue_id": "is1"}
+
+    flight = _flight()
+    assert await flight.run("k1", func) == {"issue_id": "is1"}
+    assert await flight.run("k1", func) == {"issue_id": "is1"}
+    assert len(calls) == 1
+    # the lock is released, only the result is kept.
+    assert list(redis.values) == ["zyg:flight:test:k1"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_wait_for_the_leader(redis):
+    calls = []
+    started = asyncio.Event()
+
+    async def func():
+        calls.append(1)
+        started.set()
+        await asyncio.sleep(0.1)
+        return {"issue_id": "is1"}
+
+    flight = _flight()
+    leader = asyncio.create_task(flight.run("k1", func))
+    await started.wait()
+    results = await asyncio.gather(*(flight.run("k1", func) for _ in range(3)))
+    assert await leader == {"issue_id": "is1"}
+    assert results == [{"issue_id": "is1"}] * 3
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_none_result_is_not_shared(redis):
+    results = [None, {"issue_id": "is1"}]
+
+    async def func():
+        return results.pop(0)
+
+    flight = _flight()
+    assert await flight.run("k1", func) is None
+    assert redis.values == {}
+    # e.g. the channel got linked meanwhile.
+    assert await flight.run("k1", func) == {"issue_id": "is1"}
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_running_when_redis_is_not_reachable(monkeypatch):
+    monkeypatch.setattr(singleflight, "get_redis", lambda: UnreachableRedis())
+
+    async def func():
+        return {"issue_id": "is1"}
+
+    assert await _flight().run("k1", func) == {"issue_id": "is1"}
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_running_when_the_leader_takes_too_long(redis):
+    redis.set("zyg:flight:test:k1:lock", "another-caller")
+
+    async def func():
+        return {"issue_id": "is1"}
+
+    flight = SingleFlight("test", wait_timeout=0.05, poll_interval=0.01)
+    assert await flight.run("k1", func) == {"issue_id": "is1"}
+    assert "zyg:flight:test:k1" not in redis.values
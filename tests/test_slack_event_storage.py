@@ -0,0 +1,112 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+import pytest
+
+from src.adapters.db.adapters import SlackEventDBAdapter
+from src.adapters.db.storage import STORAGE_FULL, STORAGE_SLIM, decompress_payload
+from src.domain.models import SlackEvent
+
+_AT = datetime(2023, 11, 14, 22, 13, 20, tzinfo=timezone.utc)
+
+
+class RecordingConnection:
+    def __init__(self, engine: "RecordingEngine") -> None:
+        self.engine = engine
+
+    async def execute(self, statement, parameters):
+        self.engine.saved.append(parameters)
+        row = {
+            "event_id": parameters["event_id"],
+            "created_at": _AT,
+            "updated_at": _AT,
+        }
+        return RecordingResult(row)
+
+
+class RecordingResult:
+    def __init__(self, row: dict) -> None:
+        self.row = row
+
+    def mappings(self):
+        return self
+
+    def first(self):
+        return self.row
+
+
+class RecordingEngine:
+    def __init__(self) -> None:
+        self.saved = []
+
+    @asynccontextmanager
+    async def begin(self):
+        yield RecordingConnection(self)
+
+
+def _payload() -> dict:
+    return {
+        "token": "verification-token",
+        "team_id": "T0001",
+        "api_app_id": "A0001",
+        "event": {
+            "type": "message",
+            "text": "the export to CSV is failing",
+            "user": "U0001",
+            "ts": "1700000000.000100",
+            "blocks": [{"type": "rich_text", "block_id": "Vb3a", "elements": []}],
+            "channel": "C0001",
+            "event_ts": "1700000000.000100",
+            "channel_type": "channel",
+        },
+        "type": "event_callback",
+        "event_id": "Ev0001",
+        "event_time": 1700000000,
+        "authorizations": [{"team_id": "T0001", "user_id": "U0002", "is_bot": True}],
+    }
+
+
+@pytest.mark.asyncio
+async def test_slim_capture_read_back_and_ack_save():
+    engine = RecordingEngine()
+    slack_event_db = SlackEventDBAdapter(engine=engine, storage=STORAGE_SLIM)
+    payload = _payload()
+
+    captured = await slack_event_db.save(
+        SlackEvent.from_payload(tenant_id="tn1", event_id=None, payload=payload)
+    )
+    inserted = engine.saved[0]
+    assert inserted["token"] is None
+    assert "token" not in captured.payload
+    assert "blocks" not in captured.payload["event"]
+    assert decompress_payload(inserted["payload_zlib"]) == payload
+
+    # as read back from the slim row, the compressed payload is not selected.
+    entity = slack_event_db._map_to_db_entity(captured)
+    slack_event = slack_event_db.to_domain(entity)
+    assert slack_event.token is None
+    slack_event.is_ack = True
+    await slack_event_db.save(slack_event)
+
+    upserted = engine.saved[1]
+    assert upserted["event_id"] == captured.event_id
+    assert upserted["token"] is None
+    assert upserted["is_ack"] is True
+    # left null, the upsert keeps the compressed payload stored on capture.
+    assert upserted["payload_zlib"] is None
+
+
+@pytest.mark.asyncio
+async def test_full_save_of_an_event_read_back_from_a_slim_row():
+    engine = RecordingEngine()
+    slim = SlackEventDBAdapter(engine=engine, storage=STORAGE_SLIM)
+    captured = await slim.save(
+        SlackEvent.from_payload(tenant_id="tn1", event_id=None, payload=_payload())
+    )
+
+    full = SlackEventDBAdapter(engine=engine, storage=STORAGE_FULL)
+    await full.save(captured)
+
+    upserted = engine.saved[1]
+    assert upserted["token"] is None
+    assert upserted["payload_zlib"] is None